@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class CandidatesConfig(AppConfig):
     name = 'apps.candidates'
+
+    def ready(self):
+        # Registra los receptores que invalidan la boleta en caché
+        from . import signals  # noqa: F401
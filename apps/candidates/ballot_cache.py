@@ -0,0 +1,33 @@
+# apps/candidates/ballot_cache.py
+"""
+Caché de la boleta (candidatos) de cada elección en la caché de Django.
+
+La boleta solo puede cambiar mientras la elección está en borrador (las vistas
+rechazan cambios con la elección abierta o cerrada), justo cuando no hay
+tráfico de votación. Se guarda como lista de diccionarios durante
+BALLOT_CACHE_TTL segundos y los receptores de post_save/post_delete de
+Candidate la borran.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Candidate
+
+BALLOT_FIELDS = ('id', 'name', 'bio', 'image')
+
+
+def _key(election_id):
+    return f'election-ballot:{int(election_id)}'
+
+
+def ballot_candidates(election_id):
+    """Candidatos de la elección (id, name, bio, image), en el orden de la boleta."""
+    candidates = cache.get(_key(election_id))
+    if candidates is None:
+        candidates = list(Candidate.objects.filter(election_id=election_id).values(*BALLOT_FIELDS))
+        cache.set(_key(election_id), candidates, settings.BALLOT_CACHE_TTL)
+    return candidates
+
+
+def invalidate_ballot(election_id):
+    cache.delete(_key(election_id))
@@ -0,0 +1,22 @@
+# apps/candidates/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.elections.models import Election
+from .ballot_cache import invalidate_ballot
+from .models import Candidate
+
+
+# La boleta en caché deja de valer con cualquier alta, cambio o baja de
+# candidatos, o si una elección nueva reutiliza la pk de una borrada.
+
+@receiver(post_save, sender=Candidate)
+@receiver(post_delete, sender=Candidate)
+def invalidate_ballot_on_candidate_change(sender, instance, **kwargs):
+    invalidate_ballot(instance.election_id)
+
+
+@receiver(post_save, sender=Election)
+@receiver(post_delete, sender=Election)
+def invalidate_ballot_on_election_change(sender, instance, **kwargs):
+    invalidate_ballot(instance.pk)
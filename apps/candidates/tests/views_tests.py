@@ -12,6 +12,7 @@ from django.db import IntegrityError
 from apps.elections.models import Election
 from apps.candidates.models import Candidate
 from apps.candidates.serializers import CandidateSerializer
+from apps.elections.config_cache import get_election_config
 
 User = get_user_model()
 
@@ -145,6 +146,18 @@ class CandidateAPITests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
         self.assertIn('No se pueden añadir candidatos a una elección que está en curso o finalizada', response.data['detail'])
 
+    def test_create_candidate_uses_current_status_not_cached_config(self):
+        """La configuración en caché puede ir atrasada (p. ej. la abrió el planificador en otro proceso): el alta no se fía de ella."""
+        self.client.force_authenticate(user=self.staff_user)
+        self.assertEqual(get_election_config(self.draft_election.pk).status, Election.Status.DRAFT)
+        # Cambio sin señales: la copia en caché de este proceso sigue diciendo DRAFT
+        Election.objects.filter(pk=self.draft_election.pk).update(status=Election.Status.OPEN)
+
+        response = self.client.post(self.list_create_url, self.valid_data)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Candidate.objects.filter(user=self.other_user).exists())
+
     def test_create_candidate_duplicate_user_in_election(self):
         """Prueba que no se puede crear un candidato duplicado para la misma elección (400)."""
         self.client.force_authenticate(user=self.staff_user) # Dueño de la elección
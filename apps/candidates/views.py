@@ -6,6 +6,7 @@ from django.shortcuts import get_object_or_404
 from django.utils.translation import gettext_lazy as _
 
 from apps.elections.models import Election
+from apps.elections.config_cache import get_election_config_or_404
 from .models import Candidate
 from .serializers import CandidateSerializer
 from apps.core.permissions import IsOwnerOrReadOnly # Clase de permiso reusada
@@ -18,7 +19,11 @@ def candidate_list_create(request, election_pk):
     GET: Lista todos los candidatos de una elección específica.
     POST: Permite crear un nuevo candidato en esa elección.
     """
-    election = get_object_or_404(Election, pk=election_pk)
+    # Las escrituras deciden con el estado leído de la base de datos; el listado usa la copia en caché
+    if request.method == 'POST':
+        election = get_object_or_404(Election, pk=election_pk)
+    else:
+        election = get_election_config_or_404(election_pk)
     
     # 1. Validación de Lógica de Negocio para POST (Creación)
     if request.method == 'POST':
@@ -30,7 +35,7 @@ def candidate_list_create(request, election_pk):
             )
             
         # El usuario que crea el candidato debe ser el dueño de la elección
-        if election.owner != request.user:
+        if election.owner_id != request.user.pk:
             return Response(
                 {'detail': _('Solo el administrador de la elección puede añadir candidatos.')},
                 status=status.HTTP_403_FORBIDDEN
@@ -55,7 +60,7 @@ def candidate_list_create(request, election_pk):
     # 3. Manejo de GET (Listado)
     elif request.method == 'GET':
         # Listado público de candidatos para esa elección
-        candidates = Candidate.objects.filter(election=election).select_related('user')
+        candidates = Candidate.objects.filter(election_id=election.pk).select_related('user')
         serializer = CandidateSerializer(candidates, many=True)
         return Response(serializer.data)
 
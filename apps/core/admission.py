@@ -0,0 +1,183 @@
+# apps/core/admission.py
+"""
+Control de admisión por elección para la ruta de votación.
+
+Cada elección tiene una puerta con dos límites:
+- Concurrencia: como máximo ADMISSION_MAX_CONCURRENT_PER_ELECTION peticiones
+  dentro de la vista a la vez (el resto no espera: recibe 429 inmediatamente).
+- Tasa: cubo de fichas que se rellena a ADMISSION_RATE_PER_ELECTION fichas/s
+  con capacidad ADMISSION_BURST_PER_ELECTION.
+
+Así el exceso se rechaza en microsegundos con Retry-After en lugar de acumularse
+sobre los bloqueos de escritura de la base de datos. Los límites se aplican por
+proceso: con N workers, la capacidad total de una elección es N veces la configurada.
+Un límite en 0 o None queda desactivado.
+"""
+import math
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.response import Response
+
+from .metrics import metrics
+
+REJECT_CONCURRENCY = 'concurrency'
+REJECT_RATE = 'rate'
+
+
+class _ElectionGate:
+    """Límite de concurrencia + cubo de fichas de una elección."""
+
+    def __init__(self, election_id, max_concurrent, rate, burst):
+        self.labels = {'election': str(election_id)}
+        self.max_concurrent = max_concurrent
+        self.rate = rate
+        self.burst = burst or rate
+        self.in_flight = 0
+        self.tokens = float(self.burst or 0)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def try_acquire(self):
+        """Retorna (None, 0) si se admite, o (motivo, segundos de Retry-After)."""
+        with self.lock:
+            if self.max_concurrent and self.in_flight >= self.max_concurrent:
+                return REJECT_CONCURRENCY, 1
+
+            if self.rate:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens < 1:
+                    return REJECT_RATE, max(1, math.ceil((1 - self.tokens) / self.rate))
+                self.tokens -= 1
+
+            self.in_flight += 1
+            # El medidor se actualiza bajo el lock para que nunca quede desordenado
+            metrics.set_gauge('admission_in_flight', self.in_flight, self.labels)
+            return None, 0
+
+    def release(self):
+        with self.lock:
+            self.in_flight -= 1
+            metrics.set_gauge('admission_in_flight', self.in_flight, self.labels)
+
+
+# Tope de puertas en memoria: pk inventadas no deben poder hacer crecer el registro sin límite
+_MAX_GATES = 10000
+_gates = {}
+_gates_lock = threading.Lock()
+
+
+def _gate_for(election_id):
+    gate = _gates.get(election_id)
+    if gate is None:
+        with _gates_lock:
+            gate = _gates.get(election_id)
+            if gate is None:
+                if len(_gates) >= _MAX_GATES:
+                    for idle_id in [pk for pk, idle in _gates.items() if idle.in_flight == 0]:
+                        del _gates[idle_id]
+                gate = _gates[election_id] = _ElectionGate(
+                    election_id,
+                    settings.ADMISSION_MAX_CONCURRENT_PER_ELECTION,
+                    settings.ADMISSION_RATE_PER_ELECTION,
+                    settings.ADMISSION_BURST_PER_ELECTION,
+                )
+    return gate
+
+
+def reset_admission():
+    """Descarta las puertas (se recrean con la configuración vigente)."""
+    with _gates_lock:
+        _gates.clear()
+
+
+@receiver(setting_changed)
+def _reset_on_settings_change(setting, **kwargs):
+    if setting.startswith('ADMISSION_'):
+        reset_admission()
+
+
+def election_from_kwarg(name='election_pk'):
+    """Obtiene la elección de un parámetro de la URL."""
+    return lambda request, kwargs: kwargs.get(name)
+
+
+def election_from_body(field='election_id'):
+    """Obtiene la elección del cuerpo de la petición."""
+    return lambda request, kwargs: request.data.get(field) if hasattr(request.data, 'get') else None
+
+
+def elections_from_ballots(field='ballots', key='election_id'):
+    """Obtiene las elecciones de una lista de papeletas del cuerpo de la petición."""
+    def getter(request, kwargs):
+        ballots = request.data.get(field) if hasattr(request.data, 'get') else None
+        if not isinstance(ballots, list):
+            return None
+        return [ballot.get(key) if isinstance(ballot, dict) else None for ballot in ballots]
+    return getter
+
+
+REJECTION_DETAIL = _('Demasiadas solicitudes para esta elección. Reintente en unos segundos.')
+
+
+def admit(election_id, view_name):
+    """
+    Intenta ocupar un cupo de la elección. Retorna (puerta, 0) si se admite
+    (el llamador debe invocar puerta.release() al terminar) o (None, Retry-After).
+    """
+    labels = {'election': str(election_id), 'view': view_name}
+    gate = _gate_for(election_id)
+    reason, retry_after = gate.try_acquire()
+    if reason:
+        metrics.increment('admission_rejected_total', {**labels, 'reason': reason})
+        return None, retry_after
+    metrics.increment('admission_admitted_total', labels)
+    return gate, 0
+
+
+def admission_controlled(election_getter):
+    """
+    Decorador para vistas @api_view de la ruta de votación. Debe ir debajo de
+    @api_view/@permission_classes y por encima de @idempotent y @transaction.atomic,
+    para que el rechazo ocurra antes de cualquier acceso a la base de datos.
+    Si la petición no identifica una elección válida no se limita (la vista la rechazará).
+    Si election_getter retorna una lista, se necesita cupo en todas sus elecciones.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            try:
+                raw = election_getter(request, kwargs)
+                # Una sola plaza por elección aunque la petición la repita
+                election_ids = sorted({int(e) for e in raw}) if isinstance(raw, list) else [int(raw)]
+            except (TypeError, ValueError):
+                return view_func(request, *args, **kwargs)
+
+            gates = []
+            for election_id in election_ids:
+                gate, retry_after = admit(election_id, view_func.__name__)
+                if gate is None:
+                    for admitted in gates:
+                        admitted.release()
+                    return Response(
+                        {'detail': REJECTION_DETAIL},
+                        status=status.HTTP_429_TOO_MANY_REQUESTS,
+                        headers={'Retry-After': str(retry_after)}
+                    )
+                gates.append(gate)
+
+            try:
+                return view_func(request, *args, **kwargs)
+            finally:
+                for gate in gates:
+                    gate.release()
+        return wrapper
+    return decorator
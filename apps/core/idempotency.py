@@ -0,0 +1,137 @@
+# apps/core/idempotency.py
+import hashlib
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+
+
+def _request_fingerprint(request):
+    """SHA-256 del cuerpo de la petición, independiente del orden de las claves."""
+    body = json.dumps(request.data, sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+
+def _replay(stored):
+    return Response(
+        stored.response_body,
+        status=stored.response_status,
+        headers={REPLAYED_HEADER: 'true'}
+    )
+
+
+def _is_storable(response):
+    # Los errores 5xx y el 429 del control de admisión son transitorios: el cliente debe poder reintentar de verdad
+    return response.status_code < 500 and response.status_code != status.HTTP_429_TOO_MANY_REQUESTS
+
+
+def _reserve(lookup, fingerprint):
+    """
+    Reserva la clave con el INSERT de una fila pendiente (sin respuesta).
+    Retorna (True, None) si la reservó esta petición, o (False, fila existente).
+    Una fila vencida se borra y se vuelve a intentar una vez.
+    """
+    stored = None
+    for _attempt in range(2):
+        now = timezone.now()
+        try:
+            with transaction.atomic():
+                IdempotencyKey.objects.create(
+                    **lookup,
+                    request_hash=fingerprint,
+                    expires_at=now + settings.IDEMPOTENCY_PENDING_TIMEOUT,
+                )
+            return True, None
+        except IntegrityError:
+            stored = IdempotencyKey.objects.filter(**lookup).first()
+            if stored is None:
+                continue # Se liberó entretanto
+            if stored.expires_at > now:
+                return False, stored
+            # Vencida (o pendiente de un proceso que murió): DELETE condicional y nuevo intento
+            IdempotencyKey.objects.filter(pk=stored.pk, expires_at__lte=now).delete()
+    return False, stored
+
+
+def idempotent(scope):
+    """
+    Decorador para vistas @api_view. Si la petición trae Idempotency-Key, la
+    primera respuesta se guarda durante IDEMPOTENCY_KEY_TTL y los reintentos con
+    la misma clave la reciben tal cual, sin volver a ejecutar la vista.
+
+    La clave se reserva antes de ejecutar la vista (fila pendiente). Un reintento
+    que llega mientras la primera petición sigue en curso recibe 409 con
+    Retry-After en lugar de ejecutarla otra vez. Si la vista falla o su respuesta
+    no se guarda (5xx, 429) la reserva se libera; si el proceso muere, vence a
+    los IDEMPOTENCY_PENDING_TIMEOUT.
+    Debe ir debajo de @api_view/@permission_classes (necesita request.user y request.data).
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if not key or not request.user.is_authenticated:
+                return view_func(request, *args, **kwargs)
+
+            if len(key) > 255:
+                return Response(
+                    {'detail': _('La cabecera Idempotency-Key no puede superar los 255 caracteres.')},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            fingerprint = _request_fingerprint(request)
+            lookup = {'user': request.user, 'scope': scope, 'key': key}
+
+            # 1. Reserva de la clave; si ya existe, es un reintento
+            reserved, stored = _reserve(lookup, fingerprint)
+            if not reserved:
+                if stored is not None and stored.request_hash != fingerprint:
+                    return Response(
+                        {'detail': _('La clave de idempotencia ya se usó con una petición diferente.')},
+                        status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                    )
+                if stored is None or stored.response_status is None:
+                    return Response(
+                        {'detail': _('Hay una petición con la misma Idempotency-Key en curso. Reintente en unos segundos.')},
+                        status=status.HTTP_409_CONFLICT,
+                        headers={'Retry-After': '1'}
+                    )
+                return _replay(stored)
+
+            # 2. Primera ejecución
+            try:
+                response = view_func(request, *args, **kwargs)
+            except Exception:
+                IdempotencyKey.objects.filter(**lookup, response_status__isnull=True).delete()
+                raise
+
+            if not _is_storable(response):
+                IdempotencyKey.objects.filter(**lookup, response_status__isnull=True).delete()
+                return response
+
+            # 3. Completa la reserva con la respuesta
+            IdempotencyKey.objects.filter(**lookup, response_status__isnull=True).update(
+                response_status=response.status_code,
+                response_body=response.data,
+                expires_at=timezone.now() + settings.IDEMPOTENCY_KEY_TTL,
+            )
+            return response
+        return wrapper
+    return decorator
+
+
+def purge_expired_idempotency_keys():
+    """Elimina las claves vencidas. Retorna el número de filas borradas."""
+    deleted, _details = IdempotencyKey.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
@@ -0,0 +1,13 @@
+# apps/core/management/commands/purge_idempotency_keys.py
+# py manage.py purge_idempotency_keys
+from django.core.management.base import BaseCommand
+
+from apps.core.idempotency import purge_expired_idempotency_keys
+
+
+class Command(BaseCommand):
+    help = 'Elimina las claves de idempotencia cuyo TTL ya venció.'
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_idempotency_keys()
+        self.stdout.write(self.style.SUCCESS(f"Claves de idempotencia eliminadas: {deleted}"))
@@ -0,0 +1,58 @@
+# apps/core/metrics.py
+"""
+Registro de métricas en memoria (por proceso) para la ruta de votación.
+Contadores y medidores con etiquetas, consultables vía GET /api/v1/core/metrics/.
+"""
+import threading
+from collections import defaultdict
+
+
+class MetricsRegistry:
+    """Contadores (solo suben) y medidores (valor actual) protegidos por un lock."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = defaultdict(int)
+        self._gauges = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((labels or {}).items()))
+
+    def increment(self, name, labels=None, amount=1):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] += amount
+
+    def set_gauge(self, name, value, labels=None):
+        key = self._key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def get(self, name, labels=None):
+        """Valor actual de un contador o medidor (0 si no existe)."""
+        key = self._key(name, labels)
+        with self._lock:
+            if key in self._gauges:
+                return self._gauges[key]
+            return self._counters.get(key, 0)
+
+    def snapshot(self):
+        """Lista de {'name', 'type', 'labels', 'value'} ordenada por nombre."""
+        with self._lock:
+            rows = [
+                {'name': name, 'type': 'counter', 'labels': dict(labels), 'value': value}
+                for (name, labels), value in self._counters.items()
+            ] + [
+                {'name': name, 'type': 'gauge', 'labels': dict(labels), 'value': value}
+                for (name, labels), value in self._gauges.items()
+            ]
+        return sorted(rows, key=lambda row: (row['name'], sorted(row['labels'].items())))
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+
+
+metrics = MetricsRegistry()
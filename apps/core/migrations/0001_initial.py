@@ -0,0 +1,37 @@
+# Generated by Django 6.0 on 2026-10-19 04:55
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdempotencyKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=100, verbose_name='ámbito')),
+                ('key', models.CharField(max_length=255, verbose_name='clave de idempotencia')),
+                ('request_hash', models.CharField(max_length=64, verbose_name='hash de la petición')),
+                ('response_status', models.PositiveSmallIntegerField(verbose_name='código de estado')),
+                ('response_body', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='cuerpo de la respuesta')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(db_index=True, help_text='Pasada esta fecha la clave se ignora y puede purgarse.', verbose_name='expira')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='idempotency_keys', to=settings.AUTH_USER_MODEL, verbose_name='usuario')),
+            ],
+            options={
+                'verbose_name': 'clave de idempotencia',
+                'verbose_name_plural': 'claves de idempotencia',
+                'unique_together': {('user', 'scope', 'key')},
+            },
+        ),
+    ]
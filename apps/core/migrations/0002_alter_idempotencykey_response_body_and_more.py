@@ -0,0 +1,24 @@
+# Generated by Django 6.0 on 2026-10-19 06:54
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='idempotencykey',
+            name='response_body',
+            field=models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True, verbose_name='cuerpo de la respuesta'),
+        ),
+        migrations.AlterField(
+            model_name='idempotencykey',
+            name='response_status',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='código de estado'),
+        ),
+    ]
@@ -1,3 +1,47 @@
 from django.db import models
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.translation import gettext_lazy as _
 
-# Create your models here.
+
+class IdempotencyKey(models.Model):
+    """
+    Respuesta almacenada para una cabecera Idempotency-Key.
+    Permite devolver la misma respuesta a los reintentos de un cliente sin
+    volver a ejecutar la operación (ni tocar las tablas que ésta modifica).
+    """
+
+    # Dueño de la clave: las claves solo son únicas por usuario
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='idempotency_keys',
+        verbose_name=_('usuario')
+    )
+
+    # Endpoint al que pertenece la clave (una misma clave puede reusarse en otro endpoint)
+    scope = models.CharField(_('ámbito'), max_length=100)
+
+    key = models.CharField(_('clave de idempotencia'), max_length=255)
+
+    # Huella del cuerpo original: detecta reusos de la clave con otra petición
+    request_hash = models.CharField(_('hash de la petición'), max_length=64)
+
+    # Respuesta original (nula mientras la primera petición sigue en curso)
+    response_status = models.PositiveSmallIntegerField(_('código de estado'), null=True, blank=True)
+    response_body = models.JSONField(_('cuerpo de la respuesta'), encoder=DjangoJSONEncoder, null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(
+        _('expira'),
+        db_index=True,
+        help_text=_('Pasada esta fecha la clave se ignora y puede purgarse.')
+    )
+
+    class Meta:
+        verbose_name = _('clave de idempotencia')
+        verbose_name_plural = _('claves de idempotencia')
+        unique_together = ['user', 'scope', 'key']
+
+    def __str__(self):
+        return f"{self.scope} | {self.key} ({self.response_status})"
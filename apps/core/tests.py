@@ -1,3 +1,135 @@
-from django.test import TestCase
+# apps/core/tests.py
+# py .\manage.py test apps.core.tests
 
-# Create your tests here.
+from datetime import timedelta
+from django.urls import reverse
+from django.utils import timezone
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+
+from apps.elections.models import Election
+from apps.voter.models import Voter
+from apps.core.admission import _gate_for
+from apps.core.metrics import metrics
+from apps.core.models import IdempotencyKey
+
+User = get_user_model()
+
+
+@override_settings(
+    ADMISSION_MAX_CONCURRENT_PER_ELECTION=1,
+    ADMISSION_RATE_PER_ELECTION=0,
+    ADMISSION_BURST_PER_ELECTION=0,
+)
+class AdmissionControlTests(APITestCase):
+
+    def setUp(self):
+        metrics.reset()
+        self.owner_user = User.objects.create_user(email='owner@test.com', name='Owner', password='pass')
+        self.voter_user = User.objects.create_user(email='voter@test.com', name='Voter', password='pass')
+        self.election = Election.objects.create(
+            owner=self.owner_user,
+            title='Elección Concurrida',
+            status=Election.Status.OPEN,
+            start_at=timezone.now() - timedelta(days=1),
+            end_at=timezone.now() + timedelta(days=1),
+        )
+        Voter.objects.create(election=self.election, user=self.voter_user, allowed=True, voted=False)
+        self.eligibility_url = reverse('elections:verify-eligibility', kwargs={'election_pk': self.election.pk})
+        self.register_url = reverse('votes:register-tx')
+        self.client.force_authenticate(user=self.voter_user)
+
+    # =============================================================
+    # TESTS: LÍMITE DE CONCURRENCIA
+    # =============================================================
+
+    def test_over_concurrency_gets_fast_429(self):
+        """Con el cupo ocupado, la petición se rechaza sin tocar la base de datos."""
+        gate = _gate_for(self.election.pk)
+        gate.try_acquire() # Simula una petición en curso
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.eligibility_url)
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(
+            metrics.get('admission_rejected_total', {'election': str(self.election.pk), 'view': 'verify_eligibility', 'reason': 'concurrency'}),
+            1
+        )
+
+        gate.release()
+        response = self.client.get(self.eligibility_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(metrics.get('admission_in_flight', {'election': str(self.election.pk)}), 0)
+
+    def test_rejected_request_is_not_stored_as_idempotent(self):
+        """Un 429 no consume la Idempotency-Key: el reintento debe ejecutarse de verdad."""
+        gate = _gate_for(self.election.pk)
+        gate.try_acquire()
+        data = {'election_id': self.election.pk, 'tx_id': 'TX_1', 'vote_hash': 'a' * 64}
+
+        response = self.client.post(self.register_url, data, format='json', HTTP_IDEMPOTENCY_KEY='k-1')
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertFalse(IdempotencyKey.objects.exists())
+        gate.release()
+
+    # =============================================================
+    # TESTS: CUBO DE FICHAS
+    # =============================================================
+
+    @override_settings(ADMISSION_MAX_CONCURRENT_PER_ELECTION=0, ADMISSION_RATE_PER_ELECTION=0.5, ADMISSION_BURST_PER_ELECTION=2)
+    def test_token_bucket_limits_rate(self):
+        """Agotada la ráfaga, el exceso recibe 429 con el Retry-After de la siguiente ficha."""
+        self.assertEqual(self.client.get(self.eligibility_url).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(self.eligibility_url).status_code, status.HTTP_200_OK)
+
+        response = self.client.get(self.eligibility_url)
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '2')
+
+    def test_multi_election_request_needs_every_gate(self):
+        """cast-multi necesita cupo en todas sus elecciones; si falta uno libera los demás."""
+        other = Election.objects.create(
+            owner=self.owner_user, title='Otra', status=Election.Status.OPEN,
+            start_at=timezone.now() - timedelta(days=1), end_at=timezone.now() + timedelta(days=1),
+        )
+        gate = _gate_for(other.pk)
+        gate.try_acquire()
+        ballots = [{'election_id': self.election.pk}, {'election_id': other.pk}]
+
+        with self.assertNumQueries(0):
+            response = self.client.post(reverse('votes:cast-multi'), {'ballots': ballots}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(metrics.get('admission_in_flight', {'election': str(self.election.pk)}), 0)
+        gate.release()
+
+    def test_invalid_election_is_not_limited(self):
+        """Sin una elección reconocible se deja que la vista rechace la petición."""
+        response = self.client.post(self.register_url, {'election_id': 'abc'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # =============================================================
+    # TESTS: ENDPOINT DE MÉTRICAS (GET /core/metrics/)
+    # =============================================================
+
+    def test_metrics_endpoint_staff_only(self):
+        """Las métricas solo son visibles para administradores."""
+        self.client.get(self.eligibility_url)
+
+        self.assertEqual(self.client.get(reverse('core:metrics')).status_code, status.HTTP_403_FORBIDDEN)
+
+        staff = User.objects.create_user(email='staff@test.com', name='Staff', password='pass', is_staff=True)
+        self.client.force_authenticate(user=staff)
+        response = self.client.get(reverse('core:metrics'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        names = {row['name'] for row in response.data['metrics']}
+        self.assertIn('admission_admitted_total', names)
+        self.assertIn('admission_in_flight', names)
@@ -0,0 +1,9 @@
+from django.urls import path
+from .views import metrics_snapshot
+
+app_name = 'core'
+
+urlpatterns = [
+    # api/v1/core/metrics/
+    path('metrics/', metrics_snapshot, name='metrics'),
+]
@@ -1,3 +1,24 @@
-from django.shortcuts import render
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from django.utils.translation import gettext_lazy as _
 
-# Create your views here.
+from .metrics import metrics
+
+
+# --- NUEVA VISTA: MÉTRICAS DE OPERACIÓN (Administradores) ---
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def metrics_snapshot(request):
+    """
+    Devuelve los contadores y medidores del proceso que atiende la petición
+    (control de admisión de la ruta de votación, etc.).
+    """
+    if not request.user.is_staff:
+        return Response(
+            {'detail': _('Solo los administradores pueden consultar las métricas.')},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    return Response({'metrics': metrics.snapshot()}, status=status.HTTP_200_OK)
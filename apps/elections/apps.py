@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class ElectionsConfig(AppConfig):
     name = 'apps.elections'
+
+    def ready(self):
+        # Registra los receptores que invalidan la caché de elegibilidad externa
+        from . import signals  # noqa: F401
@@ -0,0 +1,154 @@
+# apps/elections/config_cache.py
+"""
+Caché en memoria de la configuración de las elecciones.
+
+Casi todas las peticiones de la ruta caliente (elegibilidad, voto, padrón,
+candidatos, resultados) empiezan leyendo su Election, aunque una elección
+apenas cambia una vez abierta. get_election_config() devuelve una copia
+inmutable (ElectionConfig) de los campos que esas vistas usan sin consultar la
+base de datos mientras siga vigente:
+
+1.  Cada proceso guarda como mucho ELECTION_CONFIG_CACHE_MAX_ENTRIES
+    elecciones (se descartan las menos usadas) durante ELECTION_CONFIG_CACHE_TTL
+    segundos como máximo.
+2.  Los receptores de post_save/post_delete de Election (y el planificador, que
+    cambia el estado con UPDATE) llaman a invalidate_election_config(), que
+    borra la copia local y cambia la versión de la elección en la caché
+    compartida de Django (CACHES['default']).
+3.  Cada lectura compara esa versión con la de su copia: un cambio hecho en
+    otro proceso se ve en la siguiente petición. Con la caché por defecto
+    (LocMemCache, propia de cada proceso) solo queda el TTL entre procesos:
+    en despliegues con varios procesos debe configurarse una caché compartida.
+
+La copia puede ir por detrás de la base de datos (hasta el TTL sin caché
+compartida), así que solo sirve para lecturas: las escrituras que dependen del
+estado (altas de candidatos o del padrón) y la visibilidad de los resultados
+deben leer la elección de la base de datos.
+
+Métricas (apps.core.metrics): election_config_cache_hits_total y
+election_config_cache_misses_total.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.dispatch import receiver
+from django.http import Http404
+
+from apps.core.metrics import metrics
+from .models import Election
+
+_CONFIG_FIELDS = (
+    'pk', 'title', 'status', 'type', 'start_at', 'end_at', 'max_sel', 'owner_id',
+    'ext_validation_url', 'ext_validation_sources', 'ext_validation_policy',
+)
+
+_entries = OrderedDict() # election_id -> (ElectionConfig, versión, expires_at)
+_lock = threading.Lock()
+
+
+class ElectionConfig:
+    """
+    Copia de solo lectura de la configuración de una elección. Sirve donde las
+    vistas solo leen esos campos (incluido check_election_eligibility).
+    """
+    __slots__ = _CONFIG_FIELDS
+
+    def __init__(self, **fields):
+        for name in _CONFIG_FIELDS:
+            object.__setattr__(self, name, fields[name])
+
+    def __setattr__(self, name, value):
+        raise AttributeError('ElectionConfig es de solo lectura.')
+
+    @property
+    def id(self):
+        return self.pk
+
+    validation_sources = Election.validation_sources
+    scheduled_transition = Election.scheduled_transition
+    Status = Election.Status
+
+    def __repr__(self):
+        return f'<ElectionConfig {self.pk} {self.status}>'
+
+
+def _version_key(election_id):
+    return f'election-config-version:{int(election_id)}'
+
+
+def _load(election_id):
+    row = Election.objects.filter(pk=election_id).values(*_CONFIG_FIELDS).first()
+    if row is None:
+        return None
+    row['ext_validation_sources'] = tuple(row['ext_validation_sources'] or ())
+    return ElectionConfig(**row)
+
+
+def get_election_config(election_id):
+    """Configuración vigente de la elección, o None si no existe."""
+    election_id = int(election_id)
+    version = cache.get(_version_key(election_id))
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(election_id)
+        if entry is not None and (entry[1] != version or entry[2] <= now):
+            del _entries[election_id]
+            entry = None
+        if entry is not None:
+            _entries.move_to_end(election_id)
+
+    if entry is not None:
+        metrics.increment('election_config_cache_hits_total')
+        return entry[0]
+
+    metrics.increment('election_config_cache_misses_total')
+    config = _load(election_id)
+    # Las elecciones inexistentes no se guardan: una nueva puede crearse con esa pk
+    if config is not None:
+        with _lock:
+            _entries[election_id] = (config, version, now + settings.ELECTION_CONFIG_CACHE_TTL)
+            _entries.move_to_end(election_id)
+            while len(_entries) > settings.ELECTION_CONFIG_CACHE_MAX_ENTRIES:
+                _entries.popitem(last=False)
+    return config
+
+
+def get_election_config_or_404(election_id):
+    """Como get_object_or_404(Election, pk=election_id), pero desde la caché."""
+    config = get_election_config(election_id)
+    if config is None:
+        raise Http404('No Election matches the given query.')
+    return config
+
+
+def _bump(election_id):
+    with _lock:
+        _entries.pop(election_id, None)
+    cache.set(_version_key(election_id), time.time_ns(), None)
+
+
+def invalidate_election_config(election_id):
+    """
+    Borra la copia local y cambia la versión compartida (los demás procesos
+    recargan). Se repite al confirmarse la transacción en curso: una lectura
+    hecha entretanto pudo guardar los datos anteriores con la versión nueva.
+    """
+    election_id = int(election_id)
+    _bump(election_id)
+    transaction.on_commit(lambda: _bump(election_id))
+
+
+def reset_config_cache():
+    with _lock:
+        _entries.clear()
+
+
+@receiver(setting_changed)
+def _reset_on_settings_change(setting, **kwargs):
+    if setting.startswith('ELECTION_CONFIG_CACHE_') or setting == 'CACHES':
+        reset_config_cache()
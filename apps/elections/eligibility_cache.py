@@ -0,0 +1,176 @@
+# apps/elections/eligibility_cache.py
+"""
+Caché en memoria de las decisiones de los validadores externos de elegibilidad.
+
+Clave: (election_id, email normalizado). Cada proceso guarda como mucho
+ELIGIBILITY_CACHE_MAX_ENTRIES decisiones (se descartan las menos usadas) con
+TTL distinto para las positivas y las negativas
+(ELIGIBILITY_CACHE_POSITIVE_TTL / _NEGATIVE_TTL, en segundos; 0 = no guardar).
+Los errores del validador no se guardan nunca.
+
+invalidate() borra las decisiones de este proceso y cambia una generación en la
+caché compartida de Django (CACHES['default']): global, por elección, por email
+o por el par. Cada decisión guarda las generaciones leídas antes de consultar
+al validador (lookup_decision) y cada lectura las compara (una sola get_many),
+así que la invalidación llega a los demás procesos en su siguiente consulta y
+no la deshace una respuesta que llegó después. Con la caché por defecto
+(LocMemCache, propia de cada proceso) solo afecta al proceso que la recibe:
+en despliegues con varios procesos debe configurarse una caché compartida.
+Las estadísticas (cache_stats) son siempre las de este proceso.
+
+Métricas (apps.core.metrics): eligibility_cache_hits_total y
+eligibility_cache_misses_total (etiqueta 'decision' en los aciertos) y el
+medidor eligibility_cache_entries.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.dispatch import receiver
+
+from apps.core.metrics import metrics
+
+_entries = OrderedDict() # (election_id, email) -> (eligible, expires_at, generaciones)
+_lock = threading.Lock()
+
+
+def _key(election_id, email):
+    return int(election_id), email.strip().lower()
+
+
+def _generation_key(election_id=None, email=None):
+    """Clave de la generación compartida de un ámbito (el email va resumido: las claves de caché son ASCII y cortas)."""
+    parts = ['eligibility-cache-generation']
+    if election_id is not None:
+        parts.append(f'election:{int(election_id)}')
+    if email is not None:
+        parts.append('email:' + hashlib.sha256(email.encode('utf-8')).hexdigest()[:32])
+    return ':'.join(parts)
+
+
+def _generations(key):
+    """Generaciones vigentes (global, elección, email, par) de una decisión, en una sola lectura."""
+    election_id, email = key
+    keys = (
+        _generation_key(),
+        _generation_key(election_id=election_id),
+        _generation_key(email=email),
+        _generation_key(election_id=election_id, email=email),
+    )
+    found = cache.get_many(keys)
+    return tuple(found.get(k) for k in keys)
+
+
+def lookup_decision(election_id, email):
+    """
+    Retorna (decisión, token): la decisión es True/False si hay una vigente en
+    caché o None si hay que consultar al validador. El token (las generaciones
+    leídas antes de la consulta) se pasa a store_decision: si alguien invalida
+    mientras el validador responde, la respuesta se guarda ya caducada.
+    """
+    key = _key(election_id, email)
+    generations = _generations(key)
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and (entry[1] <= now or entry[2] != generations):
+            del _entries[key]
+            entry = None
+        if entry is not None:
+            _entries.move_to_end(key)
+        size = len(_entries)
+
+    metrics.set_gauge('eligibility_cache_entries', size)
+    if entry is None:
+        metrics.increment('eligibility_cache_misses_total')
+        return None, generations
+    metrics.increment('eligibility_cache_hits_total', {'decision': 'eligible' if entry[0] else 'rejected'})
+    return entry[0], generations
+
+
+def get_decision(election_id, email):
+    """True/False si hay una decisión vigente en caché; None si hay que consultar al validador."""
+    return lookup_decision(election_id, email)[0]
+
+
+def store_decision(election_id, email, eligible, token=None):
+    """Guarda la decisión con las generaciones del token de lookup_decision (o las actuales si no hay token)."""
+    ttl = settings.ELIGIBILITY_CACHE_POSITIVE_TTL if eligible else settings.ELIGIBILITY_CACHE_NEGATIVE_TTL
+    if ttl <= 0:
+        return
+    key = _key(election_id, email)
+    generations = _generations(key) if token is None else token
+    with _lock:
+        _entries[key] = (bool(eligible), time.monotonic() + ttl, generations)
+        _entries.move_to_end(key)
+        while len(_entries) > settings.ELIGIBILITY_CACHE_MAX_ENTRIES:
+            _entries.popitem(last=False)
+        size = len(_entries)
+    metrics.set_gauge('eligibility_cache_entries', size)
+
+
+def _bump(election_id, email):
+    cache.set(_generation_key(election_id=election_id, email=email), time.time_ns(), None)
+
+
+def invalidate(election_id=None, email=None):
+    """
+    Invalida las decisiones de una elección, de un email, de ambos o todas, en
+    todos los procesos que comparten la caché de Django. Retorna cuántas borró
+    en este proceso (las de los demás caen en su siguiente lectura).
+    Como invalidate_election_config, repite el cambio de generación al
+    confirmarse la transacción en curso.
+    """
+    email = email.strip().lower() if email else None
+    _bump(election_id, email)
+    transaction.on_commit(lambda: _bump(election_id, email))
+    with _lock:
+        doomed = [
+            key for key in _entries
+            if (election_id is None or key[0] == int(election_id)) and (email is None or key[1] == email)
+        ]
+        for key in doomed:
+            del _entries[key]
+        size = len(_entries)
+    metrics.set_gauge('eligibility_cache_entries', size)
+    return len(doomed)
+
+
+def invalidation_scope():
+    """'process' si la caché de Django es local a cada proceso (la invalidación no sale de él); 'shared' si no."""
+    backend = settings.CACHES['default']['BACKEND']
+    return 'process' if backend.endswith(('.LocMemCache', '.DummyCache')) else 'shared'
+
+
+def cache_stats():
+    """Aciertos, fallos, proporción de aciertos y tamaño actual. Son de este proceso ('scope')."""
+    hits = sum(
+        metrics.get('eligibility_cache_hits_total', {'decision': decision}) for decision in ('eligible', 'rejected')
+    )
+    misses = metrics.get('eligibility_cache_misses_total')
+    with _lock:
+        size = len(_entries)
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / (hits + misses) if hits + misses else 0.0,
+        'entries': size,
+        'max_entries': settings.ELIGIBILITY_CACHE_MAX_ENTRIES,
+        'scope': 'process',
+    }
+
+
+def reset_cache():
+    with _lock:
+        _entries.clear()
+
+
+@receiver(setting_changed)
+def _reset_on_settings_change(setting, **kwargs):
+    if setting.startswith('ELIGIBILITY_CACHE_') or setting == 'CACHES':
+        reset_cache()
@@ -0,0 +1,324 @@
+# apps/elections/external.py
+"""
+Cliente HTTP para los validadores externos de elegibilidad (Election.ext_validation_url).
+
+Una sola requests.Session por proceso con un pool de conexiones keep-alive
+(EXTERNAL_VALIDATION_POOL_SIZE por host) y timeouts de conexión y lectura
+(EXTERNAL_VALIDATION_CONNECT_TIMEOUT / _READ_TIMEOUT): un validador lento
+ya no retiene hilos indefinidamente ni abre una conexión por consulta.
+
+Por cada URL se mantiene además:
+- Un cortocircuito (circuit breaker). Tras EXTERNAL_VALIDATION_BREAKER_FAILURES
+  caídas seguidas (red, timeout, 5xx o respuesta ilegible) se abre y las
+  consultas fallan al instante con CircuitOpen durante
+  EXTERNAL_VALIDATION_BREAKER_RESET_SECONDS. Después deja pasar una sola
+  consulta de prueba (semiabierto): si responde se cierra, si no vuelve a abrirse.
+  Un 4xx no cuenta como caída: el validador está respondiendo.
+- Peticiones de cobertura (hedging, opcional). Con EXTERNAL_VALIDATION_HEDGE_PERCENTILE
+  (p. ej. 0.95), si la consulta tarda más que ese percentil de las latencias
+  recientes de la URL se lanza una segunda idéntica y vale la primera que responda.
+
+Métricas (apps.core.metrics, etiqueta 'url'): external_validator_breaker_state
+(0 cerrado, 1 semiabierto, 2 abierto), external_validator_requests_total
+(etiqueta 'outcome'), external_validator_fast_failures_total y
+external_validator_hedged_total.
+
+Una elección puede tener varias fuentes (Election.validation_sources):
+check_election_eligibility() las consulta en paralelo y combina las respuestas
+según Election.ext_validation_policy (ANY, ALL o FIRST), devolviendo en cuanto
+la decisión está tomada: la latencia es la de la fuente más lenta necesaria.
+
+La consulta nunca debe hacerse dentro de una transacción de la base de datos.
+"""
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from requests.adapters import HTTPAdapter
+
+from apps.core.metrics import metrics
+
+BREAKER_CLOSED = 'closed'
+BREAKER_HALF_OPEN = 'half_open'
+BREAKER_OPEN = 'open'
+_STATE_GAUGE = {BREAKER_CLOSED: 0, BREAKER_HALF_OPEN: 1, BREAKER_OPEN: 2}
+
+# Políticas de combinación de varias fuentes (Election.ValidationPolicy)
+POLICY_ANY = 'ANY'
+POLICY_ALL = 'ALL'
+POLICY_FIRST = 'FIRST'
+
+# Latencias recientes por URL para calcular el umbral de cobertura
+_LATENCY_WINDOW = 200
+
+
+class CircuitOpen(requests.RequestException):
+    """El cortocircuito de la URL está abierto: no se consultó al validador."""
+
+    def __init__(self, url, retry_after):
+        super().__init__(f'Validador externo no disponible (cortocircuito abierto): {url}')
+        self.retry_after = retry_after
+
+
+_session = None
+_executor = None
+_fanout_executor = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Sesión compartida del proceso (el pool de urllib3 es seguro entre hilos)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=settings.EXTERNAL_VALIDATION_POOL_SIZE,
+                    pool_maxsize=settings.EXTERNAL_VALIDATION_POOL_SIZE,
+                    max_retries=0,
+                )
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _session = session
+    return _session
+
+
+def _get_executor():
+    """Hilos para las consultas con cobertura (la original y la de respaldo)."""
+    global _executor
+    if _executor is None:
+        with _session_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.EXTERNAL_VALIDATION_POOL_SIZE, thread_name_prefix='ext-validation'
+                )
+    return _executor
+
+
+def _get_fanout_executor():
+    """Hilos para consultar varias fuentes a la vez (separados de los de cobertura para no bloquearse)."""
+    global _fanout_executor
+    if _fanout_executor is None:
+        with _session_lock:
+            if _fanout_executor is None:
+                _fanout_executor = ThreadPoolExecutor(
+                    max_workers=settings.EXTERNAL_VALIDATION_POOL_SIZE, thread_name_prefix='ext-validation-fanout'
+                )
+    return _fanout_executor
+
+
+class _ValidatorState:
+    """Cortocircuito y ventana de latencias de una URL."""
+
+    def __init__(self, url):
+        self.labels = {'url': url}
+        self.state = BREAKER_CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.latencies = deque(maxlen=_LATENCY_WINDOW)
+        self.lock = threading.Lock()
+
+    def _set_state(self, state):
+        self.state = state
+        metrics.set_gauge('external_validator_breaker_state', _STATE_GAUGE[state], self.labels)
+
+    def before_call(self):
+        """Retorna None si la consulta puede hacerse, o los segundos hasta el próximo intento."""
+        with self.lock:
+            if self.state == BREAKER_OPEN:
+                remaining = self.opened_at + settings.EXTERNAL_VALIDATION_BREAKER_RESET_SECONDS - time.monotonic()
+                if remaining > 0:
+                    return max(1, math.ceil(remaining))
+                self._set_state(BREAKER_HALF_OPEN)
+            if self.state == BREAKER_HALF_OPEN:
+                if self.probe_in_flight:
+                    return 1
+                self.probe_in_flight = True
+            return None
+
+    def after_call(self, outage):
+        with self.lock:
+            self.probe_in_flight = False
+            if not outage:
+                self.failures = 0
+                if self.state != BREAKER_CLOSED:
+                    self._set_state(BREAKER_CLOSED)
+                return
+            self.failures += 1
+            threshold = settings.EXTERNAL_VALIDATION_BREAKER_FAILURES
+            if self.state == BREAKER_HALF_OPEN or (threshold and self.failures >= threshold):
+                self.opened_at = time.monotonic()
+                self._set_state(BREAKER_OPEN)
+
+    def record_latency(self, seconds):
+        with self.lock:
+            self.latencies.append(seconds)
+
+    def hedge_delay(self):
+        """Percentil configurado de las latencias recientes, o None si no hay cobertura."""
+        percentile = settings.EXTERNAL_VALIDATION_HEDGE_PERCENTILE
+        if not percentile:
+            return None
+        with self.lock:
+            if len(self.latencies) < settings.EXTERNAL_VALIDATION_HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile))]
+
+
+_validators = {}
+_validators_lock = threading.Lock()
+
+
+def _state_for(url):
+    state = _validators.get(url)
+    if state is None:
+        with _validators_lock:
+            state = _validators.setdefault(url, _ValidatorState(url))
+    return state
+
+
+def breaker_state(url):
+    """Estado del cortocircuito de la URL ('closed', 'half_open' u 'open')."""
+    state = _validators.get(url)
+    return state.state if state is not None else BREAKER_CLOSED
+
+
+def reset_session():
+    """Cierra la sesión y los hilos y olvida cortocircuitos y latencias."""
+    global _session, _executor, _fanout_executor
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        for executor in (_executor, _fanout_executor):
+            if executor is not None:
+                executor.shutdown(wait=False)
+        _session = _executor = _fanout_executor = None
+    with _validators_lock:
+        _validators.clear()
+
+
+@receiver(setting_changed)
+def _reset_on_settings_change(setting, **kwargs):
+    if setting.startswith('EXTERNAL_VALIDATION_'):
+        reset_session()
+
+
+def _is_outage(error):
+    """Las caídas cuentan para el cortocircuito; un 4xx es una respuesta válida del servicio."""
+    response = getattr(error, 'response', None)
+    return response is None or response.status_code >= 500
+
+
+def _post(url, email, validator):
+    started = time.monotonic()
+    try:
+        response = get_session().post(
+            url,
+            json={'email': email},
+            timeout=(settings.EXTERNAL_VALIDATION_CONNECT_TIMEOUT, settings.EXTERNAL_VALIDATION_READ_TIMEOUT),
+        )
+        response.raise_for_status() # Lanza error para códigos 4xx/5xx
+        try:
+            # Asumimos que la respuesta tiene un campo 'is_eligible'
+            return bool(response.json().get('is_eligible', False))
+        except (ValueError, AttributeError) as e:
+            raise requests.RequestException(f'Respuesta inválida del validador externo: {e}')
+    finally:
+        validator.record_latency(time.monotonic() - started)
+
+
+def _hedged_post(url, email, validator, delay):
+    """Lanza la consulta y, si no responde en 'delay' segundos, una segunda. Vale la primera respuesta correcta."""
+    executor = _get_executor()
+    pending = {executor.submit(_post, url, email, validator)}
+    done, pending = wait(pending, timeout=delay)
+    if not done:
+        metrics.increment('external_validator_hedged_total', validator.labels)
+        pending.add(executor.submit(_post, url, email, validator))
+
+    first_error = None
+    while True:
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            first_error = first_error or future.exception()
+        if not pending:
+            raise first_error
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+
+def check_external_eligibility(url, email):
+    """
+    Consulta al validador externo si el email puede votar. Retorna True/False.
+    Lanza requests.RequestException ante errores de red, timeouts, códigos 4xx/5xx
+    o una respuesta que no es JSON, y CircuitOpen (sin consultar) si el
+    cortocircuito de la URL está abierto.
+    """
+    validator = _state_for(url)
+    retry_after = validator.before_call()
+    if retry_after is not None:
+        metrics.increment('external_validator_fast_failures_total', validator.labels)
+        raise CircuitOpen(url, retry_after)
+
+    delay = validator.hedge_delay()
+    try:
+        if delay is None:
+            eligible = _post(url, email, validator)
+        else:
+            eligible = _hedged_post(url, email, validator, delay)
+    except requests.RequestException as e:
+        outage = _is_outage(e)
+        validator.after_call(outage)
+        metrics.increment('external_validator_requests_total', {**validator.labels, 'outcome': 'outage' if outage else 'error'})
+        raise
+    validator.after_call(False)
+    metrics.increment('external_validator_requests_total', {**validator.labels, 'outcome': 'ok'})
+    return eligible
+
+
+def check_sources(urls, email, policy=POLICY_ANY):
+    """
+    Consulta varias fuentes en paralelo y combina sus respuestas:
+    - ANY:   habilitado si alguna responde True (decide en cuanto llega un True).
+    - ALL:   habilitado si todas responden True (decide en cuanto llega un False).
+    - FIRST: decide la primera fuente que responde correctamente.
+    Si los errores impiden decidir, relanza el primero (RequestException).
+    """
+    if len(urls) == 1:
+        return check_external_eligibility(urls[0], email)
+
+    executor = _get_fanout_executor()
+    pending = {executor.submit(check_external_eligibility, url, email) for url in urls}
+    first_error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            error = future.exception()
+            if error is not None:
+                first_error = first_error or error
+                continue
+            eligible = future.result()
+            if policy == POLICY_FIRST:
+                return eligible
+            if policy == POLICY_ANY and eligible:
+                return True
+            if policy == POLICY_ALL and not eligible:
+                return False
+    # Todas respondieron (o fallaron) sin una respuesta decisiva
+    if first_error is not None:
+        raise first_error
+    return policy == POLICY_ALL
+
+
+def check_election_eligibility(election, email):
+    """Decisión externa para la elección con todas sus fuentes y su política."""
+    return check_sources(election.validation_sources, email, election.ext_validation_policy)
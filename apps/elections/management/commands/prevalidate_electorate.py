@@ -0,0 +1,88 @@
+# apps/elections/management/commands/prevalidate_electorate.py
+# py manage.py prevalidate_electorate 12 --file emails.txt     (solo esos emails; "-" lee de stdin)
+# py manage.py prevalidate_electorate 12 --all-users           (todos los usuarios activos fuera del padrón; pide confirmación)
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.elections.models import Election
+from apps.elections.prevalidation import (
+    PREVALIDATION_BATCH_SIZE, PREVALIDATION_CONCURRENCY, candidate_users, prevalidate_electorate,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Valida contra las fuentes de validación externa, antes de la apertura, a los usuarios que aún no están en el padrón '
+        'y registra en bloque como votantes habilitados a los aceptados.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('election_id', type=int)
+        candidates = parser.add_mutually_exclusive_group()
+        candidates.add_argument('-f', '--file', default=None, help='Emails candidatos, uno por línea. Con "-" se lee de stdin.')
+        candidates.add_argument(
+            '--all-users', action='store_true',
+            help='Envía al validador externo los emails de todos los usuarios activos fuera del padrón.'
+        )
+        parser.add_argument(
+            '--no-input', '--noinput', action='store_false', dest='interactive',
+            help='No pide confirmación con --all-users.'
+        )
+        parser.add_argument('--batch-size', type=int, default=PREVALIDATION_BATCH_SIZE)
+        parser.add_argument('--concurrency', type=int, default=PREVALIDATION_CONCURRENCY, help='Consultas simultáneas al validador.')
+        parser.add_argument('--force', action='store_true', help='Permite ejecutarlo con la elección ya iniciada.')
+
+    def _read_emails(self, path):
+        try:
+            source = sys.stdin if path == '-' else open(path, encoding='utf-8')
+        except OSError as e:
+            raise CommandError(str(e))
+        with source:
+            return [line.strip() for line in source if line.strip() and not line.startswith('#')]
+
+    def _confirm_all_users(self, election, count):
+        self.stderr.write(self.style.WARNING(
+            f"Se enviarán los emails de {count} usuarios a: {', '.join(election.validation_sources)}"
+        ))
+        if input("Escriba 'si' para continuar: ").strip().lower() not in ('si', 'sí'):
+            raise CommandError('Pre-validación cancelada.')
+
+    def handle(self, *args, **options):
+        election = Election.objects.filter(pk=options['election_id']).first()
+        if election is None:
+            raise CommandError(f"La elección {options['election_id']} no existe.")
+        if not election.validation_sources:
+            raise CommandError('La elección no tiene fuentes de validación externa: no hay nada que pre-validar.')
+        if election.start_at <= timezone.now() and not options['force']:
+            raise CommandError('La elección ya comenzó. Use --force para pre-validar igualmente.')
+        if options['batch_size'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--batch-size y --concurrency deben ser positivos.')
+        # Cada consulta entrega el email a un tercero: los candidatos se eligen explícitamente
+        if not options['file'] and not options['all_users']:
+            raise CommandError('Indique los emails candidatos con --file, o --all-users para enviar los de todos los usuarios.')
+
+        if options['file']:
+            users = candidate_users(election, self._read_emails(options['file']))
+        else:
+            users = candidate_users(election, all_users=True)
+            if options['interactive']:
+                self._confirm_all_users(election, users.count())
+
+        def progress(totals):
+            self.stderr.write(
+                f"{totals['checked']} consultados: {totals['allowed']} habilitados, "
+                f"{totals['rejected']} rechazados, {totals['errors']} errores"
+            )
+
+        totals = prevalidate_electorate(
+            election, users, batch_size=options['batch_size'], concurrency=options['concurrency'], on_batch=progress
+        )
+
+        style = self.style.WARNING if totals['errors'] else self.style.SUCCESS
+        self.stderr.write(style(
+            f"Pre-validación de '{election.title}' terminada: {totals['allowed']} votantes habilitados de "
+            f"{totals['checked']} consultados ({totals['rejected']} rechazados, {totals['errors']} con error; "
+            f"los rechazados y con error se validarán al votar)."
+        ))
@@ -0,0 +1,75 @@
+# apps/elections/management/commands/run_election_scheduler.py
+# py manage.py run_election_scheduler            (bucle; puede lanzarse en varios procesos, solo uno actúa)
+# py manage.py run_election_scheduler --once     (un ciclo, p. ej. desde cron)
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.utils import timezone
+
+from apps.elections.scheduler import make_holder_id, next_transition_at, release_lease, run_scheduler_once
+
+# Espera mínima del titular entre ciclos: una transición que no pudo aplicarse no lo deja girando sin pausa
+MIN_WAIT_SECONDS = 0.5
+
+
+class Command(BaseCommand):
+    help = (
+        'Abre y cierra las elecciones al llegar su fecha de inicio y de fin (DRAFT -> OPEN -> CLOSED) '
+        'y ejecuta los receptores de cierre. Un único proceso actúa a la vez gracias a una concesión en la base de datos.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Ejecuta un solo ciclo y termina.')
+        parser.add_argument(
+            '--interval', type=float, default=settings.ELECTION_SCHEDULER_INTERVAL_SECONDS,
+            help='Segundos máximos entre ciclos (antes si hay una transición más próxima).'
+        )
+
+    def _report(self, summary):
+        if summary is None:
+            self.stderr.write('Otro proceso tiene la concesión del planificador; este espera.')
+            return
+        if summary['opened'] or summary['closed']:
+            style = self.style.WARNING if summary['hook_errors'] else self.style.SUCCESS
+            self.stdout.write(style(
+                f"{timezone.now():%Y-%m-%d %H:%M:%S} abiertas: {summary['opened']} cerradas: {summary['closed']} "
+                f"(errores en receptores: {summary['hook_errors']})"
+            ))
+
+    def _wait_seconds(self, summary, interval):
+        """
+        Sin la concesión (summary None) se espera el intervalo completo: adelantar
+        el ciclo solo serviría para volver a pedirla. El titular duerme hasta la
+        próxima transición, entre MIN_WAIT_SECONDS e 'interval'.
+        """
+        if summary is None:
+            return interval
+        upcoming = next_transition_at()
+        if upcoming is None:
+            return interval
+        return min(interval, max(MIN_WAIT_SECONDS, (upcoming - timezone.now()).total_seconds()))
+
+    def handle(self, *args, **options):
+        if options['interval'] <= 0:
+            raise CommandError('--interval debe ser positivo.')
+        if options['interval'] >= settings.ELECTION_SCHEDULER_LEASE_SECONDS:
+            raise CommandError('--interval debe ser menor que ELECTION_SCHEDULER_LEASE_SECONDS o la concesión vencería entre ciclos.')
+
+        holder = make_holder_id()
+        if options['once']:
+            self._report(run_scheduler_once(holder))
+            release_lease(holder)
+            return
+
+        try:
+            while True:
+                close_old_connections()
+                summary = run_scheduler_once(holder)
+                self._report(summary)
+                time.sleep(self._wait_seconds(summary, options['interval']))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            release_lease(holder)
@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-19 06:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='election',
+            name='ext_validation_policy',
+            field=models.CharField(choices=[('ANY', 'Alguna fuente lo habilita'), ('ALL', 'Todas las fuentes lo habilitan'), ('FIRST', 'Decide la primera fuente que responde')], default='ANY', help_text='Cómo se combinan las respuestas cuando hay varias fuentes de validación.', max_length=10, verbose_name='política de validación externa'),
+        ),
+        migrations.AddField(
+            model_name='election',
+            name='ext_validation_sources',
+            field=models.JSONField(blank=True, default=list, help_text='Lista de URLs adicionales (p. ej. padrón de estudiantes y de personal) que se consultan en paralelo.', verbose_name='Fuentes de Validación Externa adicionales'),
+        ),
+    ]
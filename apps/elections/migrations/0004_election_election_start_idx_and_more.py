@@ -0,0 +1,27 @@
+# Generated by Django 6.0 on 2026-10-19 06:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0003_election_ext_validation_policy_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='election',
+            index=models.Index(fields=['-start_at', '-id'], name='election_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='election',
+            index=models.Index(fields=['status', '-start_at', '-id'], name='election_status_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='election',
+            index=models.Index(fields=['type', '-start_at', '-id'], name='election_type_start_idx'),
+        ),
+    ]
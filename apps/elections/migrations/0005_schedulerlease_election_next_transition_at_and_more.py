@@ -0,0 +1,37 @@
+# Generated by Django 6.0 on 2026-10-19 06:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0004_election_election_start_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SchedulerLease',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True, verbose_name='nombre')),
+                ('holder', models.CharField(max_length=255, verbose_name='titular')),
+                ('expires_at', models.DateTimeField(verbose_name='vence')),
+            ],
+            options={
+                'verbose_name': 'concesión del planificador',
+                'verbose_name_plural': 'concesiones del planificador',
+            },
+        ),
+        migrations.AddField(
+            model_name='election',
+            name='next_transition_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='próxima transición'),
+        ),
+        migrations.AddIndex(
+            model_name='election',
+            index=models.Index(condition=models.Q(('next_transition_at__isnull', False)), fields=['next_transition_at'], name='election_next_transition_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Backfill de la próxima transición automática para las elecciones existentes
+
+from django.db import migrations
+from django.db.models import F
+
+
+def backfill_next_transition_at(apps, schema_editor):
+    Election = apps.get_model('elections', 'Election')
+    Election.objects.filter(status='DRAFT').update(next_transition_at=F('start_at'))
+    Election.objects.filter(status='OPEN').update(next_transition_at=F('end_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0005_schedulerlease_election_next_transition_at_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_next_transition_at, migrations.RunPython.noop),
+    ]
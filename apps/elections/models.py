@@ -16,6 +16,12 @@ class Election(models.Model):
         CLOSED = 'CLOSED', _('Finalizada')
         ARCHIVED = 'ARCHIVED', _('Archivada')
 
+    # Cómo se combinan las respuestas de varias fuentes de validación externas
+    class ValidationPolicy(models.TextChoices):
+        ANY = 'ANY', _('Alguna fuente lo habilita')
+        ALL = 'ALL', _('Todas las fuentes lo habilitan')
+        FIRST = 'FIRST', _('Decide la primera fuente que responde')
+
     # Definición de Tipos de Elección
     class Type(models.TextChoices):
         PUBLIC = 'PUBLIC', _('Pública')
@@ -67,6 +73,24 @@ class Election(models.Model):
         null=True,
         help_text=_('URL del servicio que valida la elegibilidad del votante si no está en el padrón local.')
     )
+
+    ext_validation_sources = models.JSONField(
+        _('Fuentes de Validación Externa adicionales'),
+        default=list,
+        blank=True,
+        help_text=_('Lista de URLs adicionales (p. ej. padrón de estudiantes y de personal) que se consultan en paralelo.')
+    )
+
+    ext_validation_policy = models.CharField(
+        _('política de validación externa'),
+        max_length=10,
+        choices=ValidationPolicy.choices,
+        default=ValidationPolicy.ANY,
+        help_text=_('Cómo se combinan las respuestas cuando hay varias fuentes de validación.')
+    )
+    # Próximo cambio de estado automático (apertura si DRAFT, cierre si OPEN). Lo mantiene save().
+    next_transition_at = models.DateTimeField(_('próxima transición'), null=True, blank=True, editable=False)
+
     # Trazabilidad
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -75,6 +99,17 @@ class Election(models.Model):
         verbose_name = _('elección')
         verbose_name_plural = _('elecciones')
         ordering = ['-created_at']
+        indexes = [
+            # Listado paginado por cursor (start_at DESC, id DESC), con y sin filtros
+            models.Index(fields=['-start_at', '-id'], name='election_start_idx'),
+            models.Index(fields=['status', '-start_at', '-id'], name='election_status_start_idx'),
+            models.Index(fields=['type', '-start_at', '-id'], name='election_type_start_idx'),
+            # Planificador de estados: solo las elecciones con una transición pendiente
+            models.Index(
+                fields=['next_transition_at'], name='election_next_transition_idx',
+                condition=models.Q(next_transition_at__isnull=False)
+            ),
+        ]
 
     @property
     def is_active_or_finished(self):
@@ -84,6 +119,24 @@ class Election(models.Model):
         """
         return self.status in [self.Status.OPEN, self.Status.CLOSED]
     
+    @property
+    def validation_sources(self):
+        """URLs de validación externa en orden (ext_validation_url primero), sin repetidas."""
+        sources = [self.ext_validation_url] if self.ext_validation_url else []
+        for url in self.ext_validation_sources or []:
+            if url and url not in sources:
+                sources.append(url)
+        return sources
+
+    @property
+    def scheduled_transition(self):
+        """(estado siguiente, fecha) de la próxima transición automática, o None si no tiene."""
+        if self.status == self.Status.DRAFT:
+            return self.Status.OPEN, self.start_at
+        if self.status == self.Status.OPEN:
+            return self.Status.CLOSED, self.end_at
+        return None
+
     def __str__(self):
         return f"{self.title} ({self.get_status_display()})"
 
@@ -100,4 +153,27 @@ class Election(models.Model):
 
     def save(self, *args, **kwargs):
         # self.full_clean()  # Asegura que se ejecute clean() antes de guardar
+        transition = self.scheduled_transition
+        self.next_transition_at = transition[1] if transition else None
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'status', 'start_at', 'end_at'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'next_transition_at'}
         super().save(*args, **kwargs)
+
+
+class SchedulerLease(models.Model):
+    """
+    Concesión con vencimiento que garantiza un único planificador activo entre
+    todos los procesos de la aplicación. Quien la tiene la renueva en cada
+    ciclo; si deja de hacerlo, otro proceso la toma al vencer.
+    """
+    name = models.CharField(_('nombre'), max_length=50, unique=True)
+    holder = models.CharField(_('titular'), max_length=255)
+    expires_at = models.DateTimeField(_('vence'))
+
+    class Meta:
+        verbose_name = _('concesión del planificador')
+        verbose_name_plural = _('concesiones del planificador')
+
+    def __str__(self):
+        return f"{self.name} | {self.holder} (hasta {self.expires_at:%Y-%m-%d %H:%M:%S})"
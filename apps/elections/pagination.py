@@ -0,0 +1,170 @@
+# apps/elections/pagination.py
+"""
+Paginación por clave (keyset) para los listados de elecciones.
+
+CursorPagination de DRF solo usa el primer campo de 'ordering' en la posición
+del cursor y resuelve los empates de ese campo con un desplazamiento (OFFSET)
+dentro del valor repetido. Aquí el cursor guarda el valor de todos los campos
+de 'ordering' de la última fila servida y cada página es una comparación de
+tuplas sobre el índice:
+
+    WHERE start_at < :k OR (start_at = :k AND id < :t)
+    ORDER BY start_at DESC, id DESC LIMIT n + 1
+
+sin OFFSET ni COUNT, al margen de lo profunda que sea la página o de cuántas
+elecciones empiecen a la vez. El último campo debe ser único.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def _encode_value(value):
+    # isoformat conserva los microsegundos (DjangoJSONEncoder los trunca a milisegundos)
+    return {'dt': value.isoformat()} if isinstance(value, datetime) else value
+
+
+def _decode_value(value, kind):
+    """Valor del cursor con el tipo de su campo (datetime o int); ValueError si no lo tiene."""
+    if kind is datetime:
+        if not isinstance(value, dict) or not isinstance(value.get('dt'), str):
+            raise ValueError(value)
+        parsed = parse_datetime(value['dt'])
+        if parsed is None:
+            raise ValueError(value)
+        return parsed
+    # bool es subclase de int, pero no es un id
+    if kind is int and isinstance(value, int) and not isinstance(value, bool):
+        return value
+    raise ValueError(value)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginación por clave sobre los campos de 'ordering' (el último, único).
+    'ordering_types' da el tipo de cada campo (datetime o int): un cursor con
+    otro tipo se rechaza como inválido antes de llegar a la consulta.
+    Sirve tanto para instancias como para filas de values().
+    Responde {'next', 'previous', 'results'} como CursorPagination.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering = ()
+    ordering_types = ()
+    invalid_cursor_message = _('Cursor inválido.')
+
+    def _fields(self):
+        return [(name.lstrip('-'), name.startswith('-')) for name in self.ordering]
+
+    def get_page_size(self, request):
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(requested, self.max_page_size) if requested > 0 else self.page_size
+
+    def decode_cursor(self, request):
+        """Retorna (posición, hacia atrás) o None en la primera página. Lanza NotFound si el cursor no es válido."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            values = data['p']
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError(values)
+            position = [_decode_value(value, kind) for value, kind in zip(values, self.ordering_types)]
+            reverse = bool(data.get('r'))
+        except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, position, reverse):
+        data = {'p': [_encode_value(value) for value in position]}
+        if reverse:
+            data['r'] = 1
+        encoded = base64.urlsafe_b64encode(json.dumps(data, separators=(',', ':')).encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _position(self, row):
+        if isinstance(row, dict):
+            return [row[name] for name, _descending in self._fields()]
+        return [getattr(row, name) for name, _descending in self._fields()]
+
+    def _beyond(self, position, reverse):
+        """Filas posteriores a 'position' en el orden de la página (comparación de tuplas)."""
+        condition, equal = Q(), {}
+        for (name, descending), value in zip(self._fields(), position):
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        position, reverse = cursor if cursor is not None else (None, False)
+
+        ordering = [
+            ('-' if descending != reverse else '') + name for name, descending in self._fields()
+        ]
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._beyond(position, reverse))
+
+        # Una fila de más indica si hay otra página en ese sentido
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+            # Hacia atrás: siempre se puede volver hacia delante desde donde se vino
+            self.has_next, self.has_previous = bool(rows), has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None and bool(rows)
+        self.rows = rows
+        return rows
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self._position(self.rows[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(self._position(self.rows[0]), reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+
+class ElectionCursorPagination(KeysetPagination):
+    """Listado de elecciones: las que empiezan más tarde primero, desempate por id."""
+    ordering = ('-start_at', '-id')
+    ordering_types = (datetime, int)
+
+
+class MyElectionCursorPagination(KeysetPagination):
+    """
+    "Mis elecciones": filas del padrón del usuario (values()) ordenadas por el
+    inicio de la elección, más recientes primero; desempate por election_id.
+    """
+    ordering = ('-start_at', '-election_id')
+    ordering_types = (datetime, int)
@@ -0,0 +1,133 @@
+# apps/elections/scheduler.py
+"""
+Planificador de estados de las elecciones: DRAFT -> OPEN en start_at y
+OPEN -> CLOSED en end_at.
+
+Cada elección guarda su próxima transición en next_transition_at (la mantiene
+Election.save()), con un índice parcial que solo contiene las pendientes: cada
+ciclo es un "WHERE next_transition_at <= ahora ORDER BY next_transition_at"
+sobre ese índice, sin recorrer la tabla.
+
+1.  Un solo proceso ejecuta el planificador a la vez: el que tiene la
+    SchedulerLease vigente, que la renueva en cada ciclo. Si muere, otro la
+    toma cuando vence (ELECTION_SCHEDULER_LEASE_SECONDS).
+2.  Cada transición es un UPDATE condicional sobre el estado y la fecha leídos:
+    si un administrador cambió la elección entretanto, se omite.
+3.  Tras cada transición se envían election_opened / election_closed
+    (apps.elections.signals). Los receptores corren en el proceso del
+    planificador; una elección con el plazo ya vencido al abrirse pasa
+    directamente a CLOSED y solo envía election_closed.
+
+Métricas (apps.core.metrics): election_scheduler_transitions_total (etiqueta
+'status') y election_scheduler_hook_errors_total.
+"""
+import os
+import socket
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.core.metrics import metrics
+from .config_cache import invalidate_election_config
+from .models import Election, SchedulerLease
+from .signals import election_closed, election_opened
+
+SCHEDULER_LEASE_NAME = 'election-status'
+SCHEDULER_BATCH_SIZE = 100
+
+
+def make_holder_id():
+    """Identificador único del proceso que pide la concesión."""
+    return f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+
+
+def acquire_lease(holder, name=SCHEDULER_LEASE_NAME, seconds=None):
+    """Toma o renueva la concesión. Retorna True si 'holder' la tiene hasta dentro de 'seconds'."""
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=seconds or settings.ELECTION_SCHEDULER_LEASE_SECONDS)
+    lease, created = SchedulerLease.objects.get_or_create(
+        name=name, defaults={'holder': holder, 'expires_at': expires_at}
+    )
+    if created:
+        return True
+    # UPDATE condicional: solo si ya es nuestra o la del otro proceso venció
+    return SchedulerLease.objects.filter(
+        Q(holder=holder) | Q(expires_at__lte=now), name=name
+    ).update(holder=holder, expires_at=expires_at) == 1
+
+
+def release_lease(holder, name=SCHEDULER_LEASE_NAME):
+    """Libera la concesión (si sigue siendo nuestra) para que otro proceso la tome sin esperar."""
+    SchedulerLease.objects.filter(name=name, holder=holder).update(expires_at=timezone.now())
+
+
+def next_transition_at():
+    """Fecha de la próxima transición pendiente, o None."""
+    return (
+        Election.objects.filter(next_transition_at__isnull=False)
+        .order_by('next_transition_at').values_list('next_transition_at', flat=True).first()
+    )
+
+
+def _send(signal, election):
+    errors = 0
+    for _receiver, response in signal.send_robust(sender=Election, election=election):
+        if isinstance(response, Exception):
+            errors += 1
+    if errors:
+        metrics.increment('election_scheduler_hook_errors_total', amount=errors)
+    return errors
+
+
+def _transition(election, now):
+    """Aplica la transición vencida de la elección. Retorna el nuevo estado o None si otro la cambió."""
+    target = Election.Status.OPEN if election.status == Election.Status.DRAFT else Election.Status.CLOSED
+    if target == Election.Status.OPEN and election.end_at <= now:
+        target = Election.Status.CLOSED
+    following = election.end_at if target == Election.Status.OPEN else None
+
+    updated = Election.objects.filter(
+        pk=election.pk, status=election.status, next_transition_at=election.next_transition_at
+    ).update(status=target, next_transition_at=following, updated_at=now)
+    if not updated:
+        return None
+    # El UPDATE no envía post_save
+    invalidate_election_config(election.pk)
+    election.status, election.next_transition_at, election.updated_at = target, following, now
+    metrics.increment('election_scheduler_transitions_total', {'status': target})
+    return target
+
+
+def run_due_transitions(now=None, batch_size=SCHEDULER_BATCH_SIZE):
+    """
+    Aplica todas las transiciones vencidas (en lotes, por orden de fecha) y
+    ejecuta sus receptores. Retorna {'opened': [ids], 'closed': [ids], 'hook_errors': n}.
+    Debe llamarlo solo quien tiene la concesión (run_scheduler_once).
+    """
+    now = now or timezone.now()
+    summary = {'opened': [], 'closed': [], 'hook_errors': 0}
+    while True:
+        due = list(
+            Election.objects.filter(next_transition_at__lte=now).order_by('next_transition_at', 'pk')[:batch_size]
+        )
+        for election in due:
+            target = _transition(election, now)
+            if target == Election.Status.OPEN:
+                summary['opened'].append(election.pk)
+                summary['hook_errors'] += _send(election_opened, election)
+            elif target == Election.Status.CLOSED:
+                summary['closed'].append(election.pk)
+                summary['hook_errors'] += _send(election_closed, election)
+        # Las omitidas ya no cumplen el filtro (otro las cambió), así que el bucle termina
+        if len(due) < batch_size:
+            return summary
+
+
+def run_scheduler_once(holder, now=None):
+    """Un ciclo del planificador. Retorna el resumen de run_due_transitions, o None sin la concesión."""
+    if not acquire_lease(holder):
+        return None
+    return run_due_transitions(now=now)
@@ -14,6 +14,11 @@ class ElectionSerializer(serializers.ModelSerializer):
     # Campo de solo lectura para mostrar el tipo en formato legible
     type_display = serializers.CharField(source='get_type_display', read_only=True)
     
+    # URLs adicionales de validación externa (se consultan en paralelo con ext_validation_url)
+    ext_validation_sources = serializers.ListField(
+        child=serializers.URLField(max_length=500), required=False, max_length=10
+    )
+
     def validate(self, data):
         # Obtiene las fechas validadas o las existentes si es un PATCH
         start_at = data.get('start_at', self.instance.start_at if self.instance else None)
@@ -42,6 +47,8 @@ class ElectionSerializer(serializers.ModelSerializer):
             'status', 
             'status_display',
             'ext_validation_url',  # <--- CAMBIO: AÑADIDO
+            'ext_validation_sources',
+            'ext_validation_policy',
             'created_at', 
             'updated_at'
         )
@@ -53,4 +60,29 @@ class ElectionSerializer(serializers.ModelSerializer):
             'type_display',
             'created_at', 
             'updated_at'
-        )
\ No newline at end of file
+        )
+
+
+class ElectionListFilterSerializer(serializers.Serializer):
+    """
+    Filtros del listado de elecciones (query params). Todos opcionales.
+    El rango de fechas se aplica sobre start_at.
+    """
+    status = serializers.ChoiceField(choices=Election.Status.choices, required=False)
+    type = serializers.ChoiceField(choices=Election.Type.choices, required=False)
+    start_after = serializers.DateTimeField(required=False)
+    start_before = serializers.DateTimeField(required=False)
+
+    def validate(self, data):
+        if 'start_after' in data and 'start_before' in data and data['start_before'] <= data['start_after']:
+            raise serializers.ValidationError({
+                'start_before': 'Debe ser posterior a start_after.'
+            })
+        return data
+
+
+class MyElectionFilterSerializer(serializers.Serializer):
+    """Filtros de "mis elecciones" (query params). Todos opcionales."""
+    status = serializers.ChoiceField(choices=Election.Status.choices, required=False)
+    # default=None: en query params un booleano ausente no debe leerse como False
+    voted = serializers.BooleanField(required=False, allow_null=True, default=None)
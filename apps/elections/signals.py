@@ -0,0 +1,37 @@
+# apps/elections/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .config_cache import invalidate_election_config
+from .eligibility_cache import invalidate
+from .models import Election
+
+
+# Transiciones automáticas del planificador (apps.elections.scheduler).
+# Argumento: election (la instancia ya con su nuevo estado). Se envían fuera de
+# cualquier transacción y con send_robust: el fallo de un receptor no detiene
+# al planificador ni a los demás receptores.
+election_opened = Signal()
+election_closed = Signal()
+
+
+# Las decisiones externas guardadas y la configuración en caché dejan de valer
+# si la elección cambia (p. ej. otro ext_validation_url), se borra o una nueva
+# reutiliza su pk.
+
+@receiver(post_save, sender=Election)
+def invalidate_eligibility_on_election_save(sender, instance, **kwargs):
+    invalidate(election_id=instance.pk)
+    invalidate_election_config(instance.pk)
+
+
+@receiver(post_delete, sender=Election)
+def invalidate_eligibility_on_election_delete(sender, instance, **kwargs):
+    invalidate(election_id=instance.pk)
+    invalidate_election_config(instance.pk)
+
+
+@receiver(election_closed)
+def invalidate_eligibility_on_election_close(sender, election, **kwargs):
+    # Una elección cerrada ya no verifica elegibilidad
+    invalidate(election_id=election.pk)
@@ -8,12 +8,36 @@ from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
 from django.contrib.auth import get_user_model
+import base64
+import json
 import requests
+from django.conf import settings
+from django.test import override_settings
+from django.core.management import call_command, CommandError
+from io import StringIO
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 # Importa tus modelos y serializers
-from apps.elections.models import Election
+from apps.elections.models import Election, SchedulerLease
+from apps.elections.scheduler import acquire_lease, release_lease, run_due_transitions, run_scheduler_once
+from apps.elections.management.commands.run_election_scheduler import MIN_WAIT_SECONDS, Command as SchedulerCommand
+from apps.elections.signals import election_closed
+from apps.elections.config_cache import _version_key, get_election_config, reset_config_cache
+from django.core.cache import cache
 from apps.elections.serializers import ElectionSerializer
 from apps.voter.models import Voter # Necesario para los tests de elegibilidad
+from apps.core.metrics import metrics
+from apps.elections import eligibility_cache
+from apps.elections.eligibility_cache import get_decision, invalidate, reset_cache, store_decision
+from apps.candidates.models import Candidate
+from apps.votes.models import VoteRecord
+from apps.votes.receipts import verify_receipt
+from apps.elections.external import (
+    BREAKER_CLOSED, BREAKER_OPEN, POLICY_ALL, POLICY_ANY, POLICY_FIRST,
+    breaker_state, check_external_eligibility, check_sources, reset_session,
+)
+import time
 
 User = get_user_model()
 
@@ -23,6 +47,8 @@ class ElectionAPITests(APITestCase):
         """
         Configuración inicial: crea usuarios y URLs.
         """
+        reset_session() # Cortocircuitos y latencias de los validadores externos limpios
+        metrics.reset()
         # 1. Creación de Usuarios de Prueba
         self.staff_user = User.objects.create_user(
             email='admin@test.com', name='Admin', password='pass', is_staff=True
@@ -116,12 +142,128 @@ class ElectionAPITests(APITestCase):
         response = self.client.get(self.list_create_url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.data['results']), 2)
         
     def test_list_elections_unauthenticated_unauthorized(self):
         """Prueba que un usuario no autenticado no puede listar (401)."""
         response = self.client.get(self.list_create_url)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def _create_elections(self, count, **extra):
+        base = timezone.now() + timedelta(days=30)
+        return [
+            Election.objects.create(
+                owner=self.staff_user, title=f'Elección {i}',
+                start_at=base + timedelta(hours=i), end_at=base + timedelta(days=7, hours=i), **extra
+            )
+            for i in range(count)
+        ]
+
+    def test_list_elections_cursor_pagination(self):
+        """Prueba que el cursor recorre todas las elecciones, más recientes primero, sin repetir."""
+        self._create_elections(4)
+        self.client.force_authenticate(user=self.normal_user)
+
+        first = self.client.get(self.list_create_url, {'page_size': 3})
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(first.data['results']), 3)
+        self.assertIsNotNone(first.data['next'])
+        self.assertIsNone(first.data['previous'])
+
+        second = self.client.get(first.data['next'])
+        self.assertEqual(len(second.data['results']), 2)
+        self.assertIsNone(second.data['next'])
+
+        starts = [e['start_at'] for e in first.data['results'] + second.data['results']]
+        ids = {e['id'] for e in first.data['results'] + second.data['results']}
+        self.assertEqual(starts, sorted(starts, reverse=True))
+        self.assertEqual(len(ids), 5)
+
+    def test_list_elections_cursor_pagination_with_tied_start(self):
+        """Con varias elecciones empezando a la vez, el cursor recorre hacia delante y hacia atrás sin saltos ni OFFSET."""
+        base = timezone.now() + timedelta(days=3)
+        tied = [
+            Election.objects.create(owner=self.staff_user, title=f'Empate {i}', start_at=base, end_at=base + timedelta(days=1))
+            for i in range(5)
+        ]
+        expected = [e.pk for e in sorted(tied, key=lambda e: -e.pk)] + [self.election.pk]
+        self.client.force_authenticate(user=self.normal_user)
+
+        pages, url, params = [], self.list_create_url, {'page_size': 2}
+        while url:
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.get(url, params)
+            self.assertNotIn('OFFSET', captured.captured_queries[-1]['sql'].upper())
+            pages.append(response)
+            url, params = response.data['next'], None
+        self.assertEqual([e['id'] for page in pages for e in page.data['results']], expected)
+
+        back = self.client.get(pages[-1].data['previous'])
+        self.assertEqual([e['id'] for e in back.data['results']], expected[2:4])
+        back = self.client.get(back.data['previous'])
+        self.assertEqual([e['id'] for e in back.data['results']], expected[0:2])
+        self.assertIsNone(back.data['previous'])
+        self.assertEqual(self.client.get(back.data['next']).data['results'], pages[1].data['results'])
+
+    def test_list_elections_invalid_cursor_404(self):
+        self.client.force_authenticate(user=self.normal_user)
+        response = self.client.get(self.list_create_url, {'cursor': 'no-es-un-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_elections_mistyped_cursor_404(self):
+        """Un cursor bien formado pero con tipos equivocados es inválido (404), no un 500."""
+        self.client.force_authenticate(user=self.normal_user)
+        for position in ([{'dt': timezone.now().isoformat()}, 'abc'], [5, 1]):
+            cursor = base64.urlsafe_b64encode(json.dumps({'p': position}).encode('ascii')).decode('ascii')
+            for url in (self.list_create_url, reverse('elections:mine')):
+                response = self.client.get(url, {'cursor': cursor})
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, (url, position))
+
+    def test_list_elections_filters(self):
+        """Prueba los filtros por estado, tipo y rango de inicio."""
+        opened = self._create_elections(2, status=Election.Status.OPEN, type=Election.Type.PUBLIC)
+        self.client.force_authenticate(user=self.normal_user)
+
+        response = self.client.get(self.list_create_url, {'status': Election.Status.OPEN})
+        self.assertEqual({e['id'] for e in response.data['results']}, {e.pk for e in opened})
+
+        response = self.client.get(self.list_create_url, {'type': Election.Type.PUBLIC, 'status': Election.Status.OPEN})
+        self.assertEqual(len(response.data['results']), 2)
+
+        response = self.client.get(self.list_create_url, {
+            'start_after': opened[1].start_at.isoformat(),
+            'start_before': (opened[1].start_at + timedelta(minutes=1)).isoformat(),
+        })
+        self.assertEqual([e['id'] for e in response.data['results']], [opened[1].pk])
+
+    def test_list_elections_invalid_filters(self):
+        """Prueba que un filtro inválido devuelve 400."""
+        self.client.force_authenticate(user=self.normal_user)
+        response = self.client.get(self.list_create_url, {'status': 'NOPE'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('status', response.data)
+
+        now = timezone.now()
+        response = self.client.get(self.list_create_url, {
+            'start_after': now.isoformat(), 'start_before': (now - timedelta(days=1)).isoformat()
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('start_before', response.data)
+
+    def test_list_elections_constant_queries(self):
+        """Prueba que el listado hace una sola consulta por página, sin importar cuántas filas ni dueños."""
+        for i in range(5):
+            owner = User.objects.create_user(email=f'owner{i}@test.com', name=f'Owner {i}', password='pass')
+            Election.objects.create(
+                owner=owner, title=f'De {i}', start_at=timezone.now() + timedelta(days=2),
+                end_at=timezone.now() + timedelta(days=3)
+            )
+        self.client.force_authenticate(user=self.normal_user)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_create_url)
+        self.assertEqual(len(response.data['results']), 6)
+        self.assertEqual({e['owner_name'] for e in response.data['results']} - {'Admin'}, {f'Owner {i}' for i in range(5)})
         
     # =============================================================
     # TESTS: DETALLE (GET/PUT/DELETE /api/v1/elections/<pk>/)
@@ -167,8 +309,8 @@ class ElectionAPITests(APITestCase):
     # TESTS: ELEGIBILIDAD (GET /api/v1/elections/<pk>/verify-eligibility/)
     # =============================================================
 
-    @patch('apps.elections.views.requests')
-    def test_verify_eligibility_no_voter_record_no_ext_url(self, mock_requests):
+    @patch('apps.elections.external.get_session')
+    def test_verify_eligibility_no_voter_record_no_ext_url(self, mock_get_session):
         """Prueba Case C: No hay registro local y no hay URL externa."""
         # Usuario normal no tiene registro en Voter
         self.client.force_authenticate(user=self.normal_user)
@@ -179,7 +321,7 @@ class ElectionAPITests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertFalse(response.data['eligible'])
         self.assertIn('No está en el padrón', response.data['reason'])
-        mock_requests.post.assert_not_called()
+        mock_get_session.return_value.post.assert_not_called()
 
     def test_verify_eligibility_local_allowed(self):
         """Prueba Case 1: Registro local permitido y no ha votado."""
@@ -211,8 +353,23 @@ class ElectionAPITests(APITestCase):
         self.assertFalse(response.data['eligible'])
         self.assertIn('Ya ha votado', response.data['reason'])
         
-    @patch('apps.elections.views.requests')
-    def test_verify_eligibility_external_success_and_save(self, mock_requests):
+    def test_verify_eligibility_known_voter_skips_transaction(self):
+        """Un votante que el prefiltro ya conoce se responde sin consultas ni select_for_update."""
+        Voter.objects.create(
+            election=self.election, user=self.normal_user, allowed=True, voted=True
+        )
+        self.client.force_authenticate(user=self.normal_user)
+        verify_url = reverse(self.verify_eligibility_url_name, kwargs={'election_pk': self.election.pk})
+        self.client.get(verify_url) # Carga perezosa del prefiltro
+
+        with self.assertNumQueries(0):
+            response = self.client.get(verify_url)
+
+        self.assertFalse(response.data['eligible'])
+        self.assertIn('Ya ha votado', response.data['reason'])
+
+    @patch('apps.elections.external.get_session')
+    def test_verify_eligibility_external_success_and_save(self, mock_get_session):
         """Prueba Case 3/4: Llama a API externa, es elegible, y se crea registro Voter."""
         
         # 1. Configura la Elección con una URL Externa
@@ -223,7 +380,7 @@ class ElectionAPITests(APITestCase):
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = {'is_eligible': True}
-        mock_requests.post.return_value = mock_response
+        mock_get_session.return_value.post.return_value = mock_response
 
         # 3. Ejecuta la prueba
         self.client.force_authenticate(user=self.normal_user)
@@ -236,10 +393,11 @@ class ElectionAPITests(APITestCase):
         self.assertTrue(response.data['eligible'])
         self.assertEqual(response.data['source'], 'external')
         
-        # 5. Verifica que la llamada externa se hizo correctamente
-        mock_requests.post.assert_called_once_with(
+        # 5. Verifica que la llamada externa se hizo correctamente (sesión compartida con timeouts)
+        mock_get_session.return_value.post.assert_called_once_with(
             self.election.ext_validation_url, 
-            json={'email': self.normal_user.email}
+            json={'email': self.normal_user.email},
+            timeout=(settings.EXTERNAL_VALIDATION_CONNECT_TIMEOUT, settings.EXTERNAL_VALIDATION_READ_TIMEOUT)
         )
         # 6. Verifica que el registro Voter se haya creado
         self.assertTrue(Voter.objects.filter(
@@ -249,15 +407,15 @@ class ElectionAPITests(APITestCase):
             ext_verified=True
         ).exists())
 
-    @patch('apps.elections.views.requests')
-    def test_verify_eligibility_external_api_failure(self, mock_requests):
+    @patch('apps.elections.external.get_session')
+    def test_verify_eligibility_external_api_failure(self, mock_get_session):
         """Prueba que el error de la API externa se maneje correctamente (503)."""
         
         self.election.ext_validation_url = 'http://mock.external.validator/check/'
         self.election.save()
         
         # Simula un error de conexión/red o timeout
-        mock_requests.post.side_effect = requests.exceptions.RequestException("Network Error")
+        mock_get_session.return_value.post.side_effect = requests.exceptions.RequestException("Network Error")
 
         self.client.force_authenticate(user=self.normal_user)
         verify_url = reverse(self.verify_eligibility_url_name, kwargs={'election_pk': self.election.pk})
@@ -267,4 +425,600 @@ class ElectionAPITests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
         self.assertFalse(response.data['eligible'])
         self.assertIn('Error al contactar el servicio', response.data['reason'])
-        self.assertFalse(Voter.objects.filter(user=self.normal_user).exists())
\ No newline at end of file
+        self.assertFalse(Voter.objects.filter(user=self.normal_user).exists())
+
+    @patch('apps.elections.external.get_session')
+    def test_verify_eligibility_external_call_outside_transaction(self, mock_get_session):
+        """La API externa se consulta sin transacción abierta; una respuesta no JSON es un 503."""
+        self.election.ext_validation_url = 'http://mock.external.validator/check/'
+        self.election.save()
+        baseline = len(connection.atomic_blocks) # Bloques del propio TestCase
+        depth_during_call = []
+
+        def slow_validator(*args, **kwargs):
+            depth_during_call.append(len(connection.atomic_blocks))
+            mock_response = MagicMock()
+            mock_response.json.side_effect = ValueError('no es JSON')
+            return mock_response
+        mock_get_session.return_value.post.side_effect = slow_validator
+
+        self.client.force_authenticate(user=self.normal_user)
+        verify_url = reverse(self.verify_eligibility_url_name, kwargs={'election_pk': self.election.pk})
+        response = self.client.get(verify_url)
+
+        self.assertEqual(depth_during_call, [baseline])
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertFalse(Voter.objects.filter(user=self.normal_user).exists())
+
+    # =============================================================
+    # TESTS: CACHÉ DE ELEGIBILIDAD EXTERNA
+    # =============================================================
+
+    def _validator_answers(self, mock_get_session, is_eligible):
+        self.election.ext_validation_url = 'http://mock.external.validator/check/'
+        self.election.save()
+        reset_cache()
+        metrics.reset()
+        mock_response = MagicMock()
+        mock_response.json.return_value = {'is_eligible': is_eligible}
+        mock_get_session.return_value.post.return_value = mock_response
+        self.client.force_authenticate(user=self.normal_user)
+        return reverse(self.verify_eligibility_url_name, kwargs={'election_pk': self.election.pk})
+
+    @patch('apps.elections.external.get_session')
+    def test_negative_decision_is_cached(self, mock_get_session):
+        """Un rechazo externo se recuerda: las recargas no vuelven a llamar al validador."""
+        verify_url = self._validator_answers(mock_get_session, False)
+
+        first = self.client.get(verify_url)
+        second = self.client.get(verify_url)
+
+        self.assertIn('Rechazado por el validador externo', first.data['reason'])
+        self.assertEqual(second.data, first.data)
+        mock_get_session.return_value.post.assert_called_once()
+        self.assertEqual(metrics.get('eligibility_cache_hits_total', {'decision': 'rejected'}), 1)
+        self.assertEqual(metrics.get('eligibility_cache_misses_total'), 1)
+
+    @patch('apps.elections.external.get_session')
+    @override_settings(ELIGIBILITY_CACHE_NEGATIVE_TTL=0)
+    def test_negative_ttl_zero_disables_caching(self, mock_get_session):
+        verify_url = self._validator_answers(mock_get_session, False)
+
+        self.client.get(verify_url)
+        self.client.get(verify_url)
+
+        self.assertEqual(mock_get_session.return_value.post.call_count, 2)
+
+    @patch('apps.elections.external.get_session')
+    def test_eligibility_cache_admin_stats_and_invalidation(self, mock_get_session):
+        """Solo administradores: estadísticas de aciertos e invalidación por elección."""
+        verify_url = self._validator_answers(mock_get_session, False)
+        self.client.get(verify_url)
+        self.client.get(verify_url)
+        cache_url = reverse('elections:eligibility-cache')
+
+        self.assertEqual(self.client.get(cache_url).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.delete(cache_url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.staff_user)
+        stats = self.client.get(cache_url)
+        self.assertEqual(stats.status_code, status.HTTP_200_OK)
+        self.assertEqual((stats.data['hits'], stats.data['misses'], stats.data['entries']), (1, 1, 1))
+        self.assertEqual(stats.data['hit_ratio'], 0.5)
+        self.assertEqual(stats.data['scope'], 'process')
+
+        response = self.client.delete(f'{cache_url}?election={self.election.pk}&email=VOTER@test.com')
+        # La caché de Django de los tests es LocMemCache: la invalidación no sale de este proceso
+        self.assertEqual(response.data, {'invalidated': 1, 'scope': 'process'})
+
+        self.client.force_authenticate(user=self.normal_user)
+        self.client.get(verify_url)
+        self.assertEqual(mock_get_session.return_value.post.call_count, 2)
+
+    @patch('apps.elections.external.get_session')
+    def test_eligibility_cache_invalidation_during_validator_call_is_kept(self, mock_get_session):
+        """Una invalidación que llega mientras el validador responde no queda deshecha por esa respuesta."""
+        verify_url = self._validator_answers(mock_get_session, False)
+        answer = mock_get_session.return_value.post.return_value
+
+        def slow_validator(*args, **kwargs):
+            invalidate(election_id=self.election.pk) # DELETE del administrador durante la consulta
+            return answer
+        mock_get_session.return_value.post.side_effect = slow_validator
+
+        self.client.get(verify_url)
+        self.assertIsNone(get_decision(self.election.pk, 'voter@test.com'))
+        self.client.get(verify_url)
+
+        self.assertEqual(mock_get_session.return_value.post.call_count, 2)
+
+    def test_eligibility_cache_invalidation_reaches_other_processes(self):
+        """Otro proceso (su copia local intacta) deja de usar la decisión al cambiar la generación compartida."""
+        reset_cache()
+        store_decision(self.election.pk, 'voter@test.com', True)
+        store_decision(self.election.pk, 'otro@test.com', False)
+        other_process_entries = dict(eligibility_cache._entries)
+
+        invalidate(email='VOTER@test.com')
+        eligibility_cache._entries.update(other_process_entries) # Simula la copia local de otro proceso
+
+        self.assertIsNone(get_decision(self.election.pk, 'voter@test.com'))
+        self.assertFalse(get_decision(self.election.pk, 'otro@test.com'))
+
+    # =============================================================
+    # TESTS: PRE-VALIDACIÓN DEL ELECTORADO (py manage.py prevalidate_electorate)
+    # =============================================================
+
+    @patch('apps.elections.external.get_session')
+    def test_prevalidate_electorate_enrolls_accepted_users(self, mock_get_session):
+        """Los aceptados quedan en el padrón; los rechazados y los errores no."""
+        self.election.ext_validation_url = 'http://mock.external.validator/check/'
+        self.election.save()
+        for name in ('ana', 'beto', 'caro'):
+            User.objects.create_user(email=f'{name}@uni.edu', name=name, password='pass')
+        Voter.objects.create(election=self.election, user=self.staff_user, allowed=False) # Ya en el padrón: no se consulta
+
+        def validator(url, json, timeout):
+            if json['email'] == 'caro@uni.edu':
+                raise requests.exceptions.ConnectTimeout('timeout')
+            response = MagicMock()
+            response.json.return_value = {'is_eligible': json['email'] != 'beto@uni.edu'}
+            return response
+        mock_get_session.return_value.post.side_effect = validator
+
+        call_command('prevalidate_electorate', self.election.pk, '--all-users', '--no-input', '--batch-size', '2', stderr=StringIO())
+
+        consulted = sorted(c.kwargs['json']['email'] for c in mock_get_session.return_value.post.call_args_list)
+        self.assertEqual(consulted, ['ana@uni.edu', 'beto@uni.edu', 'caro@uni.edu', 'voter@test.com'])
+        enrolled = set(Voter.objects.filter(election=self.election, allowed=True, ext_verified=True).values_list('user__email', flat=True))
+        self.assertEqual(enrolled, {'ana@uni.edu', 'voter@test.com'})
+        self.assertFalse(Voter.objects.get(election=self.election, user=self.staff_user).allowed)
+
+        # Al abrir, la elegibilidad es una consulta local
+        self.client.force_authenticate(user=self.normal_user)
+        response = self.client.get(reverse(self.verify_eligibility_url_name, kwargs={'election_pk': self.election.pk}))
+        self.assertEqual(response.data['source'], 'internal')
+        self.assertEqual(mock_get_session.return_value.post.call_count, 4)
+
+    def test_prevalidate_electorate_refuses_started_election(self):
+        self.election.ext_validation_url = 'http://mock.external.validator/check/'
+        self.election.start_at = timezone.now() - timedelta(minutes=1)
+        self.election.save()
+
+        with self.assertRaises(CommandError):
+            call_command('prevalidate_electorate', self.election.pk, '--all-users', '--no-input', stderr=StringIO())
+
+    @patch('apps.elections.external.get_session')
+    def test_prevalidate_electorate_requires_explicit_candidates(self, mock_get_session):
+        """Sin --file ni --all-users no se envía ningún email; --all-users pide confirmación."""
+        self.election.ext_validation_url = 'http://mock.external.validator/check/'
+        self.election.save()
+
+        with self.assertRaises(CommandError):
+            call_command('prevalidate_electorate', self.election.pk, stderr=StringIO())
+        with patch('builtins.input', return_value='no') as prompt, self.assertRaises(CommandError):
+            call_command('prevalidate_electorate', self.election.pk, '--all-users', stderr=StringIO())
+
+        prompt.assert_called_once()
+        mock_get_session.return_value.post.assert_not_called()
+
+    # =============================================================
+    # TESTS: CORTOCIRCUITO Y COBERTURA DE VALIDADORES EXTERNOS
+    # =============================================================
+
+    @patch('apps.elections.external.get_session')
+    @override_settings(EXTERNAL_VALIDATION_BREAKER_FAILURES=2, EXTERNAL_VALIDATION_BREAKER_RESET_SECONDS=30)
+    def test_breaker_opens_and_fails_fast(self, mock_get_session):
+        """Tras las caídas configuradas se responde 503 con Retry-After sin llamar al validador."""
+        self.election.ext_validation_url = 'http://mock.external.validator/check/'
+        self.election.save()
+        mock_get_session.return_value.post.side_effect = requests.exceptions.ConnectTimeout('timeout')
+        self.client.force_authenticate(user=self.normal_user)
+        verify_url = reverse(self.verify_eligibility_url_name, kwargs={'election_pk': self.election.pk})
+
+        self.client.get(verify_url)
+        self.client.get(verify_url)
+        response = self.client.get(verify_url)
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '30')
+        self.assertEqual(mock_get_session.return_value.post.call_count, 2)
+        self.assertEqual(breaker_state(self.election.ext_validation_url), BREAKER_OPEN)
+        self.assertEqual(
+            metrics.get('external_validator_breaker_state', {'url': self.election.ext_validation_url}), 2
+        )
+
+    @patch('apps.elections.external.get_session')
+    @override_settings(EXTERNAL_VALIDATION_BREAKER_FAILURES=1, EXTERNAL_VALIDATION_BREAKER_RESET_SECONDS=0.05)
+    def test_breaker_half_open_probe_closes_on_success(self, mock_get_session):
+        """Pasado el tiempo de espera, una consulta de prueba correcta cierra el cortocircuito."""
+        url = 'http://mock.external.validator/check/'
+        ok = MagicMock()
+        ok.json.return_value = {'is_eligible': True}
+        mock_get_session.return_value.post.side_effect = [requests.exceptions.ConnectionError('down'), ok]
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            check_external_eligibility(url, 'a@uni.edu')
+        self.assertEqual(breaker_state(url), BREAKER_OPEN)
+        time.sleep(0.06)
+
+        self.assertTrue(check_external_eligibility(url, 'a@uni.edu'))
+        self.assertEqual(breaker_state(url), BREAKER_CLOSED)
+
+    @patch('apps.elections.external.get_session')
+    @override_settings(EXTERNAL_VALIDATION_BREAKER_FAILURES=1)
+    def test_client_errors_do_not_open_breaker(self, mock_get_session):
+        """Un 4xx es una respuesta del servicio, no una caída."""
+        url = 'http://mock.external.validator/check/'
+        bad_request = MagicMock()
+        bad_request.status_code = 400
+        bad_request.raise_for_status.side_effect = requests.exceptions.HTTPError('400', response=bad_request)
+        mock_get_session.return_value.post.return_value = bad_request
+
+        with self.assertRaises(requests.exceptions.HTTPError):
+            check_external_eligibility(url, 'a@uni.edu')
+        self.assertEqual(breaker_state(url), BREAKER_CLOSED)
+
+    @patch('apps.elections.external.get_session')
+    @override_settings(EXTERNAL_VALIDATION_HEDGE_PERCENTILE=0.5, EXTERNAL_VALIDATION_HEDGE_MIN_SAMPLES=2)
+    def test_slow_request_is_hedged(self, mock_get_session):
+        """Si la consulta supera el percentil de latencia, una segunda consulta responde antes."""
+        url = 'http://mock.external.validator/check/'
+        calls = []
+
+        def validator(url, json, timeout):
+            calls.append(json['email'])
+            if len(calls) == 3:
+                time.sleep(1) # La primera consulta con cobertura se queda colgada
+            response = MagicMock()
+            response.json.return_value = {'is_eligible': True}
+            return response
+        mock_get_session.return_value.post.side_effect = validator
+
+        check_external_eligibility(url, 'a@uni.edu')
+        check_external_eligibility(url, 'a@uni.edu')
+        started = time.monotonic()
+        self.assertTrue(check_external_eligibility(url, 'b@uni.edu'))
+
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(calls[2:], ['b@uni.edu', 'b@uni.edu'])
+        self.assertEqual(metrics.get('external_validator_hedged_total', {'url': url}), 1)
+
+    # =============================================================
+    # TESTS: VARIAS FUENTES DE VALIDACIÓN EXTERNA
+    # =============================================================
+
+    def _roster_validator(self, answers, slow=()):
+        """Validador simulado por URL: True/False o una excepción; las URLs de 'slow' tardan 1 s."""
+        def validator(url, json, timeout):
+            if url in slow:
+                time.sleep(1)
+            answer = answers[url]
+            if isinstance(answer, Exception):
+                raise answer
+            response = MagicMock()
+            response.json.return_value = {'is_eligible': answer}
+            return response
+        return validator
+
+    @patch('apps.elections.external.get_session')
+    def test_sources_policies_decide_without_waiting_for_slow_sources(self, mock_get_session):
+        students, staff = 'http://students.uni.edu/check/', 'http://staff.uni.edu/check/'
+
+        mock_get_session.return_value.post.side_effect = self._roster_validator({students: True, staff: False}, slow={staff})
+        started = time.monotonic()
+        self.assertTrue(check_sources([students, staff], 'a@uni.edu', POLICY_ANY))
+        self.assertTrue(check_sources([students, staff], 'a@uni.edu', POLICY_FIRST))
+        self.assertLess(time.monotonic() - started, 0.9)
+
+        mock_get_session.return_value.post.side_effect = self._roster_validator({students: True, staff: False}, slow={students})
+        started = time.monotonic()
+        self.assertFalse(check_sources([students, staff], 'a@uni.edu', POLICY_ALL))
+        self.assertLess(time.monotonic() - started, 0.9)
+
+    @patch('apps.elections.external.get_session')
+    def test_sources_errors_only_matter_when_undecided(self, mock_get_session):
+        students, staff = 'http://students.uni.edu/check/', 'http://staff.uni.edu/check/'
+        down = requests.exceptions.ConnectionError('down')
+
+        mock_get_session.return_value.post.side_effect = self._roster_validator({students: down, staff: True})
+        self.assertTrue(check_sources([students, staff], 'a@uni.edu', POLICY_ANY))
+
+        mock_get_session.return_value.post.side_effect = self._roster_validator({students: down, staff: True})
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            check_sources([students, staff], 'a@uni.edu', POLICY_ALL)
+
+    @patch('apps.elections.external.get_session')
+    def test_verify_eligibility_with_several_sources(self, mock_get_session):
+        """La elección combina ext_validation_url con las fuentes adicionales configuradas por API."""
+        students, staff = 'http://students.uni.edu/check/', 'http://staff.uni.edu/check/'
+        self.client.force_authenticate(user=self.staff_user)
+        response = self.client.patch(
+            self.detail_url, {'ext_validation_url': students, 'ext_validation_sources': [staff], 'ext_validation_policy': 'ANY'},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.election.refresh_from_db()
+        self.assertEqual(self.election.validation_sources, [students, staff])
+
+        mock_get_session.return_value.post.side_effect = self._roster_validator({students: False, staff: True})
+        self.client.force_authenticate(user=self.normal_user)
+        response = self.client.get(reverse(self.verify_eligibility_url_name, kwargs={'election_pk': self.election.pk}))
+
+        self.assertTrue(response.data['eligible'])
+        self.assertEqual(response.data['source'], 'external')
+        self.assertEqual(mock_get_session.return_value.post.call_count, 2)
+
+    # =============================================================
+    # TESTS: PLANIFICADOR DE ESTADOS (DRAFT -> OPEN -> CLOSED)
+    # =============================================================
+
+    def _election_at(self, title, start_delta, end_delta, **extra):
+        now = timezone.now()
+        return Election.objects.create(
+            owner=self.staff_user, title=title, start_at=now + start_delta, end_at=now + end_delta, **extra
+        )
+
+    def test_save_keeps_next_transition_at(self):
+        self.assertEqual(self.election.next_transition_at, self.election.start_at)
+        self.election.status = Election.Status.OPEN
+        self.election.save(update_fields=['status'])
+        self.election.refresh_from_db()
+        self.assertEqual(self.election.next_transition_at, self.election.end_at)
+        self.election.status = Election.Status.ARCHIVED
+        self.election.save()
+        self.assertIsNone(self.election.next_transition_at)
+
+    def test_scheduler_opens_and_closes_due_elections(self):
+        due_open = self._election_at('Abre', timedelta(minutes=-1), timedelta(hours=1))
+        due_close = self._election_at('Cierra', timedelta(hours=-2), timedelta(minutes=-1), status=Election.Status.OPEN)
+        missed = self._election_at('Vencida', timedelta(hours=-2), timedelta(hours=-1))
+        closed_events = []
+
+        def on_close(sender, election, **kwargs):
+            closed_events.append(election.pk)
+        election_closed.connect(on_close)
+        self.addCleanup(election_closed.disconnect, on_close)
+
+        summary = run_due_transitions()
+
+        self.assertEqual(summary['opened'], [due_open.pk])
+        self.assertEqual(sorted(summary['closed']), sorted([due_close.pk, missed.pk]))
+        self.assertEqual(sorted(closed_events), sorted([due_close.pk, missed.pk]))
+        due_open.refresh_from_db()
+        self.assertEqual(due_open.status, Election.Status.OPEN)
+        self.assertEqual(due_open.next_transition_at, due_open.end_at)
+        missed.refresh_from_db()
+        self.assertEqual(missed.status, Election.Status.CLOSED)
+        self.assertIsNone(missed.next_transition_at)
+        # La elección base aún no empieza
+        self.election.refresh_from_db()
+        self.assertEqual(self.election.status, Election.Status.DRAFT)
+        # Un segundo ciclo no tiene nada pendiente
+        self.assertEqual(run_due_transitions(), {'opened': [], 'closed': [], 'hook_errors': 0})
+
+    def test_scheduler_hook_errors_do_not_stop_transitions(self):
+        first = self._election_at('Una', timedelta(hours=-2), timedelta(minutes=-2), status=Election.Status.OPEN)
+        second = self._election_at('Otra', timedelta(hours=-2), timedelta(minutes=-1), status=Election.Status.OPEN)
+
+        def broken(sender, election, **kwargs):
+            raise RuntimeError('hook roto')
+        election_closed.connect(broken)
+        self.addCleanup(election_closed.disconnect, broken)
+
+        summary = run_due_transitions()
+        self.assertEqual(summary['closed'], [first.pk, second.pk])
+        self.assertEqual(summary['hook_errors'], 2)
+        self.assertEqual(metrics.get('election_scheduler_hook_errors_total'), 2)
+
+    def test_scheduler_lease_allows_a_single_holder(self):
+        self.assertTrue(acquire_lease('proc-a', seconds=30))
+        self.assertFalse(acquire_lease('proc-b', seconds=30))
+        self.assertIsNone(run_scheduler_once('proc-b'))
+        # Renovar la propia concesión siempre funciona
+        self.assertTrue(acquire_lease('proc-a', seconds=30))
+
+        # Vencida (o liberada), otro proceso la toma
+        SchedulerLease.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertTrue(acquire_lease('proc-b', seconds=30))
+        self.assertFalse(acquire_lease('proc-a', seconds=30))
+        release_lease('proc-b')
+        self.assertTrue(acquire_lease('proc-a', seconds=30))
+
+    def test_run_election_scheduler_command_once(self):
+        due = self._election_at('Abre', timedelta(minutes=-1), timedelta(hours=1))
+        out = StringIO()
+        call_command('run_election_scheduler', '--once', stdout=out)
+        due.refresh_from_db()
+        self.assertEqual(due.status, Election.Status.OPEN)
+        self.assertIn(str(due.pk), out.getvalue())
+        # --once libera la concesión al terminar
+        self.assertTrue(acquire_lease('otro-proceso'))
+
+    @patch('apps.elections.management.commands.run_election_scheduler.time.sleep')
+    def test_run_election_scheduler_standby_waits_full_interval(self, mock_sleep):
+        """Sin la concesión, una transición vencida no hace girar al proceso en espera sin pausa."""
+        due = self._election_at('Abre', timedelta(minutes=-1), timedelta(hours=1))
+        self.assertTrue(acquire_lease('proceso-caido', seconds=30))
+        mock_sleep.side_effect = [None, KeyboardInterrupt]
+
+        call_command('run_election_scheduler', '--interval', '5', stdout=StringIO(), stderr=StringIO())
+
+        self.assertEqual([c.args[0] for c in mock_sleep.call_args_list], [5.0, 5.0])
+        due.refresh_from_db()
+        self.assertEqual(due.status, Election.Status.DRAFT)
+        # El titular adelanta el ciclo, pero nunca por debajo de la espera mínima
+        summary = {'opened': [], 'closed': [], 'hook_errors': 0}
+        self.assertEqual(SchedulerCommand()._wait_seconds(summary, 5.0), MIN_WAIT_SECONDS)
+
+    # =============================================================
+    # TESTS: CACHÉ DE CONFIGURACIÓN DE ELECCIONES
+    # =============================================================
+
+    def test_election_config_cache_hits_without_queries(self):
+        reset_config_cache()
+        with self.assertNumQueries(1):
+            config = get_election_config(self.election.pk)
+        with self.assertNumQueries(0):
+            self.assertIs(get_election_config(self.election.pk), config)
+        self.assertEqual(config.owner_id, self.staff_user.pk)
+        self.assertEqual(config.status, Election.Status.DRAFT)
+        self.assertEqual(metrics.get('election_config_cache_hits_total'), 1)
+        self.assertIsNone(get_election_config(999999))
+        with self.assertRaises(AttributeError):
+            config.status = Election.Status.OPEN
+
+    def test_election_config_cache_invalidation(self):
+        get_election_config(self.election.pk)
+
+        # save() (post_save) invalida en este proceso
+        self.election.title = 'Nuevo título'
+        self.election.save()
+        self.assertEqual(get_election_config(self.election.pk).title, 'Nuevo título')
+
+        # Un UPDATE sin señales no se ve hasta que cambia la versión compartida (otro proceso invalidó)
+        Election.objects.filter(pk=self.election.pk).update(title='Desde otro proceso')
+        self.assertEqual(get_election_config(self.election.pk).title, 'Nuevo título')
+        cache.set(_version_key(self.election.pk), 'otra-version', None)
+        self.assertEqual(get_election_config(self.election.pk).title, 'Desde otro proceso')
+
+        # El planificador (UPDATE condicional) también invalida
+        Election.objects.filter(pk=self.election.pk).update(next_transition_at=timezone.now() - timedelta(seconds=1))
+        run_due_transitions()
+        self.assertEqual(get_election_config(self.election.pk).status, Election.Status.OPEN)
+
+    def test_verify_eligibility_reads_election_from_cache(self):
+        Voter.objects.create(election=self.election, user=self.normal_user, allowed=True)
+        self.client.force_authenticate(user=self.normal_user)
+        url = reverse(self.verify_eligibility_url_name, kwargs={'election_pk': self.election.pk})
+        self.client.get(url) # Calienta la caché de configuración y el prefiltro
+
+        # Solo la consulta del padrón
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertTrue(response.data['eligible'])
+
+    # =============================================================
+    # TESTS: PANEL DEL VOTANTE (GET /api/v1/elections/<pk>/dashboard/)
+    # =============================================================
+
+    def _dashboard(self):
+        return self.client.get(reverse('elections:dashboard', kwargs={'election_pk': self.election.pk}))
+
+    def test_dashboard_for_voter_on_roll(self):
+        Candidate.objects.create(election=self.election, name='Bea')
+        Candidate.objects.create(election=self.election, name='Ana')
+        Voter.objects.create(election=self.election, user=self.normal_user, allowed=True)
+        self.client.force_authenticate(user=self.normal_user)
+        self._dashboard() # Calienta configuración, boleta y prefiltro
+
+        # Solo el registro de padrón del usuario
+        with self.assertNumQueries(1):
+            response = self._dashboard()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['election']['id'], self.election.pk)
+        self.assertEqual([c['name'] for c in response.data['candidates']], ['Ana', 'Bea'])
+        self.assertEqual(response.data['eligibility'], {'eligible': True, 'source': 'internal'})
+        self.assertFalse(response.data['voted'])
+        self.assertIsNone(response.data['vote'])
+
+    def test_dashboard_after_voting_includes_receipt(self):
+        Voter.objects.create(election=self.election, user=self.normal_user, allowed=True, voted=True)
+        VoteRecord.objects.create(
+            election=self.election, user=self.normal_user, hash='a' * 64, tx_id='TX_DASH', published_at=timezone.now()
+        )
+        self.client.force_authenticate(user=self.normal_user)
+        self._dashboard()
+
+        # El prefiltro sabe que votó: solo se lee su VoteRecord
+        with self.assertNumQueries(1):
+            response = self._dashboard()
+
+        self.assertTrue(response.data['voted'])
+        self.assertFalse(response.data['eligibility']['eligible'])
+        self.assertEqual(response.data['vote']['transaction_id'], 'TX_DASH')
+        self.assertEqual(verify_receipt(response.data['vote']['receipt'])['tx_id'], 'TX_DASH')
+
+    @patch('apps.elections.external.get_session')
+    def test_dashboard_never_calls_external_validators(self, mock_get_session):
+        self.election.ext_validation_url = 'http://roster.uni.edu/check/'
+        self.election.save()
+        self.client.force_authenticate(user=self.normal_user)
+
+        response = self._dashboard()
+        self.assertIsNone(response.data['eligibility']['eligible'])
+        mock_get_session.assert_not_called()
+
+        # Con una decisión externa reciente en caché, se informa
+        store_decision(self.election.pk, self.normal_user.email, True)
+        response = self._dashboard()
+        self.assertEqual(response.data['eligibility'], {'eligible': True, 'source': 'external'})
+
+    def test_dashboard_ballot_follows_candidate_changes(self):
+        self.client.force_authenticate(user=self.normal_user)
+        self.assertEqual(self._dashboard().data['candidates'], [])
+        candidate = Candidate.objects.create(election=self.election, name='Ana')
+        self.assertEqual([c['id'] for c in self._dashboard().data['candidates']], [candidate.pk])
+        candidate.delete()
+        self.assertEqual(self._dashboard().data['candidates'], [])
+
+    def test_dashboard_not_found(self):
+        self.client.force_authenticate(user=self.normal_user)
+        response = self.client.get(reverse('elections:dashboard', kwargs={'election_pk': 999999}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    # =============================================================
+    # TESTS: MIS ELECCIONES (GET /api/v1/elections/mine/)
+    # =============================================================
+
+    def test_my_elections_lists_rolls_with_vote_state(self):
+        voted_in = self._election_at('Votada', timedelta(hours=-2), timedelta(hours=2), status=Election.Status.OPEN)
+        pending = self._election_at('Pendiente', timedelta(hours=-1), timedelta(hours=3), status=Election.Status.OPEN)
+        disabled = self._election_at('No habilitada', timedelta(hours=-1), timedelta(hours=3))
+        Voter.objects.create(election=voted_in, user=self.normal_user, allowed=True, voted=True)
+        Voter.objects.create(election=pending, user=self.normal_user, allowed=True)
+        Voter.objects.create(election=disabled, user=self.normal_user, allowed=False)
+        Voter.objects.create(election=pending, user=self.staff_user, allowed=True)
+        VoteRecord.objects.create(election=voted_in, user=self.normal_user, hash='b' * 64, tx_id='TX_MINE', published_at=timezone.now())
+        # El voto de otro usuario en la misma elección no se mezcla
+        VoteRecord.objects.create(election=pending, user=self.staff_user, hash='c' * 64, tx_id='TX_OTHER', published_at=timezone.now())
+        self.client.force_authenticate(user=self.normal_user)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('elections:mine'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = response.data['results']
+        self.assertEqual([row['election_id'] for row in rows], [pending.pk, voted_in.pk])
+        self.assertFalse(rows[0]['voted'])
+        self.assertIsNone(rows[0]['transaction_id'])
+        self.assertTrue(rows[1]['voted'])
+        self.assertEqual(rows[1]['transaction_id'], 'TX_MINE')
+        self.assertEqual(rows[1]['title'], 'Votada')
+
+        response = self.client.get(reverse('elections:mine'), {'voted': 'true'})
+        self.assertEqual([row['election_id'] for row in response.data['results']], [voted_in.pk])
+        response = self.client.get(reverse('elections:mine'), {'status': 'NOPE'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_my_elections_keyset_pagination(self):
+        base = timezone.now() + timedelta(days=10)
+        same_start = [
+            Election.objects.create(owner=self.staff_user, title=f'E{i}', start_at=base, end_at=base + timedelta(days=1))
+            for i in range(3)
+        ]
+        for election in same_start + [self.election]:
+            Voter.objects.create(election=election, user=self.normal_user, allowed=True)
+        self.client.force_authenticate(user=self.normal_user)
+
+        seen = []
+        url, params = reverse('elections:mine'), {'page_size': 2}
+        while url:
+            response = self.client.get(url, params)
+            seen += [row['election_id'] for row in response.data['results']]
+            url, params = response.data['next'], None
+
+        self.assertEqual(len(seen), 4)
+        self.assertEqual(set(seen), {e.pk for e in same_start} | {self.election.pk})
+        self.assertEqual(seen[-1], self.election.pk) # Empieza antes que las demás
@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import election_list_create, election_detail, verify_eligibility # <-- CAMBIO: AÑADIDA
+from .views import election_list_create, election_detail, verify_eligibility, eligibility_cache, election_dashboard, my_elections # <-- CAMBIO: AÑADIDA
 
 app_name = 'elections'
 
@@ -7,9 +7,18 @@ urlpatterns = [
     # api/v1/elections/
     path('', election_list_create, name='list-create'),
     
+    # api/v1/elections/mine/ (Elecciones en las que el usuario puede votar y si ya votó)
+    path('mine/', my_elections, name='mine'),
+
     # api/v1/elections/<pk>/verify-eligibility/ <-- CAMBIO: NUEVA RUTA
     path('<int:election_pk>/verify-eligibility/', verify_eligibility, name='verify-eligibility'),
     
+    # api/v1/elections/<pk>/dashboard/ (Página de votación: elección, boleta, elegibilidad y voto del usuario)
+    path('<int:election_pk>/dashboard/', election_dashboard, name='dashboard'),
+
+    # api/v1/elections/eligibility-cache/ (Estadísticas e invalidación, solo administradores)
+    path('eligibility-cache/', eligibility_cache, name='eligibility-cache'),
+
     # api/v1/elections/<pk>/
     path('<int:pk>/', election_detail, name='detail-update-delete'),
 ]
\ No newline at end of file
@@ -6,13 +6,21 @@ from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 from django.utils.translation import gettext_lazy as _
 from django.db import transaction
-# Si no existe, añade esta importación para la llamada externa:
-import requests 
+from django.db.models import F, FilteredRelation, Q
 from requests.exceptions import RequestException
 # Importaciones de modelos y serializers
 from .models import Election 
-from .serializers import ElectionSerializer # Asumimos que este existe
+from .serializers import ElectionSerializer, ElectionListFilterSerializer, MyElectionFilterSerializer # Asumimos que este existe
+from .pagination import ElectionCursorPagination, MyElectionCursorPagination
 from apps.voter.models import Voter
+from apps.core.admission import admission_controlled, election_from_kwarg
+from apps.voter.prefilter import has_voted
+from .external import check_election_eligibility
+from .eligibility_cache import cache_stats, get_decision, invalidate, invalidation_scope, lookup_decision, store_decision
+from .config_cache import get_election_config_or_404
+from apps.candidates.ballot_cache import ballot_candidates
+from apps.votes.models import VoteRecord
+from apps.votes.receipts import issue_receipt
 # Asegúrate de que las vistas election_list_create y election_detail estén definidas arriba
 
 # ... [election_list_create, election_detail, y otras vistas deben estar aquí] ...
@@ -20,61 +28,205 @@ from apps.voter.models import Voter
 # --- NUEVA VISTA: VERIFICACIÓN DE ELEGIBILIDAD (Proceso P4) ---
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-@transaction.atomic
+@admission_controlled(election_from_kwarg('election_pk'))
 def verify_eligibility(request, election_pk):
     """
     Implementa el Proceso P4. Verifica elegibilidad consultando Voter y, si es necesario, una API externa.
+    Los votantes que el prefiltro en memoria ya sabe que votaron se responden sin consultas.
+    La API externa se consulta sin ninguna transacción abierta; después, una transacción
+    corta solo inserta el registro Voter.
     """
-    election = get_object_or_404(Election, pk=election_pk)
     user = request.user
-    
-    # 1. Verificación Local (Consulta Voter)
-    try:
-        voter_record = Voter.objects.select_for_update().get(election=election, user=user)
-        
-        if voter_record.voted:
-            return Response({'eligible': False, 'reason': _('Ya ha votado.')}, status=status.HTTP_200_OK)
-        if voter_record.allowed:
-            return Response({'eligible': True, 'source': 'internal'}, status=status.HTTP_200_OK)
-        else:
-            return Response({'eligible': False, 'reason': _('No está habilitado.')}, status=status.HTTP_200_OK)
-            
-    except Voter.DoesNotExist:
-        # 2. Verificación Externa Condicional (Caso C)
-        if not election.ext_validation_url:
-            return Response({'eligible': False, 'reason': _('No está en el padrón y no hay API externa configurada.')}, status=status.HTTP_200_OK)
-            
-        # 3. Llamada a API Externa
+    if has_voted(election_pk, user.pk):
+        return Response({'eligible': False, 'reason': _('Ya ha votado.')}, status=status.HTTP_200_OK)
+
+    # Configuración de la elección desde la caché del proceso (sin consulta si sigue vigente)
+    election = get_election_config_or_404(election_pk)
+
+    # 1. Verificación Local (Consulta Voter). No hace falta bloquear: el voto usa su propio UPDATE condicional
+    voter_record = Voter.objects.filter(election_id=election.pk, user=user).values('allowed', 'voted').first()
+    if voter_record is not None:
+        return _local_eligibility(voter_record)
+
+    # 2. Verificación Externa Condicional (Caso C)
+    if not election.validation_sources:
+        return Response({'eligible': False, 'reason': _('No está en el padrón y no hay API externa configurada.')}, status=status.HTTP_200_OK)
+
+    # 3. Llamada a las APIs Externas en paralelo (fuera de transacción, con pool y timeouts),
+    #    salvo decisión reciente en caché
+    is_eligible, cache_token = lookup_decision(election.pk, user.email)
+    if is_eligible is None:
         try:
-            # NOTA: Se debe asegurar que 'requests' esté disponible (pip install requests)
-            external_response = requests.post(
-                election.ext_validation_url, 
-                json={'email': user.email}
-            )
-            external_response.raise_for_status() # Lanza error para códigos 4xx/5xx
-            
-            # Asumimos que la respuesta tiene un campo 'is_eligible' o similar
-            is_eligible = external_response.json().get('is_eligible', False)
-            
-            if is_eligible:
-                # 4. Registro de Autorización Externa (Paso Atómico)
-                Voter.objects.create(
-                    election=election, 
-                    user=user, 
-                    allowed=True, 
-                    ext_verified=True, 
-                    voted=False
-                )
-                return Response({'eligible': True, 'source': 'external'}, status=status.HTTP_200_OK)
-            else:
-                return Response({'eligible': False, 'reason': _('Rechazado por el validador externo.')}, status=status.HTTP_200_OK)
-
-        except RequestException:
-            # Falla de red, tiempo de espera o respuesta inválida del servicio externo
+            is_eligible = check_election_eligibility(election, user.email)
+        except RequestException as e:
+            # Falla de red, tiempo de espera, respuesta inválida o cortocircuito abierto (no se guarda)
+            retry_after = getattr(e, 'retry_after', None)
             return Response(
-                {'eligible': False, 'reason': _('Error al contactar el servicio de validación externo.')}, 
-                status=status.HTTP_503_SERVICE_UNAVAILABLE
+                {'eligible': False, 'reason': _('Error al contactar el servicio de validación externo.')},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': str(retry_after)} if retry_after else None
             )
+        store_decision(election.pk, user.email, is_eligible, cache_token)
+
+    if not is_eligible:
+        return Response({'eligible': False, 'reason': _('Rechazado por el validador externo.')}, status=status.HTTP_200_OK)
+
+    # 4. Registro de Autorización Externa (transacción corta: solo el INSERT)
+    with transaction.atomic():
+        voter, created = Voter.objects.get_or_create(
+            election_id=election.pk,
+            user=user,
+            defaults={'allowed': True, 'ext_verified': True, 'voted': False}
+        )
+    if not created:
+        # Otro proceso registró al votante mientras se consultaba la API: manda el padrón
+        return _local_eligibility({'allowed': voter.allowed, 'voted': voter.voted})
+    return Response({'eligible': True, 'source': 'external'}, status=status.HTTP_200_OK)
+
+
+def _roll_eligibility(voter_record):
+    """Elegibilidad a partir del registro de padrón."""
+    if voter_record['voted']:
+        return {'eligible': False, 'reason': _('Ya ha votado.')}
+    if voter_record['allowed']:
+        return {'eligible': True, 'source': 'internal'}
+    return {'eligible': False, 'reason': _('No está habilitado.')}
+
+
+def _local_eligibility(voter_record):
+    """Respuesta de elegibilidad a partir del registro de padrón."""
+    return Response(_roll_eligibility(voter_record), status=status.HTTP_200_OK)
+
+
+# --- NUEVA VISTA: PANEL DEL VOTANTE (Página de votación en una sola petición) ---
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def election_dashboard(request, election_pk):
+    """
+    Todo lo que necesita la página de votación: configuración de la elección,
+    boleta, elegibilidad del usuario, si ya votó y su comprobante.
+    La configuración y la boleta salen de caché; del usuario se lee solo su
+    registro de padrón o, si ya votó, su VoteRecord (una consulta).
+    Nunca consulta a los validadores externos: sin padrón ni decisión externa
+    en caché, 'eligible' es null y el cliente debe llamar a verify-eligibility.
+    """
+    user = request.user
+    election = get_election_config_or_404(election_pk)
+
+    # 1. Voto del usuario: el prefiltro evita leer el padrón de quien ya votó
+    vote_record = None
+    voter_record = None
+    if has_voted(election.pk, user.pk):
+        vote_record = VoteRecord.objects.filter(election_id=election.pk, user=user).first()
+    else:
+        voter_record = Voter.objects.filter(election_id=election.pk, user=user).values('allowed', 'voted').first()
+        if voter_record is not None and voter_record['voted']:
+            vote_record = VoteRecord.objects.filter(election_id=election.pk, user=user).first()
+
+    # 2. Elegibilidad (padrón, o la última decisión externa en caché)
+    if vote_record is not None:
+        eligibility = _roll_eligibility({'allowed': True, 'voted': True})
+    elif voter_record is not None:
+        eligibility = _roll_eligibility(voter_record)
+    elif not election.validation_sources:
+        eligibility = {'eligible': False, 'reason': _('No está en el padrón y no hay API externa configurada.')}
+    else:
+        decision = get_decision(election.pk, user.email)
+        if decision is None:
+            eligibility = {'eligible': None, 'reason': _('Pendiente de validación externa.')}
+        elif decision:
+            eligibility = {'eligible': True, 'source': 'external'}
+        else:
+            eligibility = {'eligible': False, 'reason': _('Rechazado por el validador externo.')}
+
+    return Response({
+        'election': {
+            'id': election.pk,
+            'title': election.title,
+            'status': election.status,
+            'type': election.type,
+            'start_at': election.start_at,
+            'end_at': election.end_at,
+            'max_sel': election.max_sel,
+        },
+        'candidates': ballot_candidates(election.pk),
+        'eligibility': eligibility,
+        'voted': vote_record is not None or bool(voter_record and voter_record['voted']),
+        'vote': {
+            'transaction_id': vote_record.tx_id,
+            'vote_hash': vote_record.hash,
+            'published_at': vote_record.published_at,
+            'receipt': issue_receipt(vote_record.election_id, vote_record.tx_id, vote_record.hash, vote_record.published_at),
+        } if vote_record is not None else None,
+    }, status=status.HTTP_200_OK)
+
+
+# --- NUEVA VISTA: CACHÉ DE ELEGIBILIDAD EXTERNA (Administradores) ---
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def eligibility_cache(request):
+    """
+    GET: Aciertos, fallos y tamaño de la caché de decisiones externas de este proceso.
+    DELETE: Invalida decisiones en todos los procesos que comparten la caché de Django.
+    ?election=<pk> y/o ?email=<email> acotan el borrado; sin ellos se vacía.
+    'invalidated' cuenta las borradas en este proceso; 'scope' es 'process' si la caché de Django
+    no es compartida y la invalidación no llega a los demás procesos.
+    """
+    if not request.user.is_staff:
+        return Response(
+            {'detail': _('Solo los administradores pueden gestionar la caché de elegibilidad.')},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    if request.method == 'GET':
+        return Response(cache_stats(), status=status.HTTP_200_OK)
+
+    election_id = request.query_params.get('election')
+    if election_id is not None and not election_id.isdigit():
+        return Response({'election': [_('Debe ser un número entero.')]}, status=status.HTTP_400_BAD_REQUEST)
+    removed = invalidate(election_id=election_id, email=request.query_params.get('email') or None)
+    return Response({'invalidated': removed, 'scope': invalidation_scope()}, status=status.HTTP_200_OK)
+
+
+# --- NUEVA VISTA: MIS ELECCIONES (Padrones del usuario) ---
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def my_elections(request):
+    """
+    Elecciones en las que el usuario está habilitado para votar, con si ya votó
+    y, en ese caso, su transacción y la fecha del voto.
+    Una sola consulta por página: el padrón del usuario unido a la elección y,
+    con LEFT JOIN, a su VoteRecord. Paginación por cursor (?cursor=&page_size=)
+    y filtros opcionales ?status= y ?voted=true|false.
+    """
+    filters = MyElectionFilterSerializer(data=request.query_params)
+    if not filters.is_valid():
+        return Response(filters.errors, status=status.HTTP_400_BAD_REQUEST)
+    criteria = filters.validated_data
+
+    rows = (
+        Voter.objects.filter(user=request.user, allowed=True)
+        .annotate(vote=FilteredRelation('election__vote_records', condition=Q(election__vote_records__user=request.user)))
+        .values(
+            'election_id', 'voted',
+            title=F('election__title'),
+            status=F('election__status'),
+            type=F('election__type'),
+            start_at=F('election__start_at'),
+            end_at=F('election__end_at'),
+            transaction_id=F('vote__tx_id'),
+            voted_at=F('vote__published_at'),
+        )
+    )
+    if 'status' in criteria:
+        rows = rows.filter(election__status=criteria['status'])
+    if criteria['voted'] is not None:
+        rows = rows.filter(voted=criteria['voted'])
+
+    paginator = MyElectionCursorPagination()
+    page = paginator.paginate_queryset(rows, request)
+    return paginator.get_paginated_response(page)
+
 
 # apps/elections/views.py
 
@@ -84,17 +236,35 @@ def verify_eligibility(request, election_pk):
 @permission_classes([IsAuthenticated])
 def election_list_create(request):
     """
-    GET: Lista todas las elecciones (solo visibles para usuarios autenticados).
+    GET: Lista las elecciones paginadas por cursor y filtrables (solo visibles para usuarios autenticados).
     POST: Crea una nueva elección (solo para administradores).
     """
     # -----------------------------------
     # GET: Listar Elecciones
     # -----------------------------------
     if request.method == 'GET':
-        # Listamos todas las elecciones, o podríamos filtrar solo las activas/abiertas
-        elections = Election.objects.all().order_by('-start_at')
-        serializer = ElectionSerializer(elections, many=True)
-        return Response(serializer.data)
+        # Filtros opcionales (?status=&type=&start_after=&start_before=), cada uno cubierto por un índice
+        filters = ElectionListFilterSerializer(data=request.query_params)
+        if not filters.is_valid():
+            return Response(filters.errors, status=status.HTTP_400_BAD_REQUEST)
+        criteria = filters.validated_data
+
+        # select_related: owner_name sin una consulta por fila
+        elections = Election.objects.select_related('owner')
+        if 'status' in criteria:
+            elections = elections.filter(status=criteria['status'])
+        if 'type' in criteria:
+            elections = elections.filter(type=criteria['type'])
+        if 'start_after' in criteria:
+            elections = elections.filter(start_at__gte=criteria['start_after'])
+        if 'start_before' in criteria:
+            elections = elections.filter(start_at__lt=criteria['start_before'])
+
+        # Paginación por cursor (?cursor=&page_size=): una sola consulta por página
+        paginator = ElectionCursorPagination()
+        page = paginator.paginate_queryset(elections, request)
+        serializer = ElectionSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     # -----------------------------------
     # POST: Crear Nueva Elección (Requiere Admin)
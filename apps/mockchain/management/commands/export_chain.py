@@ -0,0 +1,42 @@
+# apps/mockchain/management/commands/export_chain.py
+# py manage.py export_chain --from-block 1 --to-block 500 -o chain.vvc
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.mockchain.services import iter_chain_export
+
+
+class Command(BaseCommand):
+    help = 'Exporta un rango de bloques de la Mockchain como flujo comprimido con prefijo de longitud.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from-block', type=int, default=None, help='Primer bloque (inclusive).')
+        parser.add_argument('--to-block', type=int, default=None, help='Último bloque (inclusive).')
+        parser.add_argument(
+            '-o', '--output', default='-',
+            help='Archivo de salida. Con "-" (por defecto) se escribe en stdout.'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        chunks = iter_chain_export(options['from_block'], options['to_block'])
+
+        if options['output'] == '-':
+            out = sys.stdout.buffer
+            for chunk in chunks:
+                out.write(chunk)
+            out.flush()
+            return
+
+        size = 0
+        with open(options['output'], 'wb') as out:
+            for chunk in chunks:
+                out.write(chunk)
+                size += len(chunk)
+
+        elapsed = time.perf_counter() - started
+        self.stderr.write(self.style.SUCCESS(
+            f"Volcado escrito en {options['output']} ({size} bytes, {elapsed:.2f}s)."
+        ))
@@ -0,0 +1,33 @@
+# apps/mockchain/management/commands/import_chain.py
+# py manage.py import_chain chain.vvc
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.mockchain.services import ChainDumpError, import_chain_dump, IMPORT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Importa un volcado de la Mockchain con inserciones masivas y verificación de hashes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help='Archivo de volcado. Con "-" se lee de stdin.')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            if options['input'] == '-':
+                stats = import_chain_dump(sys.stdin.buffer, batch_size=options['batch_size'])
+            else:
+                with open(options['input'], 'rb') as dump:
+                    stats = import_chain_dump(dump, batch_size=options['batch_size'])
+        except (ChainDumpError, OSError) as e:
+            raise CommandError(str(e))
+
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        self.stdout.write(self.style.SUCCESS(
+            f"Importadas {stats['created']} TX nuevas ({stats['skipped']} ya existentes) "
+            f"de {stats['received']} en {elapsed:.2f}s ({stats['received'] / elapsed:,.0f} tx/s)."
+        ))
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-19 04:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mockchain', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='mockchaintx',
+            name='block_number',
+            field=models.PositiveIntegerField(db_index=True, default=0, help_text='Número de bloque simulado en el que se "minó" la transacción.', verbose_name='número de bloque'),
+        ),
+    ]
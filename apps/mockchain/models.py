@@ -33,6 +33,7 @@ class MockchainTx(models.Model):
     block_number = models.PositiveIntegerField(
         _('número de bloque'),
         default=0,
+        db_index=True, # Permite exportar rangos de bloques sin recorrer toda la tabla
         help_text=_('Número de bloque simulado en el que se "minó" la transacción.')
     )
 
@@ -0,0 +1,337 @@
+# apps/mockchain/services.py
+import hashlib
+import json
+import struct
+import uuid
+import zlib
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.translation import gettext_lazy as _
+
+from .models import MockchainTx
+
+# ----------------------------------------------------------------------
+# FORMATO DE VOLCADO DE LA CADENA (export/import entre nodos)
+# ----------------------------------------------------------------------
+# Flujo comprimido con gzip. Una vez descomprimido:
+#   MAGIC (8 bytes)
+#   N registros: [longitud uint32 big-endian][registro]
+#   Marcador de fin: longitud 0
+#   Trailer: [nº de registros uint64][SHA-256 de todos los registros (32 bytes)]
+# Cada registro es una cabecera binaria [block_number uint32][created_at int64:
+# microsegundos UTC desde 1970][len(payload_hash) uint8][len(tx_id) uint16],
+# seguida de payload_hash, tx_id y el JSON del payload tal cual está almacenado,
+# de modo que la importación no necesita decodificar ni volver a serializar nada.
+# Los volcados de la versión 1 (VVCHAIN1) no llevan created_at: al importarlos
+# se usa la hora de la importación.
+
+CHAIN_DUMP_MAGIC = b'VVCHAIN2'
+CHAIN_DUMP_MAGIC_V1 = b'VVCHAIN1'
+_LENGTH = struct.Struct('>I')
+_RECORD_HEADER = struct.Struct('>IqBH')
+_RECORD_HEADER_V1 = struct.Struct('>IBH')
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+_TRAILER = struct.Struct('>Q32s')
+
+EXPORT_CHUNK_SIZE = 2000
+IMPORT_BATCH_SIZE = 5000
+_READ_SIZE = 1 << 20
+
+
+class ChainDumpError(Exception):
+    """Error de formato o de integridad en un volcado de la cadena."""
+
+
+def new_transaction_fields():
+    """
+    Simula la generación del ID de transacción y del número de bloque.
+    NOTA: En una implementación real, el número de bloque sería secuencial y real.
+    """
+    return {
+        'tx_id': str(uuid.uuid4()),
+        'block_number': MockchainTx.objects.count() + 1,
+    }
+
+
+def publish_payload(payload, payload_hash):
+    """
+    Publica una transacción ya validada en la Mockchain y la retorna.
+    Lanza IntegrityError si el payload_hash ya fue publicado.
+    """
+    return MockchainTx.objects.create(
+        payload=payload,
+        payload_hash=payload_hash,
+        **new_transaction_fields()
+    )
+
+
+def publish_payloads(items):
+    """
+    Publica varias transacciones ya validadas con un solo conteo y un INSERT
+    en bloque. items: [(payload, payload_hash)]. Retorna las MockchainTx en el
+    mismo orden. Lanza IntegrityError si algún payload_hash ya fue publicado.
+    """
+    first_block = MockchainTx.objects.count() + 1
+    return MockchainTx.objects.bulk_create([
+        MockchainTx(payload=payload, payload_hash=payload_hash, tx_id=str(uuid.uuid4()), block_number=first_block + i)
+        for i, (payload, payload_hash) in enumerate(items)
+    ])
+
+
+def _export_rows(from_block, to_block, chunk_size):
+    """
+    Lee las filas con un cursor directo para obtener el payload como texto JSON
+    (en SQLite) sin pasar por la decodificación del JSONField.
+    """
+    opts = MockchainTx._meta
+    qn = connection.ops.quote_name
+    columns = ', '.join(
+        qn(opts.get_field(name).column) for name in ('tx_id', 'payload_hash', 'block_number', 'created_at', 'payload')
+    )
+    block_column = qn(opts.get_field('block_number').column)
+    where, params = [], []
+    if from_block is not None:
+        where.append(f'{block_column} >= %s')
+        params.append(from_block)
+    if to_block is not None:
+        where.append(f'{block_column} <= %s')
+        params.append(to_block)
+    sql = f'SELECT {columns} FROM {qn(opts.db_table)}'
+    if where:
+        sql += ' WHERE ' + ' AND '.join(where)
+    sql += f' ORDER BY {block_column}, {qn(opts.pk.column)}'
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield from rows
+
+
+def _to_microseconds(value):
+    """created_at leído en crudo del cursor -> microsegundos UTC desde 1970."""
+    if isinstance(value, str):
+        value = parse_datetime(value)
+    if timezone.is_naive(value):
+        # Con USE_TZ los backends sin zona horaria (SQLite) guardan UTC
+        value = timezone.make_aware(value, dt_timezone.utc)
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def _from_microseconds(value):
+    return _EPOCH + value * _MICROSECOND
+
+
+def iter_chain_export(from_block=None, to_block=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Genera el volcado comprimido de las transacciones en el rango de bloques
+    [from_block, to_block] (ambos inclusive y opcionales), en trozos de bytes
+    listos para escribir a un archivo o para una StreamingHttpResponse.
+    """
+    # wbits=31 -> contenedor gzip estándar (se puede inspeccionar con gunzip)
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    digest = hashlib.sha256()
+    count = 0
+
+    yield compressor.compress(CHAIN_DUMP_MAGIC)
+    buffer = []
+    for tx_id, payload_hash, block_number, created_at, payload in _export_rows(from_block, to_block, chunk_size):
+        if not isinstance(payload, str):
+            # Backends que decodifican el JSON por su cuenta (p. ej. jsonb en PostgreSQL)
+            payload = json.dumps(payload, separators=(',', ':'), ensure_ascii=False)
+        hash_bytes = payload_hash.encode('utf-8')
+        tx_id_bytes = tx_id.encode('utf-8')
+        record = b''.join((
+            _RECORD_HEADER.pack(block_number, _to_microseconds(created_at), len(hash_bytes), len(tx_id_bytes)),
+            hash_bytes,
+            tx_id_bytes,
+            payload.encode('utf-8'),
+        ))
+        digest.update(record)
+        buffer.append(_LENGTH.pack(len(record)))
+        buffer.append(record)
+        count += 1
+        if len(buffer) >= 2 * chunk_size:
+            out = compressor.compress(b''.join(buffer))
+            buffer = []
+            if out:
+                yield out
+
+    buffer.append(_LENGTH.pack(0))
+    buffer.append(_TRAILER.pack(count, digest.digest()))
+    yield compressor.compress(b''.join(buffer)) + compressor.flush()
+
+
+def _iter_decompressed(fileobj):
+    """Descomprime el flujo gzip en bloques grandes (evita lecturas por registro)."""
+    decompressor = zlib.decompressobj(31)
+    while True:
+        chunk = fileobj.read(_READ_SIZE)
+        if not chunk:
+            break
+        data = decompressor.decompress(chunk)
+        if data:
+            yield data
+    tail = decompressor.flush()
+    if tail:
+        yield tail
+
+
+def iter_chain_records(fileobj):
+    """
+    Lee un volcado comprimido y genera las tuplas
+    (tx_id, payload_hash, block_number, created_at, payload_json); created_at es
+    None en los volcados de la versión 1. Al terminar verifica el número de
+    registros y el SHA-256 del trailer; si no coinciden lanza ChainDumpError.
+    """
+    digest = hashlib.sha256()
+    count = 0
+    buffer = b''
+    offset = 0
+    finished = False
+    trailer = None
+    magic_checked = False
+    header = _RECORD_HEADER
+
+    try:
+        for data in _iter_decompressed(fileobj):
+            buffer = buffer[offset:] + data
+            offset = 0
+            if not magic_checked:
+                if len(buffer) < len(CHAIN_DUMP_MAGIC):
+                    continue
+                magic = buffer[:len(CHAIN_DUMP_MAGIC)]
+                if magic not in (CHAIN_DUMP_MAGIC, CHAIN_DUMP_MAGIC_V1):
+                    raise ChainDumpError(_('El archivo no es un volcado de la cadena válido.'))
+                header = _RECORD_HEADER if magic == CHAIN_DUMP_MAGIC else _RECORD_HEADER_V1
+                offset = len(CHAIN_DUMP_MAGIC)
+                magic_checked = True
+
+            view = memoryview(buffer)
+            size = len(buffer)
+            while not finished and offset + _LENGTH.size <= size:
+                (length,) = _LENGTH.unpack_from(view, offset)
+                if length == 0:
+                    finished = True
+                    offset += _LENGTH.size
+                    break
+                end = offset + _LENGTH.size + length
+                if end > size:
+                    break
+                start = offset + _LENGTH.size
+                digest.update(view[start:end])
+                if header is _RECORD_HEADER:
+                    block_number, created_us, hash_len, tx_id_len = header.unpack_from(view, start)
+                    created_at = _from_microseconds(created_us)
+                else:
+                    block_number, hash_len, tx_id_len = header.unpack_from(view, start)
+                    created_at = None
+                start += header.size
+                payload_hash = str(view[start:start + hash_len], 'utf-8')
+                start += hash_len
+                tx_id = str(view[start:start + tx_id_len], 'utf-8')
+                start += tx_id_len
+                count += 1
+                yield tx_id, payload_hash, block_number, created_at, str(view[start:end], 'utf-8')
+                offset = end
+            view.release()
+
+            if finished and len(buffer) - offset >= _TRAILER.size:
+                trailer = _TRAILER.unpack_from(buffer, offset)
+    except (zlib.error, struct.error, UnicodeDecodeError, OverflowError) as e:
+        raise ChainDumpError(_('No se pudo leer el volcado: %(error)s') % {'error': e})
+
+    if trailer is None:
+        raise ChainDumpError(_('Volcado truncado: fin de datos inesperado.'))
+    expected_count, expected_digest = trailer
+    if expected_count != count or expected_digest != digest.digest():
+        raise ChainDumpError(_('El hash de integridad del volcado no coincide; importación abortada.'))
+
+
+def _insert_sql():
+    opts = MockchainTx._meta
+    qn = connection.ops.quote_name
+    names = ('tx_id', 'payload_hash', 'payload', 'block_number', 'created_at')
+    columns = ', '.join(qn(opts.get_field(name).column) for name in names)
+    placeholders = ', '.join(['%s'] * len(names))
+    return f'INSERT INTO {qn(opts.db_table)} ({columns}) VALUES ({placeholders})'
+
+
+def _import_batch(cursor, insert_sql, batch, imported_at, empty_target):
+    """
+    Inserta un lote con executemany (sin construir instancias del modelo).
+    Cada TX conserva el created_at del volcado (imported_at si no lo trae).
+    Las transacciones ya presentes con el mismo payload_hash se omiten; si
+    existe el tx_id con otro hash es un conflicto. Retorna las filas nuevas.
+    """
+    created_field = MockchainTx._meta.get_field('created_at')
+    if empty_target:
+        # Nodo nuevo: no hay nada con qué chocar, nos ahorramos la consulta por lote
+        existing = {}
+    else:
+        existing = dict(
+            MockchainTx.objects.filter(tx_id__in=[row[0] for row in batch])
+            .values_list('tx_id', 'payload_hash')
+        )
+    new_rows = []
+    for tx_id, payload_hash, block_number, created_at, payload in batch:
+        local_hash = existing.get(tx_id)
+        if local_hash is None:
+            created_at = imported_at if created_at is None else created_field.get_db_prep_save(created_at, connection)
+            new_rows.append((tx_id, payload_hash, payload, block_number, created_at))
+        elif local_hash != payload_hash:
+            raise ChainDumpError(
+                _('Conflicto de integridad: la TX %(tx)s ya existe con otro payload_hash.') % {'tx': tx_id}
+            )
+    if new_rows:
+        # Insertar en orden de tx_id mejora la localidad del índice único
+        new_rows.sort()
+        try:
+            cursor.executemany(insert_sql, new_rows)
+        except IntegrityError as e:
+            raise ChainDumpError(_('Conflicto de unicidad al importar: %(error)s') % {'error': e})
+    return len(new_rows)
+
+
+def import_chain_dump(fileobj, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Importa un volcado generado por iter_chain_export dentro de una única
+    transacción atómica: si cualquier comprobación de hash falla no se
+    escribe nada. Las TX importadas conservan su created_at original.
+    Retorna un dict con los contadores de la importación.
+    """
+    received = 0
+    created = 0
+    insert_sql = _insert_sql()
+    imported_at = MockchainTx._meta.get_field('created_at').get_db_prep_save(timezone.now(), connection)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        empty_target = not MockchainTx.objects.exists()
+        batch = []
+        seen_hashes = set()
+        for row in iter_chain_records(fileobj):
+            tx_id, payload_hash, block_number, _created_at, payload = row
+            received += 1
+            if not payload_hash or len(payload_hash) > 64:
+                raise ChainDumpError(
+                    _('payload_hash inválido para la TX %(tx)s.') % {'tx': tx_id}
+                )
+            if payload_hash in seen_hashes:
+                raise ChainDumpError(
+                    _('payload_hash duplicado dentro del volcado (TX %(tx)s).') % {'tx': tx_id}
+                )
+            seen_hashes.add(payload_hash)
+            batch.append(row)
+            if len(batch) >= batch_size:
+                created += _import_batch(cursor, insert_sql, batch, imported_at, empty_target)
+                batch = []
+        if batch:
+            created += _import_batch(cursor, insert_sql, batch, imported_at, empty_target)
+
+    return {'received': received, 'created': created, 'skipped': received - created}
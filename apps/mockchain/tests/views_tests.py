@@ -3,11 +3,23 @@
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+import gzip
 import hashlib
+import io
 import json
+import struct
+from datetime import timedelta
+
+from django.utils import timezone
 
 from apps.mockchain.models import MockchainTx
 from apps.mockchain.serializers import MockchainTxSerializer
+from apps.mockchain.services import (
+    CHAIN_DUMP_MAGIC_V1, ChainDumpError, _RECORD_HEADER_V1, import_chain_dump, iter_chain_export,
+)
+
+User = get_user_model()
 
 class MockchainAPITests(APITestCase):
     
@@ -136,4 +148,103 @@ class MockchainAPITests(APITestCase):
         """Prueba que el acceso es público (simulando un servicio de blockchain) (201)."""
         response = self.client.post(self.publish_url, self.valid_data, format='json')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertEqual(MockchainTx.objects.count(), 1)
\ No newline at end of file
+        self.assertEqual(MockchainTx.objects.count(), 1)
+
+
+class ChainExportImportTests(APITestCase):
+
+    def setUp(self):
+        """Crea 5 transacciones en bloques consecutivos y un administrador."""
+        self.staff_user = User.objects.create_user(email='admin@test.com', name='Admin', password='pass', is_staff=True)
+        self.normal_user = User.objects.create_user(email='user@test.com', name='User', password='pass')
+        for block in range(1, 6):
+            payload = {"election_id": 1, "selections": [block]}
+            MockchainTx.objects.create(
+                tx_id=f'tx-{block}',
+                payload_hash=hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest(),
+                payload=payload,
+                block_number=block,
+            )
+        self.export_url = reverse('mockchain:export')
+        self.import_url = reverse('mockchain:import')
+
+    def _export(self, **params):
+        response = self.client.get(self.export_url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b''.join(response.streaming_content)
+
+    def test_export_import_roundtrip(self):
+        """Un rango exportado se importa íntegro en un nodo vacío, con su fecha de creación original."""
+        MockchainTx.objects.filter(block_number=3).update(created_at=timezone.now() - timedelta(days=30, microseconds=7))
+        dump = self._export(from_block=2, to_block=4)
+        fields = ('tx_id', 'payload_hash', 'block_number', 'payload', 'created_at')
+        expected = list(MockchainTx.objects.filter(block_number__range=(2, 4)).order_by('block_number').values_list(*fields))
+        MockchainTx.objects.all().delete()
+
+        stats = import_chain_dump(io.BytesIO(dump))
+
+        self.assertEqual(stats, {'received': 3, 'created': 3, 'skipped': 0})
+        imported = list(MockchainTx.objects.order_by('block_number').values_list(*fields))
+        self.assertEqual(imported, expected)
+
+    def test_import_version_1_dump_stamps_import_time(self):
+        """Los volcados anteriores (sin created_at) se siguen importando con la hora de la importación."""
+        record = _RECORD_HEADER_V1.pack(9, 64, 5) + b'a' * 64 + b'tx-v1' + b'{"selections":[9]}'
+        raw = CHAIN_DUMP_MAGIC_V1 + struct.pack('>I', len(record)) + record + struct.pack('>I', 0)
+        raw += struct.pack('>Q32s', 1, hashlib.sha256(record).digest())
+        before = timezone.now()
+
+        stats = import_chain_dump(io.BytesIO(gzip.compress(raw)))
+
+        self.assertEqual(stats['created'], 1)
+        tx = MockchainTx.objects.get(tx_id='tx-v1')
+        self.assertEqual((tx.block_number, tx.payload), (9, {'selections': [9]}))
+        self.assertGreaterEqual(tx.created_at, before)
+
+    def test_import_skips_identical_existing_transactions(self):
+        """Reimportar sobre un nodo que ya tiene las TX no duplica filas."""
+        dump = b''.join(iter_chain_export())
+        stats = import_chain_dump(io.BytesIO(dump))
+        self.assertEqual(stats['created'], 0)
+        self.assertEqual(stats['skipped'], 5)
+        self.assertEqual(MockchainTx.objects.count(), 5)
+
+    def test_import_rejects_tampered_dump(self):
+        """Un registro alterado rompe el hash del trailer y no se escribe nada."""
+        raw = gzip.decompress(b''.join(iter_chain_export()))
+        tampered = gzip.compress(raw.replace(b'[3]', b'[4]'))
+        MockchainTx.objects.all().delete()
+
+        with self.assertRaises(ChainDumpError):
+            import_chain_dump(io.BytesIO(tampered))
+        self.assertEqual(MockchainTx.objects.count(), 0)
+
+    def test_import_conflicting_hash_400(self):
+        """Una TX local con el mismo tx_id y otro hash se reporta como conflicto (400)."""
+        dump = self._export()
+        MockchainTx.objects.filter(tx_id='tx-3').update(payload_hash='f' * 64)
+        self.client.force_authenticate(user=self.staff_user)
+
+        response = self.client.generic('POST', self.import_url, dump, content_type='application/octet-stream')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('Conflicto de integridad', response.data['detail'])
+
+    def test_import_endpoint_staff_only(self):
+        """Solo los administradores pueden importar (403)."""
+        dump = self._export()
+        self.client.force_authenticate(user=self.normal_user)
+        response = self.client.generic('POST', self.import_url, dump, content_type='application/octet-stream')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_import_endpoint_success(self):
+        """El endpoint de importación devuelve los contadores (201)."""
+        dump = self._export()
+        MockchainTx.objects.all().delete()
+        self.client.force_authenticate(user=self.staff_user)
+
+        response = self.client.generic('POST', self.import_url, dump, content_type='application/octet-stream')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 5)
+        self.assertEqual(MockchainTx.objects.count(), 5)
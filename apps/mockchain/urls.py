@@ -1,10 +1,16 @@
 # apps/mockchain/urls.py
 from django.urls import path
-from .views import publish_transaction
+from .views import publish_transaction, export_chain, import_chain
 
 app_name = 'mockchain'
 
 urlpatterns = [
     # api/v1/mockchain/publish/
     path('publish/', publish_transaction, name='publish-tx'),
+
+    # api/v1/mockchain/export/?from_block=&to_block=
+    path('export/', export_chain, name='export'),
+
+    # api/v1/mockchain/import/
+    path('import/', import_chain, name='import'),
 ]
\ No newline at end of file
@@ -1,12 +1,13 @@
 # apps/mockchain/views.py
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework import status
-import uuid
+from django.http import StreamingHttpResponse
+from django.utils.translation import gettext_lazy as _
 
-from .models import MockchainTx
 from .serializers import MockchainTxSerializer
+from .services import ChainDumpError, iter_chain_export, import_chain_dump, new_transaction_fields
 
 # Usamos AllowAny porque esta vista simula un servicio público de blockchain
 @api_view(['POST']) 
@@ -19,10 +20,10 @@ def publish_transaction(request):
     data = request.data.copy()
     
     # 1. Simular generación de ID de transacción y número de bloque
-    data['tx_id'] = str(uuid.uuid4())
-    # NOTA: En una implementación real, este número sería secuencial y real.
-    # Aquí lo simulamos con un valor fijo por simplicidad.
-    data['block_number'] = MockchainTx.objects.count() + 1 
+    # (asignación explícita: QueryDict.update añadiría valores en lugar de reemplazarlos)
+    tx_fields = new_transaction_fields()
+    data['tx_id'] = tx_fields['tx_id']
+    data['block_number'] = tx_fields['block_number']
 
     serializer = MockchainTxSerializer(data=data)
     
@@ -39,4 +40,52 @@ def publish_transaction(request):
              # Captura errores de unicidad (payload_hash/tx_id duplicado)
             return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+# --- EXPORTACIÓN / IMPORTACIÓN DE LA CADENA (Arranque de nodos espejo) ---
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def export_chain(request):
+    """
+    Exporta un rango de bloques (?from_block=&to_block=) como flujo comprimido
+    con prefijo de longitud. La cadena es pública, igual que la publicación.
+    """
+    try:
+        from_block = request.query_params.get('from_block')
+        to_block = request.query_params.get('to_block')
+        from_block = int(from_block) if from_block not in (None, '') else None
+        to_block = int(to_block) if to_block not in (None, '') else None
+    except ValueError:
+        return Response({'detail': _('from_block y to_block deben ser enteros.')}, status=status.HTTP_400_BAD_REQUEST)
+
+    response = StreamingHttpResponse(
+        iter_chain_export(from_block, to_block),
+        content_type='application/octet-stream'
+    )
+    response['Content-Disposition'] = 'attachment; filename="mockchain.vvc"'
+    return response
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def import_chain(request):
+    """
+    Importa en bloque un volcado generado por export_chain (cuerpo binario).
+    Solo para administradores: escribe directamente en el libro mayor.
+    """
+    if not request.user.is_staff:
+        return Response(
+            {'detail': _('Solo los administradores pueden importar transacciones.')},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    if request.stream is None:
+        return Response({'detail': _('Se requiere el volcado en el cuerpo de la solicitud.')}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        stats = import_chain_dump(request.stream)
+    except ChainDumpError as e:
+        return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(stats, status=status.HTTP_201_CREATED)
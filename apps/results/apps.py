@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class ResultsConfig(AppConfig):
     name = 'apps.results'
+
+    def ready(self):
+        # Registra el receptor que calcula los resultados al cerrarse una elección
+        from . import signals  # noqa: F401
@@ -0,0 +1,44 @@
+# apps/results/management/commands/audit_votes.py
+# py manage.py audit_votes --file tx_ids.txt > audit.ndjson
+import json
+import sys
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.results.services import audit_votes_bulk, read_tx_ids, AUDIT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Concilia en bloque tx_ids contra VoteRecord y la Mockchain y emite una línea NDJSON por TX.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('tx_ids', nargs='*', help='tx_ids a auditar.')
+        parser.add_argument(
+            '-f', '--file', default=None,
+            help='Archivo con un tx_id por línea. Con "-" se lee de stdin.'
+        )
+        parser.add_argument('--chunk-size', type=int, default=AUDIT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        tx_ids = list(options['tx_ids'])
+        if options['file'] == '-':
+            tx_ids.extend(read_tx_ids(sys.stdin))
+        elif options['file']:
+            try:
+                with open(options['file'], encoding='utf-8') as source:
+                    tx_ids.extend(read_tx_ids(source))
+            except OSError as e:
+                raise CommandError(str(e))
+
+        if not tx_ids:
+            raise CommandError('Indique al menos un tx_id o un archivo con --file.')
+
+        totals = Counter()
+        for result in audit_votes_bulk(tx_ids, chunk_size=options['chunk_size']):
+            totals[result['status']] += 1
+            self.stdout.write(json.dumps(result))
+
+        summary = ', '.join(f'{name}={count}' for name, count in sorted(totals.items()))
+        style = self.style.SUCCESS if set(totals) == {'SUCCESS'} else self.style.WARNING
+        self.stderr.write(style(f'Auditadas {len(tx_ids)} TX: {summary}'))
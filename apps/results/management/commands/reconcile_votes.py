@@ -0,0 +1,43 @@
+# apps/results/management/commands/reconcile_votes.py
+# py manage.py reconcile_votes            (incremental, desde la última marca de agua)
+# py manage.py reconcile_votes --full     (concilia ambas tablas completas)
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+
+from apps.results.reconciliation import ReconciliationConflict, reconcile_votes, RECONCILIATION_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Concilia incrementalmente VoteRecord contra la Mockchain y emite un informe de huérfanos y discrepancias.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Ignora las marcas de agua y concilia todo.')
+        parser.add_argument('--name', default='default', help='Estado de conciliación a usar.')
+        parser.add_argument('--chunk-size', type=int, default=RECONCILIATION_CHUNK_SIZE)
+        parser.add_argument('--json', action='store_true', help='Escribe el informe completo en JSON por stdout.')
+
+    def handle(self, *args, **options):
+        try:
+            report = reconcile_votes(name=options['name'], full=options['full'], chunk_size=options['chunk_size'])
+        except ReconciliationConflict as e:
+            raise CommandError(str(e))
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, cls=DjangoJSONEncoder, indent=4))
+
+        for mismatch in report['mismatches']:
+            self.stderr.write(self.style.ERROR(
+                f"🚨 Hash distinto en TX {mismatch['tx_id']} (elección {mismatch['election_id']}): "
+                f"local={mismatch['local_hash']} cadena={mismatch['chain_hash']}"
+            ))
+
+        findings = len(report['mismatches']) + len(report['local_orphans']) + len(report['chain_orphans'])
+        style = self.style.WARNING if findings else self.style.SUCCESS
+        self.stderr.write(style(
+            f"Conciliadas {report['checked_rows']} filas nuevas: {report['matched']} coinciden, "
+            f"{len(report['mismatches'])} discrepancias, {len(report['local_orphans'])} VoteRecord sin TX, "
+            f"{len(report['chain_orphans'])} TX sin VoteRecord, {report['resolved_orphans']} huérfanos resueltos. "
+            f"Marcas de agua: VR={report['vote_record_watermark']} TX={report['chain_watermark']}."
+        ))
@@ -0,0 +1,47 @@
+# apps/results/management/commands/sampling_audit.py
+# py manage.py sampling_audit 12 --seed 20240601 --risk-limit 0.05
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+
+from apps.results.sampling_audit import run_sampling_audit
+
+
+class Command(BaseCommand):
+    help = 'Auditoría por muestreo con límite de riesgo de una elección cerrada.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('election_id', type=int)
+        parser.add_argument('--seed', type=int, default=None, help='Semilla del muestreo (por defecto, aleatoria).')
+        parser.add_argument('--risk-limit', type=float, default=None)
+        parser.add_argument('--tolerable-error-rate', type=float, default=None)
+        parser.add_argument('--json', action='store_true', help='Escribe el resultado completo en JSON por stdout.')
+
+    def handle(self, *args, **options):
+        result, error = run_sampling_audit(
+            options['election_id'],
+            seed=options['seed'],
+            risk_limit=options['risk_limit'],
+            tolerable_error_rate=options['tolerable_error_rate'],
+        )
+        if error:
+            raise CommandError(str(error))
+
+        if options['json']:
+            self.stdout.write(json.dumps(result, cls=DjangoJSONEncoder, indent=4))
+
+        for failure in result['failures']:
+            self.stderr.write(self.style.ERROR(f"🚨 {failure['status']}: TX {failure['tx_id']}"))
+
+        for number, round_ in enumerate(result['rounds'], start=1):
+            self.stderr.write(
+                f"Ronda {number}: muestra={round_['sample_size']} fallos={round_['failures']} riesgo={round_['risk']:.4f} límite={round_['risk_limit']:.4f}"
+            )
+
+        style = self.style.SUCCESS if result['passed'] else self.style.ERROR
+        self.stderr.write(style(
+            f"{result['outcome']}: {result['sample_size']} de {result['population']} votos auditados "
+            f"(semilla {result['seed']}), riesgo={result['risk'] if result['risk'] is not None else 0:.4f} "
+            f"límite={result['risk_limit']}."
+        ))
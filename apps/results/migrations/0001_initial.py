@@ -0,0 +1,34 @@
+# Generated by Django 6.0 on 2026-10-19 05:15
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReconciliationState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(default='default', max_length=50, unique=True, verbose_name='nombre')),
+                ('vote_record_watermark', models.BigIntegerField(default=0, verbose_name='marca de agua de VoteRecord')),
+                ('chain_watermark', models.BigIntegerField(default=0, verbose_name='marca de agua de la Mockchain')),
+                ('open_local_orphans', models.JSONField(default=list, help_text='tx_ids registrados localmente que aún no aparecen en la Mockchain.', verbose_name='VoteRecord sin TX')),
+                ('open_chain_orphans', models.JSONField(default=list, help_text='tx_ids publicados en la Mockchain que aún no tienen registro local.', verbose_name='TX sin VoteRecord')),
+                ('checked_total', models.BigIntegerField(default=0, verbose_name='filas conciliadas')),
+                ('mismatch_total', models.BigIntegerField(default=0, verbose_name='discrepancias de hash')),
+                ('last_report', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='último informe')),
+                ('last_run_at', models.DateTimeField(blank=True, null=True, verbose_name='última ejecución')),
+            ],
+            options={
+                'verbose_name': 'estado de conciliación',
+                'verbose_name_plural': 'estados de conciliación',
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 6.0 on 2026-10-19 06:20
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0006_backfill_next_transition_at'),
+        ('results', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResultSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='resultados')),
+                ('total_votes', models.PositiveIntegerField(verbose_name='votos contados')),
+                ('taken_at', models.DateTimeField(auto_now=True, verbose_name='calculado')),
+                ('election', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='result_snapshot', to='elections.election', verbose_name='elección')),
+            ],
+            options={
+                'verbose_name': 'resultados calculados',
+                'verbose_name_plural': 'resultados calculados',
+            },
+        ),
+    ]
@@ -1,3 +1,67 @@
 from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.translation import gettext_lazy as _
 
-# Create your models here.
+
+class ReconciliationState(models.Model):
+    """
+    Estado persistente de la conciliación incremental VoteRecord <-> Mockchain.
+    Las marcas de agua son el último id ya conciliado en cada tabla: una nueva
+    ejecución solo recorre las filas posteriores y los huérfanos aún abiertos.
+    """
+
+    # Permite mantener conciliaciones independientes (p. ej. una por nodo espejo)
+    name = models.CharField(_('nombre'), max_length=50, unique=True, default='default')
+
+    # Marcas de agua (último id conciliado)
+    vote_record_watermark = models.BigIntegerField(_('marca de agua de VoteRecord'), default=0)
+    chain_watermark = models.BigIntegerField(_('marca de agua de la Mockchain'), default=0)
+
+    # Huérfanos pendientes: se vuelven a comprobar en cada ejecución
+    open_local_orphans = models.JSONField(
+        _('VoteRecord sin TX'),
+        default=list,
+        help_text=_('tx_ids registrados localmente que aún no aparecen en la Mockchain.')
+    )
+    open_chain_orphans = models.JSONField(
+        _('TX sin VoteRecord'),
+        default=list,
+        help_text=_('tx_ids publicados en la Mockchain que aún no tienen registro local.')
+    )
+
+    # Totales acumulados y último informe
+    checked_total = models.BigIntegerField(_('filas conciliadas'), default=0)
+    mismatch_total = models.BigIntegerField(_('discrepancias de hash'), default=0)
+    last_report = models.JSONField(_('último informe'), default=dict, encoder=DjangoJSONEncoder)
+    last_run_at = models.DateTimeField(_('última ejecución'), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _('estado de conciliación')
+        verbose_name_plural = _('estados de conciliación')
+
+    def __str__(self):
+        return f"Conciliación {self.name} | VR>{self.vote_record_watermark} TX>{self.chain_watermark}"
+
+
+class ResultSnapshot(models.Model):
+    """
+    Resultados de una elección calculados al cerrarse (receptor de election_closed).
+    La vista de resultados los sirve sin recalcular mientras el total de votos
+    coincida con la participación actual.
+    """
+    election = models.OneToOneField(
+        'elections.Election',
+        on_delete=models.CASCADE,
+        related_name='result_snapshot',
+        verbose_name=_('elección')
+    )
+    data = models.JSONField(_('resultados'), encoder=DjangoJSONEncoder)
+    total_votes = models.PositiveIntegerField(_('votos contados'))
+    taken_at = models.DateTimeField(_('calculado'), auto_now=True)
+
+    class Meta:
+        verbose_name = _('resultados calculados')
+        verbose_name_plural = _('resultados calculados')
+
+    def __str__(self):
+        return f"Resultados de la elección {self.election_id} ({self.total_votes} votos)"
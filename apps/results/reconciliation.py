@@ -0,0 +1,242 @@
+# apps/results/reconciliation.py
+"""
+Conciliación incremental de VoteRecord contra la Mockchain.
+
+Cada ejecución:
+1.  Fija una cota superior de id en ambas tablas (solo filas con más de
+    RECONCILIATION_SETTLE_SECONDS de antigüedad, para no saltarse inserciones
+    cuya transacción aún no ha confirmado).
+2.  Vuelve a comprobar los huérfanos abiertos de ejecuciones anteriores.
+3.  Recorre las filas nuevas (id > marca de agua) de ambas tablas ordenadas por
+    tx_id, en lotes, y las cruza con un merge ordenado. Lo que no empareja se
+    busca en la parte ya conciliada de la otra tabla con consultas de conjunto.
+4.  Guarda las nuevas marcas de agua y los huérfanos con un UPDATE condicional:
+    si otra ejecución avanzó el estado entretanto, se aborta sin escribir.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from apps.mockchain.models import MockchainTx
+from apps.votes.models import VoteRecord
+from .models import ReconciliationState
+
+RECONCILIATION_CHUNK_SIZE = 1000
+
+
+class ReconciliationConflict(Exception):
+    """Otra conciliación guardó el estado mientras esta se ejecutaba."""
+
+
+def _upper_bound(model, cutoff):
+    return model.objects.filter(created_at__lte=cutoff).aggregate(top=Max('id'))['top'] or 0
+
+
+def _stream_sorted(queryset, fields, chunk_size):
+    """Recorre el queryset ordenado por tx_id con paginación por clave (sin OFFSET)."""
+    last_tx_id = None
+    while True:
+        page = queryset if last_tx_id is None else queryset.filter(tx_id__gt=last_tx_id)
+        rows = list(page.order_by('tx_id').values_list(*fields)[:chunk_size])
+        if not rows:
+            return
+        yield from rows
+        last_tx_id = rows[-1][0]
+
+
+def _batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class _Report:
+    """Acumula el resultado de una ejecución."""
+
+    def __init__(self):
+        self.matched = 0
+        self.mismatches = []
+        self.local_orphans = []
+        self.chain_orphans = []
+        self.resolved_orphans = 0
+
+    def compare(self, tx_id, local_hash, chain_hash, election_id):
+        if local_hash == chain_hash:
+            self.matched += 1
+        else:
+            self.mismatches.append({
+                'tx_id': tx_id,
+                'election_id': election_id,
+                'local_hash': local_hash,
+                'chain_hash': chain_hash,
+            })
+
+
+def _recheck_open_orphans(state, report, vr_top, tx_top):
+    """Comprueba de nuevo los huérfanos abiertos. Retorna los tx_ids que ya se resolvieron."""
+    resolved = set()
+    open_ids = set(state.open_local_orphans) | set(state.open_chain_orphans)
+    if not open_ids:
+        return resolved
+
+    local = {
+        tx_id: (vote_hash, election_id)
+        for tx_id, vote_hash, election_id in VoteRecord.objects.filter(tx_id__in=open_ids, id__lte=vr_top)
+        .values_list('tx_id', 'hash', 'election_id')
+    }
+    chain = dict(MockchainTx.objects.filter(tx_id__in=open_ids, id__lte=tx_top).values_list('tx_id', 'payload_hash'))
+
+    for tx_id in sorted(open_ids):
+        if tx_id in local and tx_id in chain:
+            local_hash, election_id = local[tx_id]
+            report.compare(tx_id, local_hash, chain[tx_id], election_id)
+            report.resolved_orphans += 1
+            resolved.add(tx_id)
+        elif tx_id in local:
+            report.local_orphans.append(tx_id)
+        elif tx_id in chain:
+            report.chain_orphans.append(tx_id)
+        else:
+            # El registro desapareció (p. ej. borrado en cascada de la elección): ya no hay nada que conciliar
+            report.resolved_orphans += 1
+            resolved.add(tx_id)
+    return resolved
+
+
+def _merge_new_rows(state, report, resolved, vr_top, tx_top, chunk_size):
+    """Merge ordenado por tx_id de las filas nuevas de ambas tablas."""
+    new_local = _stream_sorted(
+        VoteRecord.objects.filter(id__gt=state.vote_record_watermark, id__lte=vr_top),
+        ('tx_id', 'hash', 'election_id'),
+        chunk_size
+    )
+    new_chain = _stream_sorted(
+        MockchainTx.objects.filter(id__gt=state.chain_watermark, id__lte=tx_top),
+        ('tx_id', 'payload_hash'),
+        chunk_size
+    )
+    unmatched_local = []
+    unmatched_chain = []
+    checked = 0
+
+    local_row = next(new_local, None)
+    chain_row = next(new_chain, None)
+    while local_row is not None or chain_row is not None:
+        if chain_row is None or (local_row is not None and local_row[0] < chain_row[0]):
+            if local_row[0] not in resolved:
+                unmatched_local.append(local_row)
+            local_row = next(new_local, None)
+        elif local_row is None or chain_row[0] < local_row[0]:
+            if chain_row[0] not in resolved:
+                unmatched_chain.append(chain_row)
+            chain_row = next(new_chain, None)
+        else:
+            report.compare(local_row[0], local_row[1], chain_row[1], local_row[2])
+            local_row = next(new_local, None)
+            chain_row = next(new_chain, None)
+            checked += 2
+            continue
+        checked += 1
+
+    # Las filas nuevas sin pareja se buscan en la parte ya conciliada de la otra tabla
+    if not state.chain_watermark:
+        report.local_orphans.extend(row[0] for row in unmatched_local)
+        unmatched_local = []
+    if not state.vote_record_watermark:
+        report.chain_orphans.extend(row[0] for row in unmatched_chain)
+        unmatched_chain = []
+
+    for batch in _batched(unmatched_local, chunk_size):
+        chain = dict(
+            MockchainTx.objects.filter(tx_id__in=[row[0] for row in batch], id__lte=state.chain_watermark)
+            .values_list('tx_id', 'payload_hash')
+        )
+        for tx_id, local_hash, election_id in batch:
+            if tx_id in chain:
+                report.compare(tx_id, local_hash, chain[tx_id], election_id)
+            else:
+                report.local_orphans.append(tx_id)
+
+    for batch in _batched(unmatched_chain, chunk_size):
+        local = {
+            tx_id: (vote_hash, election_id)
+            for tx_id, vote_hash, election_id in VoteRecord.objects.filter(
+                tx_id__in=[row[0] for row in batch], id__lte=state.vote_record_watermark
+            ).values_list('tx_id', 'hash', 'election_id')
+        }
+        for tx_id, chain_hash in batch:
+            if tx_id in local:
+                local_hash, election_id = local[tx_id]
+                report.compare(tx_id, local_hash, chain_hash, election_id)
+            else:
+                report.chain_orphans.append(tx_id)
+
+    return checked
+
+
+def reconcile_votes(name='default', full=False, chunk_size=RECONCILIATION_CHUNK_SIZE):
+    """
+    Ejecuta una pasada de conciliación y retorna el informe (dict).
+    Con full=True se ignoran las marcas de agua y se concilian ambas tablas completas.
+    Lanza ReconciliationConflict si otra ejecución guardó el estado antes.
+    """
+    state, _created = ReconciliationState.objects.get_or_create(name=name)
+    previous_watermarks = (state.vote_record_watermark, state.chain_watermark)
+    if full:
+        state.vote_record_watermark = state.chain_watermark = 0
+        state.open_local_orphans = []
+        state.open_chain_orphans = []
+
+    # 1. Cota superior de la ejecución
+    started_at = timezone.now()
+    cutoff = started_at - timedelta(seconds=settings.RECONCILIATION_SETTLE_SECONDS)
+    vr_top = max(_upper_bound(VoteRecord, cutoff), state.vote_record_watermark)
+    tx_top = max(_upper_bound(MockchainTx, cutoff), state.chain_watermark)
+
+    # 2. Huérfanos de ejecuciones anteriores
+    report = _Report()
+    resolved = _recheck_open_orphans(state, report, vr_top, tx_top)
+
+    # 3. Filas nuevas
+    checked = _merge_new_rows(state, report, resolved, vr_top, tx_top, chunk_size)
+
+    result = {
+        'name': name,
+        'full': full,
+        'started_at': started_at,
+        'checked_rows': checked,
+        'matched': report.matched,
+        'mismatches': report.mismatches,
+        'local_orphans': report.local_orphans,
+        'chain_orphans': report.chain_orphans,
+        'resolved_orphans': report.resolved_orphans,
+        'vote_record_watermark': vr_top,
+        'chain_watermark': tx_top,
+    }
+
+    # 4. Persistir el avance solo si nadie más lo hizo entretanto
+    updated = ReconciliationState.objects.filter(
+        pk=state.pk,
+        vote_record_watermark=previous_watermarks[0],
+        chain_watermark=previous_watermarks[1],
+    ).update(
+        vote_record_watermark=vr_top,
+        chain_watermark=tx_top,
+        open_local_orphans=report.local_orphans,
+        open_chain_orphans=report.chain_orphans,
+        checked_total=(0 if full else state.checked_total) + checked,
+        mismatch_total=(0 if full else state.mismatch_total) + len(report.mismatches),
+        last_report=result,
+        last_run_at=timezone.now(),
+    )
+    if not updated:
+        raise ReconciliationConflict(_('Otra conciliación actualizó el estado durante esta ejecución; vuelva a intentarlo.'))
+    return result
@@ -0,0 +1,175 @@
+# apps/results/sampling_audit.py
+"""
+Auditoría por muestreo con límite de riesgo para elecciones cerradas.
+
+Se extrae una muestra aleatoria (con semilla reproducible) de VoteRecord y se
+verifica cada par VoteRecord/MockchainTx con audit_votes_bulk. Tras cada ronda
+se calcula el riesgo:
+
+    riesgo = P(X <= k | n, p)     X ~ Binomial(n, p)
+
+es decir, la probabilidad de observar k fallos o menos en n muestras si la tasa
+real de fallos fuese la tolerable p. Si el riesgo no supera el límite de la
+ronda, se confirma que la tasa de fallos es menor que p. Si no, la muestra se
+duplica; en el peor caso se llega a auditar la elección completa.
+
+Probar tras cada ronda contra el límite completo daría varias oportunidades de
+confirmar por azar (parada opcional) y el riesgo real superaría el configurado.
+Por eso el límite se reparte entre las rondas (Bonferroni): la ronda k usa
+límite / 2^k, y como esas fracciones suman menos que el límite, la probabilidad
+de confirmar por error en alguna ronda tampoco lo supera.
+
+Las TX de la cadena sin VoteRecord no entran en la muestra: de esos huérfanos
+se ocupa la conciliación (apps/results/reconciliation.py).
+"""
+import math
+import random
+import secrets
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+
+from apps.elections.models import Election
+from apps.votes.models import VoteRecord
+from .services import audit_votes_bulk, AUDIT_SUCCESS
+
+SAMPLE_FETCH_CHUNK = 500
+
+OUTCOME_CONFIRMED = 'CONFIRMED'
+OUTCOME_FULL_AUDIT = 'FULL_AUDIT'
+OUTCOME_EMPTY = 'EMPTY'
+
+
+def binomial_cdf(k, n, p):
+    """P(X <= k) para X ~ Binomial(n, p), calculada en escala logarítmica."""
+    if p <= 0:
+        return 1.0
+    if p >= 1:
+        return 1.0 if k >= n else 0.0
+    log_p, log_q = math.log(p), math.log1p(-p)
+    total = 0.0
+    for i in range(min(k, n) + 1):
+        log_term = (
+            math.lgamma(n + 1) - math.lgamma(i + 1) - math.lgamma(n - i + 1)
+            + i * log_p + (n - i) * log_q
+        )
+        total += math.exp(log_term)
+    return min(total, 1.0)
+
+
+def round_risk_limit(risk_limit, round_number):
+    """Parte del límite de riesgo asignada a la ronda round_number (desde 1): límite / 2^k."""
+    return risk_limit / 2 ** round_number
+
+
+def initial_sample_size(risk_limit, tolerable_error_rate):
+    """Menor n con el que una muestra sin fallos ya cumple el límite: (1 - p)^n <= límite."""
+    return max(1, math.ceil(math.log(risk_limit) / math.log1p(-tolerable_error_rate)))
+
+
+class _SeededPermutation:
+    """
+    Prefijo de una permutación aleatoria de range(size) (Fisher-Yates disperso):
+    ampliar la muestra conserva los elementos ya extraídos y usa memoria O(n), no O(size).
+    """
+
+    def __init__(self, size, seed):
+        self.size = size
+        self.rng = random.Random(seed)
+        self.swaps = {}
+        self.drawn = 0
+
+    def take(self, count):
+        picked = []
+        while count > 0 and self.drawn < self.size:
+            j = self.rng.randrange(self.drawn, self.size)
+            value_j = self.swaps.get(j, j)
+            self.swaps[j] = self.swaps.get(self.drawn, self.drawn)
+            self.swaps.pop(self.drawn, None)
+            picked.append(value_j)
+            self.drawn += 1
+            count -= 1
+        return picked
+
+
+def _verify_sample(record_ids):
+    """Verifica los VoteRecord indicados. Retorna la lista de resultados fallidos."""
+    failures = []
+    for start in range(0, len(record_ids), SAMPLE_FETCH_CHUNK):
+        chunk = record_ids[start:start + SAMPLE_FETCH_CHUNK]
+        tx_ids = list(VoteRecord.objects.filter(id__in=chunk).values_list('tx_id', flat=True))
+        failures.extend(r for r in audit_votes_bulk(tx_ids) if r['status'] != AUDIT_SUCCESS)
+    return failures
+
+
+def run_sampling_audit(election_id, seed=None, risk_limit=None, tolerable_error_rate=None):
+    """
+    Ejecuta la auditoría por muestreo de una elección cerrada.
+    Retorna (resultado, error) siguiendo la convención de calculate_election_results.
+    """
+    risk_limit = settings.AUDIT_RISK_LIMIT if risk_limit is None else risk_limit
+    tolerable_error_rate = settings.AUDIT_TOLERABLE_ERROR_RATE if tolerable_error_rate is None else tolerable_error_rate
+    if not (0 < risk_limit < 1 and 0 < tolerable_error_rate < 1):
+        return None, _('El límite de riesgo y la tasa de error tolerable deben estar entre 0 y 1.')
+
+    try:
+        election = Election.objects.get(pk=election_id)
+    except Election.DoesNotExist:
+        return None, _("Elección no encontrada.")
+
+    # 1. Solo elecciones cerradas: la población no puede cambiar durante la auditoría
+    if election.status != Election.Status.CLOSED:
+        return None, _('La auditoría por muestreo solo está disponible para elecciones cerradas.')
+
+    if seed is None:
+        # Se informa en el resultado para que cualquiera pueda reproducir la muestra
+        seed = secrets.randbits(32)
+
+    # 2. Población: ids ordenados (una sola columna; la permutación se aplica sobre sus índices)
+    population = list(VoteRecord.objects.filter(election_id=election_id).order_by('id').values_list('id', flat=True))
+    result = {
+        'election_id': election.id,
+        'seed': seed,
+        'risk_limit': risk_limit,
+        'tolerable_error_rate': tolerable_error_rate,
+        'population': len(population),
+        'sample_size': 0,
+        'failures': [],
+        'risk': None,
+        'rounds': [],
+    }
+    if not population:
+        result.update({'outcome': OUTCOME_EMPTY, 'observed_error_rate': 0.0, 'passed': True})
+        return result, None
+
+    # 3. Rondas de muestreo con escalado (la muestra se duplica mientras el riesgo supere el límite)
+    permutation = _SeededPermutation(len(population), seed)
+    target = min(initial_sample_size(round_risk_limit(risk_limit, 1), tolerable_error_rate), len(population))
+    while True:
+        round_limit = round_risk_limit(risk_limit, len(result['rounds']) + 1)
+        new_ids = [population[i] for i in permutation.take(target - result['sample_size'])]
+        result['failures'].extend(_verify_sample(new_ids))
+        result['sample_size'] = permutation.drawn
+
+        failures = len(result['failures'])
+        result['risk'] = binomial_cdf(failures, result['sample_size'], tolerable_error_rate)
+        result['rounds'].append({
+            'sample_size': result['sample_size'],
+            'failures': failures,
+            'risk': result['risk'],
+            'risk_limit': round_limit,
+        })
+
+        if result['sample_size'] >= len(population):
+            # Auditoría completa: la tasa de fallos es exacta, no una estimación
+            result['outcome'] = OUTCOME_FULL_AUDIT
+            result['risk'] = 0.0 if failures / len(population) < tolerable_error_rate else 1.0
+            break
+        if result['risk'] <= round_limit:
+            result['outcome'] = OUTCOME_CONFIRMED
+            break
+        target = min(target * 2, len(population))
+
+    result['observed_error_rate'] = len(result['failures']) / result['sample_size']
+    result['passed'] = result['risk'] <= risk_limit
+    return result, None
@@ -0,0 +1,21 @@
+# apps/results/serializers.py
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+
+
+class BulkAuditSerializer(serializers.Serializer):
+    """
+    Entrada de la auditoría masiva: una lista de tx_ids en JSON o un archivo
+    de texto (multipart, campo 'file') con un tx_id por línea.
+    """
+    tx_ids = serializers.ListField(
+        child=serializers.CharField(max_length=255),
+        required=False,
+        allow_empty=False
+    )
+    file = serializers.FileField(required=False)
+
+    def validate(self, attrs):
+        if not attrs.get('tx_ids') and not attrs.get('file'):
+            raise serializers.ValidationError(_('Debe enviar "tx_ids" o un archivo "file" con un tx_id por línea.'))
+        return attrs
@@ -7,6 +7,8 @@ from apps.mockchain.models import MockchainTx
 from apps.candidates.models import Candidate
 from apps.voter.models import Voter # Para el total de votantes elegibles
 from apps.votes.models import VoteRecord # CRÍTICO: La fuente de la auditoría y unicidad
+from apps.votes.turnout import turnout_for
+from .models import ResultSnapshot
 import json
 
 def calculate_election_results(election_id):
@@ -15,9 +17,9 @@ def calculate_election_results(election_id):
     basándose únicamente en los registros de auditoría (VoteRecord) 
     que han pasado la verificación de elegibilidad y unicidad.
     """
-    try:
-        election = Election.objects.get(pk=election_id)
-    except Election.DoesNotExist:
+    # El estado decide si los resultados son visibles: se lee de la base de datos, no de la caché
+    election = Election.objects.filter(pk=election_id).only('id', 'title', 'status').first()
+    if election is None:
         return None, _("Elección no encontrada.")
 
     # 1. Aplicar la Restricción de Negocio (Proceso P7)
@@ -42,7 +44,7 @@ def calculate_election_results(election_id):
     results_count = {}
     
     # 4. Pre-cargar los candidatos de la elección
-    candidates_in_election = Candidate.objects.filter(election=election).values('id', 'name')
+    candidates_in_election = Candidate.objects.filter(election_id=election.pk).values('id', 'name')
     candidate_names = {c['id']: c['name'] for c in candidates_in_election}
     candidate_ids = set(candidate_names.keys())
 
@@ -64,7 +66,7 @@ def calculate_election_results(election_id):
             
     # El total de votos es el número de VoteRecords únicos
     total_votes_cast = len(audited_vote_records)
-    total_eligible_voters = Voter.objects.filter(election=election, allowed=True).count()
+    total_eligible_voters = Voter.objects.filter(election_id=election.pk, allowed=True).count()
     
     # 6. Formatear resultados
     formatted_results = []
@@ -83,4 +85,107 @@ def calculate_election_results(election_id):
         'total_eligible_voters': total_eligible_voters,
         'total_voters_cast': total_votes_cast, # Votos únicos (un VoteRecord por persona)
         'results': sorted(formatted_results, key=lambda x: x['vote_count'], reverse=True)
-    }, None
\ No newline at end of file
+    }, None
+
+# ----------------------------------------------------------------------
+# RESULTADOS CALCULADOS AL CIERRE (ResultSnapshot)
+# ----------------------------------------------------------------------
+
+def snapshot_election_results(election_id):
+    """Calcula y guarda los resultados de una elección cerrada. Retorna el snapshot o None."""
+    results, error = calculate_election_results(election_id)
+    if error:
+        return None
+    snapshot, _created = ResultSnapshot.objects.update_or_create(
+        election_id=election_id,
+        defaults={'data': results, 'total_votes': results['total_voters_cast']}
+    )
+    return snapshot
+
+
+def cached_election_results(election_id):
+    """
+    Resultados guardados de una elección cerrada, o None si no hay o quedaron
+    atrasados (la participación actual no coincide con los votos contados).
+    """
+    snapshot = (
+        ResultSnapshot.objects.filter(election_id=election_id, election__status=Election.Status.CLOSED)
+        .values_list('data', 'total_votes').first()
+    )
+    if snapshot is None or snapshot[1] != turnout_for(election_id):
+        return None
+    return snapshot[0]
+
+# ----------------------------------------------------------------------
+# AUDITORÍA MASIVA DE VOTOS (conciliación VoteRecord <-> Mockchain)
+# ----------------------------------------------------------------------
+AUDIT_CHUNK_SIZE = 500
+
+AUDIT_SUCCESS = 'SUCCESS'
+AUDIT_FAIL_LOCAL = 'FAIL_LOCAL'
+AUDIT_FAIL_CHAIN = 'FAIL_CHAIN'
+AUDIT_FAIL_HASH = 'FAIL_HASH'
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def audit_votes_bulk(tx_ids, chunk_size=AUDIT_CHUNK_SIZE):
+    """
+    Versión por lotes de verify_single_vote_integrity (apps/results/tests/audit_logic.py).
+    Resuelve cada lote de tx_ids con dos consultas de conjunto (VoteRecord y MockchainTx)
+    y genera, en el orden de entrada, un dict por TX con su estado:
+    SUCCESS, FAIL_LOCAL, FAIL_CHAIN o FAIL_HASH.
+    """
+    for chunk in _chunks(tx_ids, chunk_size):
+        unique_ids = set(chunk)
+
+        # 1. Registros locales del lote (sin cargar user/election)
+        local = {
+            tx_id: (vote_hash, election_id)
+            for tx_id, vote_hash, election_id in VoteRecord.objects.filter(tx_id__in=unique_ids)
+            .values_list('tx_id', 'hash', 'election_id')
+        }
+
+        # 2. Transacciones inmutables del lote
+        chain = dict(
+            MockchainTx.objects.filter(tx_id__in=unique_ids).values_list('tx_id', 'payload_hash')
+        )
+
+        # 3. Conciliar los hashes en memoria
+        for tx_id in chunk:
+            local_hash, election_id = local.get(tx_id, (None, None))
+            chain_hash = chain.get(tx_id)
+            if local_hash is None:
+                audit_status = AUDIT_FAIL_LOCAL
+            elif chain_hash is None:
+                audit_status = AUDIT_FAIL_CHAIN
+            elif local_hash != chain_hash:
+                audit_status = AUDIT_FAIL_HASH
+            else:
+                audit_status = AUDIT_SUCCESS
+            yield {
+                'tx_id': tx_id,
+                'status': audit_status,
+                'election_id': election_id,
+                'local_hash': local_hash,
+                'chain_hash': chain_hash,
+            }
+
+
+def read_tx_ids(lines):
+    """Extrae tx_ids de un archivo de texto: uno por línea, ignorando vacías y comentarios (#)."""
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield line
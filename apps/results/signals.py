@@ -0,0 +1,13 @@
+# apps/results/signals.py
+from django.dispatch import receiver
+
+from apps.elections.signals import election_closed
+from .services import snapshot_election_results
+
+
+# Al cerrarse una elección se calculan sus resultados una vez, antes de que
+# lleguen las consultas: la vista los sirve sin recorrer la Mockchain.
+
+@receiver(election_closed)
+def snapshot_results_on_election_close(sender, election, **kwargs):
+    snapshot_election_results(election.pk)
@@ -1,7 +1,12 @@
 # apps/results/tests.py
 # py .\manage.py test apps.results.tests
 
+from io import StringIO
 from unittest.mock import patch
+import json
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
@@ -9,6 +14,19 @@ from django.contrib.auth import get_user_model
 
 # Importamos modelos necesarios para la FK, aunque no los usemos directamente en el test
 from apps.elections.models import Election
+from apps.mockchain.models import MockchainTx
+from apps.votes.models import VoteRecord
+from apps.results.services import audit_votes_bulk
+from apps.results.models import ReconciliationState, ResultSnapshot
+from apps.results.services import snapshot_election_results
+from apps.candidates.models import Candidate
+from apps.elections.scheduler import run_due_transitions
+from apps.elections.config_cache import get_election_config
+from apps.votes.turnout import increment_turnout
+from apps.results.reconciliation import reconcile_votes
+from apps.results.sampling_audit import (
+    binomial_cdf, initial_sample_size, round_risk_limit, run_sampling_audit, _SeededPermutation
+)
 from django.utils import timezone
 from datetime import timedelta
 
@@ -130,4 +148,329 @@ class ElectionResultsAPITests(ResultsSetupMixin, APITestCase):
         response = self.client.get(non_existent_url)
         
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
-        self.assertEqual(response.data['detail'], ERROR_MSG)
\ No newline at end of file
+        self.assertEqual(response.data['detail'], ERROR_MSG)
+
+
+class BulkVoteAuditTests(ResultsSetupMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.staff_user = User.objects.create_user(email='auditor@test.com', password='pass', is_staff=True)
+        self.audit_url = reverse('results:bulk-audit')
+
+        # TX íntegra, TX con hash alterado y registro local sin TX en la cadena
+        for tx_id, local_hash, chain_hash in (
+            ('TX_OK', 'a' * 64, 'a' * 64),
+            ('TX_HASH', 'b' * 64, 'c' * 64),
+            ('TX_NO_CHAIN', 'd' * 64, None),
+        ):
+            VoteRecord.objects.create(
+                election=self.closed_election, user=None, hash=local_hash, tx_id=tx_id, published_at=timezone.now()
+            )
+            if chain_hash:
+                MockchainTx.objects.create(tx_id=tx_id, payload_hash=chain_hash, payload={}, block_number=1)
+
+        self.tx_ids = ['TX_OK', 'TX_HASH', 'TX_NO_CHAIN', 'TX_NO_LOCAL']
+        self.expected = {
+            'TX_OK': 'SUCCESS',
+            'TX_HASH': 'FAIL_HASH',
+            'TX_NO_CHAIN': 'FAIL_CHAIN',
+            'TX_NO_LOCAL': 'FAIL_LOCAL',
+        }
+
+    def _statuses(self, response):
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        return {row['tx_id']: row['status'] for row in map(json.loads, lines)}
+
+    def test_bulk_audit_statuses_with_fixed_queries(self):
+        """Cada lote se resuelve con dos consultas, sin importar cuántas TX contenga."""
+        with self.assertNumQueries(2):
+            results = list(audit_votes_bulk(self.tx_ids * 50))
+
+        self.assertEqual(len(results), 200)
+        self.assertEqual({r['tx_id']: r['status'] for r in results}, self.expected)
+
+    def test_bulk_audit_endpoint_streams_ndjson(self):
+        """El endpoint devuelve una línea NDJSON por TX."""
+        self.client.force_authenticate(user=self.staff_user)
+
+        response = self.client.post(self.audit_url, {'tx_ids': self.tx_ids}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(self._statuses(response), self.expected)
+
+    def test_bulk_audit_endpoint_accepts_file(self):
+        """Acepta un archivo de texto con un tx_id por línea."""
+        self.client.force_authenticate(user=self.staff_user)
+        upload = SimpleUploadedFile('tx_ids.txt', b'# auditoria\nTX_OK\n\nTX_HASH\n')
+
+        response = self.client.post(self.audit_url, {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._statuses(response), {'TX_OK': 'SUCCESS', 'TX_HASH': 'FAIL_HASH'})
+
+    def test_bulk_audit_endpoint_staff_only(self):
+        """Un usuario sin privilegios de auditor recibe 403."""
+        self.client.force_authenticate(user=self.owner_user)
+
+        response = self.client.post(self.audit_url, {'tx_ids': self.tx_ids}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_audit_votes_command(self):
+        """El comando emite NDJSON por stdout y un resumen por stderr."""
+        out, err = StringIO(), StringIO()
+
+        call_command('audit_votes', *self.tx_ids, stdout=out, stderr=err)
+
+        statuses = {row['tx_id']: row['status'] for row in map(json.loads, out.getvalue().splitlines())}
+        self.assertEqual(statuses, self.expected)
+        self.assertIn('FAIL_HASH=1', err.getvalue())
+
+
+
+@override_settings(RECONCILIATION_SETTLE_SECONDS=0)
+class VoteReconciliationTests(ResultsSetupMixin, APITestCase):
+
+    def _vote(self, tx_id, local_hash):
+        return VoteRecord.objects.create(
+            election=self.closed_election, user=None, hash=local_hash, tx_id=tx_id, published_at=timezone.now()
+        )
+
+    def _tx(self, tx_id, chain_hash):
+        return MockchainTx.objects.create(tx_id=tx_id, payload_hash=chain_hash, payload={}, block_number=1)
+
+    def test_reconcile_reports_orphans_and_mismatches(self):
+        """Primera pasada: coincidencias, discrepancias y huérfanos en ambos sentidos."""
+        self._vote('TX_OK', 'a' * 64)
+        self._tx('TX_OK', 'a' * 64)
+        self._vote('TX_HASH', 'b' * 64)
+        self._tx('TX_HASH', 'c' * 64)
+        self._vote('TX_NO_CHAIN', 'd' * 64)
+        self._tx('TX_NO_LOCAL', 'e' * 64)
+
+        report = reconcile_votes()
+
+        self.assertEqual(report['matched'], 1)
+        self.assertEqual([m['tx_id'] for m in report['mismatches']], ['TX_HASH'])
+        self.assertEqual(report['local_orphans'], ['TX_NO_CHAIN'])
+        self.assertEqual(report['chain_orphans'], ['TX_NO_LOCAL'])
+
+        state = ReconciliationState.objects.get(name='default')
+        self.assertEqual(state.open_local_orphans, ['TX_NO_CHAIN'])
+        self.assertEqual(state.mismatch_total, 1)
+
+    def test_reconcile_rerun_only_checks_new_rows(self):
+        """Con la marca de agua guardada, una segunda pasada solo mira filas nuevas y huérfanos abiertos."""
+        for i in range(20):
+            self._vote(f'TX_{i:03d}', f'{i:064d}')
+            self._tx(f'TX_{i:03d}', f'{i:064d}')
+        self._tx('TX_PENDING', 'f' * 64)
+        self.assertEqual(reconcile_votes()['checked_rows'], 41)
+
+        # Nueva fila local que resuelve el huérfano de la cadena + un voto nuevo completo
+        self._vote('TX_PENDING', 'f' * 64)
+        self._vote('TX_NEW', '1' * 64)
+        self._tx('TX_NEW', '1' * 64)
+
+        report = reconcile_votes()
+
+        self.assertEqual(report['checked_rows'], 3)
+        self.assertEqual(report['matched'], 2)
+        self.assertEqual(report['resolved_orphans'], 1)
+        self.assertEqual(report['chain_orphans'], [])
+        self.assertEqual(report['mismatches'], [])
+
+    def test_reconcile_new_row_matches_already_reconciled_side(self):
+        """Una TX nueva cuyo VoteRecord ya estaba por debajo de la marca de agua se empareja."""
+        self._vote('TX_LATE', 'a' * 64)
+        self._vote('TX_OTHER', 'b' * 64)
+        self._tx('TX_OTHER', 'b' * 64)
+        reconcile_votes()
+
+        # El VoteRecord queda como huérfano abierto; tampoco puede volver a contarse al llegar su TX
+        self._tx('TX_LATE', 'a' * 64)
+        report = reconcile_votes()
+
+        self.assertEqual(report['matched'], 1)
+        self.assertEqual(report['resolved_orphans'], 1)
+        self.assertEqual(report['local_orphans'], [])
+
+    def test_reconcile_votes_command_full(self):
+        """El comando --full reconcilia todo de nuevo e informa por stderr."""
+        self._vote('TX_OK', 'a' * 64)
+        self._tx('TX_OK', 'a' * 64)
+        reconcile_votes()
+        out, err = StringIO(), StringIO()
+
+        call_command('reconcile_votes', '--full', '--json', stdout=out, stderr=err)
+
+        self.assertEqual(json.loads(out.getvalue())['matched'], 1)
+        self.assertIn('1 coinciden', err.getvalue())
+
+
+
+class SamplingAuditTests(ResultsSetupMixin, APITestCase):
+
+    def _seed_votes(self, count, corrupted=0):
+        """Crea count pares VoteRecord/MockchainTx; los primeros 'corrupted' con hash distinto en la cadena."""
+        VoteRecord.objects.bulk_create([
+            VoteRecord(election=self.closed_election, hash=f'{i:064d}', tx_id=f'TX_{i}', published_at=timezone.now())
+            for i in range(count)
+        ])
+        MockchainTx.objects.bulk_create([
+            MockchainTx(
+                tx_id=f'TX_{i}',
+                payload_hash=('f' if i < corrupted else '0') + f'{i:063d}',
+                payload={},
+                block_number=1
+            )
+            for i in range(count)
+        ])
+
+    def test_binomial_risk_helpers(self):
+        """Sin fallos bastan 299 muestras para un riesgo del 5 % con tasa tolerable del 1 %."""
+        self.assertEqual(initial_sample_size(0.05, 0.01), 299)
+        self.assertLessEqual(binomial_cdf(0, 299, 0.01), 0.05)
+        self.assertGreater(binomial_cdf(0, 298, 0.01), 0.05)
+        self.assertAlmostEqual(binomial_cdf(10, 10, 0.3), 1.0)
+
+    def test_round_risk_limits_never_add_up_to_more_than_the_limit(self):
+        """Cada ronda recibe la mitad que la anterior: la suma de todas nunca supera el límite."""
+        self.assertEqual(round_risk_limit(0.05, 1), 0.025)
+        self.assertEqual(round_risk_limit(0.05, 2), 0.0125)
+        self.assertLessEqual(sum(round_risk_limit(0.05, k) for k in range(1, 40)), 0.05)
+
+    def test_seeded_permutation_is_reproducible_and_extends_prefix(self):
+        """La misma semilla da la misma muestra y escalar conserva lo ya extraído."""
+        first = _SeededPermutation(1000, 7)
+        second = _SeededPermutation(1000, 7)
+        prefix = first.take(50)
+        self.assertEqual(prefix + first.take(50), second.take(100))
+        self.assertEqual(len(set(_SeededPermutation(30, 1).take(30))), 30)
+
+    def test_clean_election_is_confirmed_with_a_sample(self):
+        """Una elección íntegra se confirma auditando solo una fracción de los votos."""
+        self._seed_votes(600)
+
+        result, error = run_sampling_audit(self.closed_election.pk, seed=42, risk_limit=0.05, tolerable_error_rate=0.01)
+
+        self.assertIsNone(error)
+        self.assertEqual(result['outcome'], 'CONFIRMED')
+        self.assertTrue(result['passed'])
+        # La primera ronda se dimensiona para su parte del límite (0.025), no para el 5 % completo
+        self.assertEqual(result['sample_size'], initial_sample_size(0.025, 0.01))
+        self.assertEqual(result['rounds'][0]['risk_limit'], 0.025)
+        self.assertLessEqual(result['risk'], 0.025)
+
+    def test_round_is_not_confirmed_against_the_full_risk_limit(self):
+        """Un riesgo por debajo del límite total pero por encima del de la ronda no confirma."""
+        self._seed_votes(600)
+        # 299 muestras sin fallos: riesgo ~0.0495, que bastaría contra el 5 % completo
+        with patch('apps.results.sampling_audit.initial_sample_size', return_value=299):
+            result, error = run_sampling_audit(self.closed_election.pk, seed=42, risk_limit=0.05, tolerable_error_rate=0.01)
+
+        self.assertIsNone(error)
+        first = result['rounds'][0]
+        self.assertEqual(first['sample_size'], 299)
+        self.assertLess(first['risk'], 0.05)
+        self.assertGreater(first['risk'], first['risk_limit'])
+        self.assertEqual(result['rounds'][1]['sample_size'], 598)
+        self.assertEqual(result['rounds'][1]['risk_limit'], 0.0125)
+        self.assertEqual(result['outcome'], 'CONFIRMED')
+
+    def test_corrupted_election_escalates_to_full_audit(self):
+        """Con demasiados fallos la muestra se duplica hasta auditar la elección completa."""
+        self._seed_votes(600, corrupted=60)
+
+        result, error = run_sampling_audit(self.closed_election.pk, seed=42, risk_limit=0.05, tolerable_error_rate=0.01)
+
+        self.assertIsNone(error)
+        self.assertEqual(result['outcome'], 'FULL_AUDIT')
+        self.assertFalse(result['passed'])
+        self.assertEqual(result['sample_size'], 600)
+        self.assertEqual(len(result['failures']), 60)
+        self.assertEqual([r['sample_size'] for r in result['rounds']], [368, 600])
+
+    def test_sampling_audit_requires_closed_election(self):
+        """La auditoría por muestreo se rechaza en elecciones abiertas."""
+        result, error = run_sampling_audit(self.open_election.pk)
+
+        self.assertIsNone(result)
+        self.assertIn('cerradas', str(error))
+
+    def test_sampling_audit_endpoint_staff_only(self):
+        """El endpoint es solo para auditores y devuelve la semilla usada."""
+        self._seed_votes(10)
+        url = reverse('results:sampling-audit', kwargs={'election_pk': self.closed_election.pk})
+
+        self.client.force_authenticate(user=self.owner_user)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        staff = User.objects.create_user(email='auditor@test.com', password='pass', is_staff=True)
+        self.client.force_authenticate(user=staff)
+        response = self.client.get(url, {'seed': 5})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['seed'], 5)
+        self.assertEqual(response.data['outcome'], 'FULL_AUDIT')
+        self.assertTrue(response.data['passed'])
+
+
+class ResultSnapshotTests(ResultsSetupMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.candidate = Candidate.objects.create(election=self.open_election, name='Ana')
+        self.url = reverse('results:election-results', kwargs={'election_pk': self.open_election.pk})
+
+    def _vote(self, tx_id):
+        MockchainTx.objects.create(
+            tx_id=tx_id, payload_hash=tx_id.ljust(64, '0'), block_number=1,
+            payload={'election_id': self.open_election.pk, 'candidates': [self.candidate.pk]}
+        )
+        VoteRecord.objects.create(
+            election=self.open_election, user=None, hash=tx_id.ljust(64, '0'), tx_id=tx_id, published_at=timezone.now()
+        )
+        increment_turnout(self.open_election.pk)
+
+    def test_closing_snapshots_results_and_view_serves_them(self):
+        """El planificador calcula los resultados al cerrar y la vista no vuelve a recorrer la Mockchain."""
+        self._vote('TX_1')
+        Election.objects.filter(pk=self.open_election.pk).update(end_at=timezone.now() - timedelta(minutes=1))
+        self.open_election.refresh_from_db()
+        self.open_election.save()
+
+        summary = run_due_transitions()
+
+        self.assertIn(self.open_election.pk, summary['closed'])
+        snapshot = ResultSnapshot.objects.get(election=self.open_election)
+        self.assertEqual(snapshot.total_votes, 1)
+        with patch('apps.results.views.calculate_election_results') as mock_calculate:
+            response = self.client.get(self.url)
+        mock_calculate.assert_not_called()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['vote_count'], 1)
+
+    def test_results_visibility_uses_current_status_not_cached_config(self):
+        """Cerrada en otro proceso (sin que la caché de este se entere), los resultados ya se publican."""
+        self.assertEqual(get_election_config(self.open_election.pk).status, Election.Status.OPEN)
+        Election.objects.filter(pk=self.open_election.pk).update(status=Election.Status.CLOSED)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], Election.Status.CLOSED)
+
+    def test_stale_snapshot_is_recalculated(self):
+        """Si se registraron votos después del cierre, la vista recalcula."""
+        self.open_election.status = Election.Status.CLOSED
+        self.open_election.save()
+        snapshot_election_results(self.open_election.pk)
+        self._vote('TX_LATE')
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_voters_cast'], 1)
@@ -129,4 +129,8 @@ registrado correctamente y no ha sido alterado.
 ### Confirma
 - Que el sistema puede conciliar el estado local del voto con la fuente de verdad inmutable.
 - Que el 'tx_id' es la clave de unión entre el registro local y la cadena.
+
+### Auditoría masiva
+Para miles de TX use audit_votes_bulk (apps/results/services.py), expuesta como
+`py manage.py audit_votes --file tx_ids.txt` y POST /api/v1/results/audit/.
 """
\ No newline at end of file
@@ -1,10 +1,16 @@
 # apps/results/urls.py
 from django.urls import path
-from .views import election_results
+from .views import election_results, bulk_audit_votes, sampling_audit
 
 app_name = 'results'
 
 urlpatterns = [
     # api/v1/results/<election_pk>/
     path('<int:election_pk>/', election_results, name='election-results'),
+
+    # api/v1/results/audit/ (Auditoría masiva de tx_ids, respuesta NDJSON)
+    path('audit/', bulk_audit_votes, name='bulk-audit'),
+
+    # api/v1/results/<election_pk>/sampling-audit/ (Auditoría por muestreo, elecciones cerradas)
+    path('<int:election_pk>/sampling-audit/', sampling_audit, name='sampling-audit'),
 ]
\ No newline at end of file
@@ -2,9 +2,14 @@
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import AllowAny # Permitimos consulta pública
+from rest_framework.permissions import AllowAny, IsAuthenticated # Permitimos consulta pública
+from django.http import StreamingHttpResponse
 from django.utils.translation import gettext_lazy as _
-from .services import calculate_election_results
+import json
+
+from .serializers import BulkAuditSerializer
+from .services import calculate_election_results, cached_election_results, audit_votes_bulk, read_tx_ids
+from .sampling_audit import run_sampling_audit
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
@@ -12,6 +17,11 @@ def election_results(request, election_pk):
     """
     Consulta los resultados finales de una elección a través de la Mockchain.
     """
+    # Resultados calculados al cierre por el planificador (si siguen al día)
+    snapshot = cached_election_results(election_pk)
+    if snapshot is not None:
+        return Response(snapshot, status=status.HTTP_200_OK)
+
     results, error = calculate_election_results(election_pk)
 
     if error:
@@ -27,4 +37,70 @@ def election_results(request, election_pk):
     # 3. Formatear y añadir nombres de candidatos (necesitaríamos un Serializer o lógica adicional para esto)
     
     # Por ahora, retornamos los conteos brutos:
-    return Response(results, status=status.HTTP_200_OK)
\ No newline at end of file
+    return Response(results, status=status.HTTP_200_OK)
+
+
+# --- NUEVA VISTA: AUDITORÍA MASIVA DE VOTOS (Auditores) ---
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_audit_votes(request):
+    """
+    Concilia en bloque una lista de tx_ids (JSON "tx_ids" o archivo "file")
+    contra VoteRecord y la Mockchain. La respuesta se transmite como NDJSON:
+    una línea por TX con su estado (SUCCESS/FAIL_LOCAL/FAIL_CHAIN/FAIL_HASH).
+    Para listas muy grandes conviene el archivo, que no pasa por el límite de cuerpo JSON.
+    """
+    if not request.user.is_staff:
+        return Response(
+            {'detail': _('Solo los auditores (administradores) pueden realizar auditorías masivas.')},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    serializer = BulkAuditSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    data = serializer.validated_data
+    if data.get('file'):
+        tx_ids = list(read_tx_ids(data['file']))
+    else:
+        tx_ids = data['tx_ids']
+
+    lines = (json.dumps(result) + '\n' for result in audit_votes_bulk(tx_ids))
+    return StreamingHttpResponse(lines, content_type='application/x-ndjson')
+
+
+
+# --- NUEVA VISTA: AUDITORÍA POR MUESTREO CON LÍMITE DE RIESGO ---
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def sampling_audit(request, election_pk):
+    """
+    Audita una muestra aleatoria (semilla reproducible) de los votos de una
+    elección cerrada, escalándola hasta cumplir el límite de riesgo.
+    Parámetros opcionales: seed, risk_limit, tolerable_error_rate.
+    """
+    if not request.user.is_staff:
+        return Response(
+            {'detail': _('Solo los auditores (administradores) pueden realizar auditorías por muestreo.')},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    try:
+        seed = request.query_params.get('seed')
+        risk_limit = request.query_params.get('risk_limit')
+        error_rate = request.query_params.get('tolerable_error_rate')
+        seed = int(seed) if seed not in (None, '') else None
+        risk_limit = float(risk_limit) if risk_limit not in (None, '') else None
+        error_rate = float(error_rate) if error_rate not in (None, '') else None
+    except ValueError:
+        return Response(
+            {'detail': _('seed debe ser entero; risk_limit y tolerable_error_rate deben ser numéricos.')},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    result, error = run_sampling_audit(election_pk, seed=seed, risk_limit=risk_limit, tolerable_error_rate=error_rate)
+    if error:
+        return Response({'detail': error}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(result, status=status.HTTP_200_OK)
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class VoterConfig(AppConfig):
     name = 'apps.voter'
+
+    def ready(self):
+        # Registra los receptores que mantienen el prefiltro de "ya votó"
+        from . import signals  # noqa: F401
@@ -0,0 +1,118 @@
+# apps/voter/prefilter.py
+"""
+Prefiltro en memoria de "ya votó" por elección.
+
+Cada proceso mantiene, por elección, un mapa de bits de los user_id con
+Voter.voted=True. Se carga de forma perezosa (una consulta por elección) y se
+actualiza al confirmarse cada transacción de voto (transaction.on_commit).
+
+Solo sirve para rechazar rápido los duplicados conocidos (reintentos, recargas)
+sin abrir una transacción: un "no" del prefiltro no significa nada y la base de
+datos sigue siendo la autoridad. Por eso nunca debe contener un usuario que no
+haya votado; los falsos negativos (votos de otros procesos) son aceptables.
+"""
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import transaction
+
+from apps.core.metrics import metrics
+from apps.elections.config_cache import get_election_config
+from .models import Voter
+
+_LOAD_CHUNK_SIZE = 5000
+
+
+class _VotedBitmap:
+    """Conjunto de user_id como mapa de bits (1 bit por id: 1M usuarios ~ 125 KB)."""
+    __slots__ = ('bits',)
+
+    def __init__(self):
+        self.bits = bytearray()
+
+    def add(self, user_id):
+        index = user_id >> 3
+        if index >= len(self.bits):
+            self.bits.extend(bytes(index + 1 - len(self.bits)))
+        self.bits[index] |= 1 << (user_id & 7)
+
+    def discard(self, user_id):
+        index = user_id >> 3
+        if index < len(self.bits):
+            self.bits[index] &= ~(1 << (user_id & 7)) & 0xFF
+
+    def __contains__(self, user_id):
+        index = user_id >> 3
+        return index < len(self.bits) and bool(self.bits[index] & (1 << (user_id & 7)))
+
+
+_elections = OrderedDict()
+_lock = threading.Lock()
+
+
+def _load(election_id):
+    """Carga el mapa de la elección (fuera del lock) y lo registra con política LRU."""
+    bitmap = _VotedBitmap()
+    voted_ids = Voter.objects.filter(election_id=election_id, voted=True).values_list('user_id', flat=True)
+    for user_id in voted_ids.iterator(chunk_size=_LOAD_CHUNK_SIZE):
+        bitmap.add(user_id)
+
+    with _lock:
+        # Otro hilo pudo cargarla mientras tanto: se conserva la primera (ya recibe los on_commit)
+        bitmap = _elections.setdefault(election_id, bitmap)
+        _elections.move_to_end(election_id)
+        while len(_elections) > settings.VOTED_PREFILTER_MAX_ELECTIONS:
+            _elections.popitem(last=False)
+    return bitmap
+
+
+def has_voted(election_id, user_id):
+    """True solo si se sabe con certeza que el usuario ya votó en la elección."""
+    with _lock:
+        bitmap = _elections.get(election_id)
+        if bitmap is not None:
+            _elections.move_to_end(election_id)
+    if bitmap is None:
+        # Un id inexistente no se carga: su mapa vacío desplazaría del LRU a una elección real
+        if get_election_config(election_id) is None:
+            return False
+        bitmap = _load(election_id)
+
+    if user_id in bitmap:
+        metrics.increment('voted_prefilter_hits_total', {'election': str(election_id)})
+        return True
+    return False
+
+
+def _update(election_id, user_id, voted):
+    with _lock:
+        bitmap = _elections.get(election_id)
+        if bitmap is None:
+            # No cargada: la carga perezosa ya leerá el valor confirmado
+            return
+        if voted:
+            bitmap.add(user_id)
+        else:
+            bitmap.discard(user_id)
+
+
+def mark_voted(election_id, user_id):
+    """Registra el voto cuando (y solo si) la transacción en curso se confirma."""
+    transaction.on_commit(lambda: _update(election_id, user_id, True))
+
+
+def forget_voter(election_id, user_id):
+    """Quita al usuario del prefiltro (su registro de padrón cambió o se borró)."""
+    # Se aplica de inmediato: quitar nunca produce un rechazo incorrecto
+    _update(election_id, user_id, False)
+
+
+def drop_election(election_id):
+    with _lock:
+        _elections.pop(election_id, None)
+
+
+def reset_prefilter():
+    with _lock:
+        _elections.clear()
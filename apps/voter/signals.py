@@ -0,0 +1,42 @@
+# apps/voter/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.elections.models import Election
+from apps.elections.signals import election_closed
+from .models import Voter
+from .prefilter import drop_election, forget_voter, mark_voted
+
+
+# Mantiene el prefiltro de "ya votó" coherente con los cambios hechos vía ORM.
+# Los votos de la ruta de votación (UPDATE condicional) lo actualizan explícitamente.
+
+@receiver(post_save, sender=Voter)
+def sync_prefilter_on_voter_save(sender, instance, **kwargs):
+    if instance.voted:
+        mark_voted(instance.election_id, instance.user_id)
+    else:
+        forget_voter(instance.election_id, instance.user_id)
+
+
+@receiver(post_delete, sender=Voter)
+def sync_prefilter_on_voter_delete(sender, instance, **kwargs):
+    forget_voter(instance.election_id, instance.user_id)
+
+
+@receiver(post_save, sender=Election)
+def drop_prefilter_for_new_election(sender, instance, created, **kwargs):
+    # Una elección nueva puede reutilizar la pk de una borrada
+    if created:
+        drop_election(instance.pk)
+
+
+@receiver(post_delete, sender=Election)
+def drop_prefilter_for_deleted_election(sender, instance, **kwargs):
+    drop_election(instance.pk)
+
+
+@receiver(election_closed)
+def drop_prefilter_for_closed_election(sender, election, **kwargs):
+    # Nadie más vota en una elección cerrada: libera su mapa de bits
+    drop_election(election.pk)
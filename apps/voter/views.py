@@ -7,6 +7,7 @@ from django.shortcuts import get_object_or_404
 from django.utils.translation import gettext_lazy as _
 
 from apps.elections.models import Election
+from apps.elections.config_cache import get_election_config_or_404
 from .models import Voter
 from .serializers import VoterSerializer
 # Reutilizamos la clase de permisos de la app core
@@ -20,10 +21,14 @@ def voter_list_create(request, election_pk):
     GET: Lista el padrón de una elección (solo para el dueño de la elección).
     POST: Agrega o habilita un usuario en el padrón de una elección.
     """
-    election = get_object_or_404(Election, pk=election_pk)
+    # Las escrituras deciden con el estado leído de la base de datos; el listado usa la copia en caché
+    if request.method == 'POST':
+        election = get_object_or_404(Election, pk=election_pk)
+    else:
+        election = get_election_config_or_404(election_pk)
     
     # 1. Verificación de Permisos: Solo el dueño puede crear/listar el padrón
-    if election.owner != request.user:
+    if election.owner_id != request.user.pk:
         return Response(
             {'detail': _('Solo el administrador de la elección puede gestionar el padrón.')},
             status=status.HTTP_403_FORBIDDEN
@@ -54,7 +59,7 @@ def voter_list_create(request, election_pk):
     
     # 4. Manejo de GET (Listado del padrón)
     elif request.method == 'GET':
-        voters = Voter.objects.filter(election=election).select_related('user')
+        voters = Voter.objects.filter(election_id=election.pk).select_related('user')
         serializer = VoterSerializer(voters, many=True)
         return Response(serializer.data)
 
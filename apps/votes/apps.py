@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class VotesConfig(AppConfig):
     name = 'apps.votes'
+
+    def ready(self):
+        # Registra el receptor que crea los shards de participación de cada elección
+        from . import signals  # noqa: F401
@@ -0,0 +1,148 @@
+# apps/votes/async_views.py
+"""
+Variantes asíncronas (ASGI) del registro y la verificación de votos.
+
+DRF no soporta vistas async, así que son vistas de Django puras:
+- Autenticación JWT validando el token en el propio bucle de eventos y
+  cargando el usuario con el ORM asíncrono (User.objects.aget).
+- Lecturas con el ORM asíncrono (afirst).
+- La sección transaccional (UPDATE condicional + INSERT) reutiliza
+  services.register_vote mediante sync_to_async: Django no permite
+  transaction.atomic en código asíncrono.
+
+Las vistas síncronas de views.py siguen siendo las rutas principales. Estas no
+aceptan Idempotency-Key.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import OperationalError
+from django.http import JsonResponse
+from django.utils.translation import gettext_lazy as _
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from apps.core.admission import REJECTION_DETAIL, admit
+from apps.mockchain.models import MockchainTx
+from .models import VoteRecord
+from .receipts import issue_receipt
+from .serializers import VoteTxRegistrationSerializer
+from .services import VoteRejected, database_busy, register_vote
+
+_jwt = JWTAuthentication()
+
+
+def _json(data, status_code, **headers):
+    response = JsonResponse(data, status=status_code, encoder=DjangoJSONEncoder, json_dumps_params={'ensure_ascii': False})
+    for name, value in headers.items():
+        response[name] = value
+    return response
+
+
+async def _authenticate(request):
+    """Equivalente asíncrono de JWTAuthentication.authenticate. Retorna el usuario o None."""
+    header = _jwt.get_header(request)
+    raw_token = _jwt.get_raw_token(header) if header is not None else None
+    if raw_token is None:
+        return None
+    try:
+        token = _jwt.get_validated_token(raw_token)
+        user = await get_user_model().objects.aget(
+            **{jwt_settings.USER_ID_FIELD: token[jwt_settings.USER_ID_CLAIM]}
+        )
+    except (AuthenticationFailed, KeyError, get_user_model().DoesNotExist):
+        return None
+    return user if user.is_active else None
+
+
+def _unauthenticated():
+    return _json(
+        {'detail': _('Las credenciales de autenticación no se proveyeron.')},
+        status.HTTP_401_UNAUTHORIZED,
+        **{'WWW-Authenticate': 'Bearer realm="api"'}
+    )
+
+
+# --- NUEVA VISTA: REGISTRO DE TRANSACCIÓN ASÍNCRONO (Proceso P6, ASGI) ---
+@csrf_exempt
+@require_POST
+async def register_vote_transaction_async(request):
+    """
+    Misma semántica que register_vote_transaction (cuerpo, errores y comprobante),
+    servida por el bucle de eventos de ASGI.
+    """
+    user = await _authenticate(request)
+    if user is None:
+        return _unauthenticated()
+
+    try:
+        body = json.loads(request.body or b'{}')
+    except ValueError:
+        return _json({'detail': _('JSON mal formado.')}, status.HTTP_400_BAD_REQUEST)
+
+    serializer = VoteTxRegistrationSerializer(data=body)
+    if not serializer.is_valid():
+        return _json(serializer.errors, status.HTTP_400_BAD_REQUEST)
+    data = serializer.validated_data
+
+    # 1. Control de admisión (sin base de datos)
+    gate, retry_after = admit(data['election_id'], 'register_vote_transaction_async')
+    if gate is None:
+        return _json({'detail': REJECTION_DETAIL}, status.HTTP_429_TOO_MANY_REQUESTS, **{'Retry-After': str(retry_after)})
+
+    try:
+        # 2. Duplicados conocidos (prefiltro), bloqueo del votante y VoteRecord en una
+        #    transacción: register_vote es síncrono
+        vote_record = await sync_to_async(register_vote)(data['election_id'], user, data['tx_id'], data['vote_hash'])
+    except VoteRejected as rejection:
+        return _json(rejection.data, rejection.status_code)
+    except OperationalError:
+        return _json(database_busy('register_vote_transaction_async'), status.HTTP_503_SERVICE_UNAVAILABLE, **{'Retry-After': '1'})
+    except Exception:
+        return _json({'detail': _('Error interno al finalizar el registro del voto.')}, status.HTTP_500_INTERNAL_SERVER_ERROR)
+    finally:
+        gate.release()
+
+    return _json({
+        'status': _('Voto registrado exitosamente en el sistema.'),
+        'tx_id': data['tx_id'],
+        'receipt': issue_receipt(vote_record.election_id, vote_record.tx_id, vote_record.hash, vote_record.published_at),
+    }, status.HTTP_201_CREATED)
+
+
+# --- NUEVA VISTA: VERIFICACIÓN INDIVIDUAL ASÍNCRONA (P8, ASGI) ---
+@require_GET
+async def verify_my_vote_async(request, election_pk):
+    """
+    Misma respuesta que verify_my_vote, con las dos lecturas hechas con el ORM asíncrono.
+    """
+    user = await _authenticate(request)
+    if user is None:
+        return _unauthenticated()
+
+    # 1. Registro local de auditoría (VoteRecord)
+    vote_record = await VoteRecord.objects.filter(election_id=election_pk, user=user).afirst()
+    if vote_record is None:
+        return _json({'detail': _('No se encontró registro de voto para esta elección.')}, status.HTTP_404_NOT_FOUND)
+
+    # 2. Transacción en la Mockchain
+    mock_tx = await MockchainTx.objects.filter(tx_id=vote_record.tx_id).afirst()
+    if mock_tx is None:
+        return _json({'detail': _('El registro local no coincide con la transacción en la cadena. Contacte a soporte.')}, status.HTTP_404_NOT_FOUND)
+
+    # 3. Datos de auditoría
+    return _json({
+        'status': _('Voto Registrado y Verificado'),
+        'election_id': election_pk,
+        'transaction_id': vote_record.tx_id,
+        'vote_hash': vote_record.hash,
+        'published_at': vote_record.published_at,
+        'receipt': issue_receipt(vote_record.election_id, vote_record.tx_id, vote_record.hash, vote_record.published_at),
+        'mockchain_payload_sample': mock_tx.payload,
+    }, status.HTTP_200_OK)
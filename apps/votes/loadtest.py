@@ -0,0 +1,225 @@
+# apps/votes/loadtest.py
+"""
+Arnés de carga para reproducir la apertura de una elección.
+
+1.  seed_election() crea una elección abierta con N votantes habilitados
+    (todos con la misma contraseña; el hash se calcula una sola vez).
+2.  run_load_test() lanza el flujo real contra un servidor ya arrancado,
+    con un pool de hilos: login -> verify-eligibility -> mockchain publish
+    -> register-tx -> verify.
+3.  LoadTestReport agrega throughput, percentiles de latencia por paso,
+    desglose de errores y los errores de bloqueo de la base de datos.
+
+Lo usa el comando `py manage.py loadtest`.
+"""
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import requests
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from apps.candidates.models import Candidate
+from apps.elections.models import Election
+from apps.voter.models import Voter
+
+STEPS = ('login', 'verify-eligibility', 'publish', 'register-tx', 'verify')
+LOADTEST_EMAIL_DOMAIN = 'loadtest.local'
+
+# Las vistas de voto responden 503 con este código ante un OperationalError (services.database_busy);
+# los demás pasos solo muestran el mensaje del backend si el servidor corre con DEBUG
+LOCK_ERROR_CODE = 'database_busy'
+LOCK_ERROR_MARKERS = ('database is locked', 'database table is locked', 'deadlock', 'lock wait timeout')
+
+
+@transaction.atomic
+def seed_election(num_voters, password, label=None):
+    """Crea la elección, sus candidatos y num_voters votantes. Retorna (election, [emails])."""
+    User = get_user_model()
+    label = label or uuid.uuid4().hex[:8]
+    password_hash = make_password(password)
+
+    owner = User.objects.create(
+        email=f'owner-{label}@{LOADTEST_EMAIL_DOMAIN}', name='Loadtest Owner', password=password_hash
+    )
+    election = Election.objects.create(
+        owner=owner,
+        title=f'Prueba de carga {label}',
+        status=Election.Status.OPEN,
+        start_at=timezone.now() - timedelta(minutes=1),
+        end_at=timezone.now() + timedelta(days=1),
+    )
+    Candidate.objects.bulk_create([
+        Candidate(election=election, name=f'Candidato {n}') for n in (1, 2, 3)
+    ])
+    emails = [f'voter-{label}-{i}@{LOADTEST_EMAIL_DOMAIN}' for i in range(num_voters)]
+    users = User.objects.bulk_create([
+        User(email=email, name=f'Votante {i}', password=password_hash) for i, email in enumerate(emails)
+    ])
+    Voter.objects.bulk_create([Voter(election=election, user=user, allowed=True) for user in users])
+    return election, emails
+
+
+def pending_emails(election):
+    """Votantes sembrados de una elección existente que aún no han votado."""
+    return list(
+        election.voters_register.filter(voted=False, user__email__endswith=f'@{LOADTEST_EMAIL_DOMAIN}')
+        .order_by('pk').values_list('user__email', flat=True)
+    )
+
+
+def cleanup_election(election):
+    """Borra la elección sembrada y sus usuarios (votos, padrón y candidatos caen en cascada)."""
+    User = get_user_model()
+    user_ids = list(election.voters_register.values_list('user_id', flat=True))
+    owner_id = election.owner_id
+    with transaction.atomic():
+        election.delete()
+        User.objects.filter(pk__in=user_ids + [owner_id], email__endswith=f'@{LOADTEST_EMAIL_DOMAIN}').delete()
+
+
+class LoadTestReport:
+    """Agregador thread-safe de resultados por paso."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = Counter()
+        self.lock_errors = Counter()
+        self.completed_flows = 0
+        self.requests = 0
+        self.started = None
+        self.finished = None
+
+    def record(self, step, elapsed, status_code, body):
+        with self.lock:
+            self.requests += 1
+            self.latencies[step].append(elapsed)
+            if status_code is None or status_code >= 400:
+                self.errors[(step, status_code)] += 1
+                if self._is_lock_error(status_code, body):
+                    self.lock_errors[step] += 1
+
+    @staticmethod
+    def _is_lock_error(status_code, body):
+        if status_code == 503:
+            try:
+                if json.loads(body).get('code') == LOCK_ERROR_CODE:
+                    return True
+            except (TypeError, ValueError, AttributeError):
+                pass
+        return any(marker in (body or '').lower() for marker in LOCK_ERROR_MARKERS)
+
+    def flow_completed(self):
+        with self.lock:
+            self.completed_flows += 1
+
+    @staticmethod
+    def _percentile(ordered, fraction):
+        return ordered[min(len(ordered) - 1, max(0, int(round(len(ordered) * fraction)) - 1))]
+
+    def summary(self):
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        steps = {}
+        for step in STEPS:
+            ordered = sorted(self.latencies.get(step, []))
+            if not ordered:
+                continue
+            steps[step] = {
+                'requests': len(ordered),
+                'p50_ms': self._percentile(ordered, 0.50) * 1000,
+                'p90_ms': self._percentile(ordered, 0.90) * 1000,
+                'p95_ms': self._percentile(ordered, 0.95) * 1000,
+                'p99_ms': self._percentile(ordered, 0.99) * 1000,
+                'max_ms': ordered[-1] * 1000,
+            }
+        return {
+            'elapsed_s': elapsed,
+            'requests': self.requests,
+            'completed_flows': self.completed_flows,
+            'throughput_rps': self.requests / elapsed if elapsed else 0.0,
+            'flows_per_s': self.completed_flows / elapsed if elapsed else 0.0,
+            'steps': steps,
+            'errors': [
+                {'step': step, 'status': status_code if status_code is not None else 'connection', 'count': count}
+                for (step, status_code), count in sorted(self.errors.items(), key=lambda item: -item[1])
+            ],
+            'lock_errors': dict(self.lock_errors),
+        }
+
+
+def _ballot(election_id, candidate_ids, voter_index):
+    payload = {
+        'election_id': election_id,
+        'candidates': [candidate_ids[voter_index % len(candidate_ids)]],
+        'nonce': uuid.uuid4().hex,
+    }
+    payload_hash = hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+    return payload, payload_hash
+
+
+def _voter_flow(base_url, election_id, candidate_ids, email, password, voter_index, report, timeout, local):
+    """Recorre el flujo completo de un votante. Se detiene en el primer paso fallido."""
+    session = getattr(local, 'session', None)
+    if session is None:
+        session = local.session = requests.Session()
+
+    def call(step, method, path, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = session.request(method, base_url + path, timeout=timeout, **kwargs)
+        except requests.RequestException as e:
+            report.record(step, time.perf_counter() - started, None, str(e))
+            return None
+        report.record(step, time.perf_counter() - started, response.status_code, response.text)
+        return response if response.status_code < 400 else None
+
+    response = call('login', 'POST', '/api/v1/users/auth/login/', json={'email': email, 'password': password})
+    if response is None:
+        return
+    headers = {'Authorization': f"Bearer {response.json()['access']}"}
+
+    response = call('verify-eligibility', 'GET', f'/api/v1/elections/{election_id}/verify-eligibility/', headers=headers)
+    if response is None or not response.json().get('eligible'):
+        return
+
+    payload, payload_hash = _ballot(election_id, candidate_ids, voter_index)
+    response = call('publish', 'POST', '/api/v1/mockchain/publish/', json={'payload': payload, 'payload_hash': payload_hash}, headers=headers)
+    if response is None:
+        return
+
+    response = call('register-tx', 'POST', '/api/v1/votes/register-tx/', headers=headers, json={
+        'election_id': election_id, 'tx_id': response.json()['tx_id'], 'vote_hash': payload_hash,
+    })
+    if response is None:
+        return
+
+    if call('verify', 'GET', f'/api/v1/votes/verify/{election_id}/', headers=headers) is not None:
+        report.flow_completed()
+
+
+def run_load_test(base_url, election, emails, password, concurrency=50, timeout=30):
+    """Ejecuta el flujo de todos los votantes con 'concurrency' hilos. Retorna el LoadTestReport."""
+    candidate_ids = list(Candidate.objects.filter(election=election).values_list('id', flat=True)) or [0]
+    report = LoadTestReport()
+    local = threading.local()
+    base_url = base_url.rstrip('/')
+
+    report.started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [
+            pool.submit(_voter_flow, base_url, election.pk, candidate_ids, email, password, i, report, timeout, local)
+            for i, email in enumerate(emails)
+        ]
+        for future in futures:
+            future.result()
+    report.finished = time.perf_counter()
+    return report
@@ -0,0 +1,85 @@
+# apps/votes/management/commands/loadtest.py
+# py manage.py loadtest --voters 500 --concurrency 100 --base-url http://127.0.0.1:8000
+# py manage.py loadtest --seed-only --voters 5000       (siembra y termina; imprime el id de la elección)
+# py manage.py loadtest --election 42 --cleanup         (reusa la elección sembrada y la borra al final)
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.elections.models import Election
+from apps.votes.loadtest import STEPS, cleanup_election, pending_emails, run_load_test, seed_election
+
+
+class Command(BaseCommand):
+    help = (
+        'Simula la apertura de una elección: siembra N votantes y recorre login, verify-eligibility, '
+        'publicación en la Mockchain, register-tx y verify contra un servidor ya arrancado.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--voters', type=int, default=200, help='Votantes a sembrar.')
+        parser.add_argument('--concurrency', type=int, default=50, help='Votantes simultáneos (hilos).')
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000', help='Servidor a probar (misma base de datos).')
+        parser.add_argument('--password', default='loadtest-pass', help='Contraseña de los usuarios sembrados.')
+        parser.add_argument('--election', type=int, default=None, help='Reusa una elección sembrada antes.')
+        parser.add_argument('--seed-only', action='store_true', help='Solo siembra los datos.')
+        parser.add_argument('--cleanup', action='store_true', help='Borra la elección y sus usuarios al terminar.')
+        parser.add_argument('--timeout', type=float, default=30, help='Timeout por petición, en segundos.')
+        parser.add_argument('--json', action='store_true', help='Escribe el informe en JSON por stdout.')
+
+    def handle(self, *args, **options):
+        if options['voters'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--voters y --concurrency deben ser positivos.')
+
+        # 1. Datos: elección nueva o una sembrada anteriormente
+        if options['election'] is not None:
+            election = Election.objects.filter(pk=options['election']).first()
+            if election is None:
+                raise CommandError(f"La elección {options['election']} no existe.")
+            emails = pending_emails(election)
+            if not emails:
+                raise CommandError('La elección no tiene votantes sembrados pendientes de votar.')
+        else:
+            election, emails = seed_election(options['voters'], options['password'])
+        self.stderr.write(f'Elección {election.pk}: {len(emails)} votantes.')
+
+        if options['seed_only']:
+            self.stdout.write(str(election.pk))
+            return
+
+        # 2. Carga concurrente
+        try:
+            report = run_load_test(
+                options['base_url'], election, emails, options['password'],
+                concurrency=options['concurrency'], timeout=options['timeout'],
+            )
+        finally:
+            if options['cleanup']:
+                cleanup_election(election)
+
+        # 3. Informe
+        summary = report.summary()
+        if options['json']:
+            self.stdout.write(json.dumps(summary, indent=4))
+            return
+
+        self.stdout.write(
+            f"Duración {summary['elapsed_s']:.1f} s | {summary['requests']} peticiones "
+            f"({summary['throughput_rps']:.1f} req/s) | {summary['completed_flows']}/{len(emails)} votos completos "
+            f"({summary['flows_per_s']:.1f} votos/s)"
+        )
+        for step in STEPS:
+            row = summary['steps'].get(step)
+            if row is None:
+                continue
+            self.stdout.write(
+                f"  {step:<20} n={row['requests']:<6} p50={row['p50_ms']:8.1f} ms  p95={row['p95_ms']:8.1f} ms  "
+                f"p99={row['p99_ms']:8.1f} ms  max={row['max_ms']:8.1f} ms"
+            )
+        for error in summary['errors']:
+            self.stdout.write(self.style.WARNING(f"  error {error['step']} [{error['status']}]: {error['count']}"))
+        if summary['lock_errors']:
+            self.stdout.write(self.style.ERROR(f"  errores de bloqueo de la base de datos: {summary['lock_errors']}"))
+
+        style = self.style.SUCCESS if summary['completed_flows'] == len(emails) else self.style.WARNING
+        self.stderr.write(style('Prueba de carga terminada.'))
@@ -0,0 +1,29 @@
+# Generated by Django 6.0 on 2026-10-19 05:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0002_initial'),
+        ('votes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TurnoutShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField(verbose_name='shard')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='votos')),
+                ('election', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='turnout_shards', to='elections.election', verbose_name='elección')),
+            ],
+            options={
+                'verbose_name': 'shard de participación',
+                'verbose_name_plural': 'shards de participación',
+                'unique_together': {('election', 'shard')},
+            },
+        ),
+    ]
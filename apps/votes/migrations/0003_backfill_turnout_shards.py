@@ -0,0 +1,33 @@
+# Backfill de los contadores de participación para las elecciones existentes
+
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Count
+
+
+def backfill_turnout_shards(apps, schema_editor):
+    Election = apps.get_model('elections', 'Election')
+    VoteRecord = apps.get_model('votes', 'VoteRecord')
+    TurnoutShard = apps.get_model('votes', 'TurnoutShard')
+
+    num_shards = getattr(settings, 'TURNOUT_SHARDS', 16)
+    votes_cast = dict(
+        VoteRecord.objects.values('election_id').annotate(total=Count('id')).values_list('election_id', 'total')
+    )
+    # Los votos ya emitidos van al shard 0; el resto empieza en cero
+    TurnoutShard.objects.bulk_create([
+        TurnoutShard(election_id=election_id, shard=shard, count=votes_cast.get(election_id, 0) if shard == 0 else 0)
+        for election_id in Election.objects.values_list('id', flat=True).iterator()
+        for shard in range(num_shards)
+    ], batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('votes', '0002_turnoutshard'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_turnout_shards, migrations.RunPython.noop),
+    ]
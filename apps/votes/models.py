@@ -68,3 +68,27 @@ class VoteRecord(models.Model):
 
     def __str__(self):
         return f"Voto en {self.election.title} | TX: {self.tx_id[:10]}..."
+
+
+class TurnoutShard(models.Model):
+    """
+    Contador de votos emitidos repartido en varias filas por elección.
+    Cada voto incrementa un shard al azar, así los votos simultáneos no se
+    serializan sobre una sola fila; la participación es la suma de los shards.
+    """
+    election = models.ForeignKey(
+        Election,
+        on_delete=models.CASCADE,
+        related_name='turnout_shards',
+        verbose_name=_('elección')
+    )
+    shard = models.PositiveSmallIntegerField(_('shard'))
+    count = models.PositiveIntegerField(_('votos'), default=0)
+
+    class Meta:
+        verbose_name = _('shard de participación')
+        verbose_name_plural = _('shards de participación')
+        unique_together = ['election', 'shard']
+
+    def __str__(self):
+        return f"Participación elección {self.election_id} | shard {self.shard}: {self.count}"
@@ -0,0 +1,103 @@
+# apps/votes/receipts.py
+"""
+Comprobantes de voto firmados con HMAC-SHA256.
+
+Formato compacto:  v1.<payload base64url>.<firma base64url>
+donde el payload es el JSON {"e": election_id, "t": tx_id, "h": vote_hash, "ts": unix}.
+
+La verificación solo necesita el secreto, no la base de datos. Este módulo no
+importa Django al cargarse, de modo que verify_receipt() se puede usar como
+ayudante fuera del servidor:
+
+    VALIDVOTE_RECEIPT_SECRET=... python apps/votes/receipts.py <comprobante>
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import sys
+from datetime import datetime, timezone as dt_timezone
+
+RECEIPT_VERSION = 'v1'
+
+
+class InvalidReceipt(ValueError):
+    """El comprobante está mal formado o su firma no es válida."""
+
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def _sign(secret, message):
+    if isinstance(secret, str):
+        secret = secret.encode('utf-8')
+    return hmac.new(secret, message.encode('ascii'), hashlib.sha256).digest()
+
+
+def receipt_secret():
+    """Secreto de firma configurado en settings.VOTE_RECEIPT_SECRET."""
+    from django.conf import settings
+    return settings.VOTE_RECEIPT_SECRET
+
+
+def issue_receipt(election_id, tx_id, vote_hash, published_at, secret=None):
+    """Genera el comprobante firmado de un voto registrado."""
+    body = json.dumps(
+        {'e': election_id, 't': tx_id, 'h': vote_hash, 'ts': int(published_at.timestamp())},
+        separators=(',', ':'),
+        sort_keys=True,
+    )
+    message = f'{RECEIPT_VERSION}.{_b64encode(body.encode("utf-8"))}'
+    signature = _sign(secret if secret is not None else receipt_secret(), message)
+    return f'{message}.{_b64encode(signature)}'
+
+
+def verify_receipt(token, secret=None):
+    """
+    Valida la firma del comprobante y retorna sus datos:
+    {'election_id', 'tx_id', 'vote_hash', 'issued_at'}. Lanza InvalidReceipt si no es válido.
+    """
+    if not isinstance(token, str) or token.count('.') != 2:
+        raise InvalidReceipt('Formato de comprobante inválido.')
+
+    version, body, signature = token.split('.')
+    if version != RECEIPT_VERSION:
+        raise InvalidReceipt('Versión de comprobante no soportada.')
+
+    expected = _sign(secret if secret is not None else receipt_secret(), f'{version}.{body}')
+    try:
+        signature_ok = hmac.compare_digest(expected, _b64decode(signature))
+    except ValueError:
+        signature_ok = False
+    if not signature_ok:
+        raise InvalidReceipt('La firma del comprobante no es válida.')
+
+    try:
+        data = json.loads(_b64decode(body))
+        return {
+            'election_id': data['e'],
+            'tx_id': data['t'],
+            'vote_hash': data['h'],
+            'issued_at': datetime.fromtimestamp(data['ts'], tz=dt_timezone.utc),
+        }
+    except (ValueError, TypeError, KeyError):
+        raise InvalidReceipt('Formato de comprobante inválido.')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2 or 'VALIDVOTE_RECEIPT_SECRET' not in os.environ:
+        print("Uso: VALIDVOTE_RECEIPT_SECRET=<secreto> python apps/votes/receipts.py <comprobante>")
+        sys.exit(2)
+    try:
+        receipt = verify_receipt(sys.argv[1], secret=os.environ['VALIDVOTE_RECEIPT_SECRET'])
+    except InvalidReceipt as e:
+        print(f"!!! Comprobante NO válido: {e}")
+        sys.exit(1)
+    print("✅ Comprobante válido:")
+    print(json.dumps(receipt, indent=4, default=str))
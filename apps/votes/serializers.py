@@ -1,18 +1,14 @@
 from rest_framework import serializers
 from .models import VoteRecord
-from apps.elections.models import Election
 # Ya no necesitamos Candidate, VoteEmissionSerializer ha sido reemplazado
 
 class VoteTxRegistrationSerializer(serializers.Serializer):
     """
     Serializer para recibir los datos de confirmación de la Mockchain desde el frontend (Proceso P6).
-    Solo valida la existencia de la elección, el ID de la transacción y el hash.
+    Solo valida el formato de la elección, el ID de la transacción y el hash.
+    La existencia de la elección la resuelve la vista sin una consulta adicional.
     """
-    election_id = serializers.PrimaryKeyRelatedField(
-        queryset=Election.objects.all(), 
-        required=True,
-        source='election' # Aseguramos que se resuelva al objeto Election
-    )
+    election_id = serializers.IntegerField(required=True, min_value=1)
     
     # Identificador de Transacción de la Mockchain
     tx_id = serializers.CharField(required=True, max_length=100)
@@ -21,6 +17,48 @@ class VoteTxRegistrationSerializer(serializers.Serializer):
     vote_hash = serializers.CharField(required=True, max_length=64)
 
 
+class VoteCastSerializer(serializers.Serializer):
+    """
+    Serializer para la emisión combinada: el frontend envía el payload del voto
+    y su hash, y el servidor publica en la Mockchain y registra en un solo paso.
+    """
+    election_id = serializers.IntegerField(required=True, min_value=1)
+
+    # Contenido del voto a publicar (mismo formato que /mockchain/publish/)
+    payload = serializers.JSONField(required=True)
+
+    # Hash del contenido del voto, generado por el frontend
+    payload_hash = serializers.CharField(required=True, max_length=64)
+
+
+class VoteCastMultiSerializer(serializers.Serializer):
+    """
+    Serializer para la emisión combinada en varias elecciones a la vez:
+    una papeleta (mismo formato que VoteCastSerializer) por elección.
+    """
+    MAX_BALLOTS = 20
+
+    ballots = VoteCastSerializer(many=True, allow_empty=False, max_length=MAX_BALLOTS)
+
+    def validate_ballots(self, ballots):
+        election_ids = [ballot['election_id'] for ballot in ballots]
+        if len(set(election_ids)) != len(election_ids):
+            raise serializers.ValidationError('Solo se admite una papeleta por elección.')
+        hashes = [ballot['payload_hash'] for ballot in ballots]
+        if len(set(hashes)) != len(hashes):
+            raise serializers.ValidationError('Cada papeleta debe tener un payload_hash distinto.')
+        return ballots
+
+
+class ReceiptVerificationSerializer(serializers.Serializer):
+    """
+    Serializer para verificar un comprobante de voto firmado.
+    Con deep=True se contrasta además contra el VoteRecord y la Mockchain.
+    """
+    receipt = serializers.CharField(required=True, max_length=1024)
+    deep = serializers.BooleanField(required=False, default=False)
+
+
 class VoteRecordSerializer(serializers.ModelSerializer):
     """
     Serializer para exponer el registro de auditoría del voto.
@@ -0,0 +1,285 @@
+# apps/votes/services.py
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Exists
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+
+from apps.core.metrics import metrics
+from apps.elections.models import Election
+from apps.elections.config_cache import get_election_config
+from apps.voter.models import Voter
+from apps.voter.prefilter import has_voted, mark_voted
+from apps.mockchain.models import MockchainTx
+from apps.mockchain.services import publish_payload, publish_payloads
+from .models import VoteRecord
+from .turnout import increment_turnout
+from .group_commit import GroupCommitWriter
+
+
+class VoteRejected(Exception):
+    """
+    Rechazo de negocio al registrar un voto. Lleva el cuerpo y el código HTTP
+    que la vista debe devolver. Lanzarla dentro de transaction.atomic deshace todo.
+    """
+    def __init__(self, data, status_code):
+        super().__init__(data)
+        self.data = data
+        self.status_code = status_code
+
+
+DATABASE_BUSY_CODE = 'database_busy'
+
+
+def database_busy(view_name):
+    """
+    Cuerpo del 503 con el que las vistas de voto responden a un OperationalError
+    (base de datos bloqueada, deadlock, espera de bloqueo agotada): el campo
+    'code' lo distingue de un 500 genérico. Lo cuenta en vote_database_busy_total.
+    """
+    metrics.increment('vote_database_busy_total', {'view': view_name})
+    return {
+        'detail': _('La base de datos está ocupada. Reintente en unos segundos.'),
+        'code': DATABASE_BUSY_CODE,
+    }
+
+
+def _lock_voter(election_id, user, *conditions):
+    """
+    Bloqueo de Votante en una sola sentencia:
+    UPDATE voter SET voted=1 WHERE election/user AND allowed AND NOT voted [AND conditions]
+    Con peticiones concurrentes solo una puede pasar voted de False a True.
+    Retorna el número de filas bloqueadas (0 o 1).
+    """
+    locked = Voter.objects.filter(
+        election_id=election_id,
+        user=user,
+        allowed=True,
+        voted=False,
+    ).filter(*conditions).update(voted=True, updated_at=timezone.now())
+    if locked:
+        mark_voted(election_id, user.pk)
+    return locked
+
+
+def _reject_known_duplicate(election_id, user):
+    """
+    Rechaza sin abrir transacción a quien el prefiltro en memoria ya sabe que votó
+    (reintentos, recargas). Si el prefiltro no lo conoce decide la base de datos.
+    """
+    if has_voted(election_id, user.pk):
+        raise VoteRejected({'detail': _('Error de Seguridad: Ya ha emitido su voto en esta elección.')}, status.HTTP_403_FORBIDDEN)
+
+
+def rejection_for(election_id, user):
+    """
+    Explica por qué el UPDATE condicional no bloqueó a ningún votante,
+    respetando el orden de verificaciones original (padrón, habilitación, voto, TX).
+    Es la ruta fría: solo se ejecuta cuando el voto se rechaza.
+    """
+    voter_record = Voter.objects.filter(election_id=election_id, user=user).values('allowed', 'voted').first()
+
+    if voter_record is None:
+        if get_election_config(election_id) is None:
+            return VoteRejected(
+                {'election_id': [_('Invalid pk "%(pk)s" - object does not exist.') % {'pk': election_id}]},
+                status.HTTP_400_BAD_REQUEST
+            )
+        # Este error solo debería ocurrir si el usuario fue validado externamente y luego eliminado del padrón.
+        return VoteRejected({'detail': _('Error de Elegibilidad: No tiene un registro de padrón válido para votar.')}, status.HTTP_403_FORBIDDEN)
+
+    if not voter_record['allowed']:
+        return VoteRejected({'detail': _('Error de Seguridad: No está habilitado para votar.')}, status.HTTP_403_FORBIDDEN)
+
+    if voter_record['voted']:
+        return VoteRejected({'detail': _('Error de Seguridad: Ya ha emitido su voto en esta elección.')}, status.HTTP_403_FORBIDDEN)
+
+    # Votante válido: lo único que pudo fallar es la TX (Prevención de envío de hash falsos)
+    return VoteRejected({'detail': _('Error de Integridad: La transacción o el hash no se encontraron en el libro mayor inmutable (Mockchain).')}, status.HTTP_400_BAD_REQUEST)
+
+
+def register_vote(election_id, user, tx_id, vote_hash):
+    """
+    Proceso P6: registra un voto cuya TX ya fue publicada en la Mockchain.
+    Ruta feliz: UPDATE condicional del votante (incluye EXISTS sobre la TX) + UPDATE de un shard
+    de participación + INSERT del VoteRecord.
+    Con VOTE_GROUP_COMMIT el voto se confirma en lote con los de otras peticiones (group_commit.py).
+    Retorna el VoteRecord o lanza VoteRejected.
+    """
+    _reject_known_duplicate(election_id, user)
+
+    # Dentro de una transacción del llamante el voto debe quedar en ella: se aplica aquí mismo
+    if settings.VOTE_GROUP_COMMIT and not transaction.get_connection().in_atomic_block:
+        return _group_commit_writer.submit(election_id, user, tx_id, vote_hash)
+    return _apply_registration(election_id, user, tx_id, vote_hash)
+
+
+def _apply_registration(election_id, user, tx_id, vote_hash):
+    """Bloqueo del votante + shard de participación + VoteRecord en una transacción (o savepoint)."""
+    chain_tx = MockchainTx.objects.filter(payload_hash=vote_hash, tx_id=tx_id)
+    with transaction.atomic():
+        if _lock_voter(election_id, user, Exists(chain_tx)):
+            increment_turnout(election_id)
+            return VoteRecord.objects.create(
+                election_id=election_id,
+                user=user,
+                hash=vote_hash,
+                tx_id=tx_id,
+                published_at=timezone.now()
+            )
+    raise rejection_for(election_id, user)
+
+
+_group_commit_writer = GroupCommitWriter(_apply_registration)
+
+
+def cast_vote(election_id, user, payload, payload_hash):
+    """
+    Elegibilidad, publicación en la Mockchain y registro del voto en un solo flujo.
+    Todo ocurre en una transacción: nunca queda una TX publicada sin su VoteRecord
+    ni un votante bloqueado sin TX. Retorna (MockchainTx, VoteRecord) o lanza VoteRejected.
+    """
+    _reject_known_duplicate(election_id, user)
+
+    with transaction.atomic():
+        # 1. Elegibilidad y bloqueo (sin TX todavía: la publicamos nosotros)
+        if not _lock_voter(election_id, user):
+            raise rejection_for(election_id, user)
+
+        # 2. Publicación en la Mockchain
+        try:
+            with transaction.atomic():
+                tx = publish_payload(payload, payload_hash)
+        except IntegrityError:
+            raise VoteRejected(
+                {'detail': _('Error de Integridad: Ya existe una transacción publicada con ese hash.')},
+                status.HTTP_400_BAD_REQUEST
+            )
+
+        # 3. Registro de auditoría
+        vote_record = VoteRecord.objects.create(
+            election_id=election_id,
+            user=user,
+            hash=tx.payload_hash,
+            tx_id=tx.tx_id,
+            published_at=tx.created_at
+        )
+        increment_turnout(election_id)
+    return tx, vote_record
+
+
+class _LockRace(Exception):
+    """Otra petición votó en alguna de las elecciones entre la lectura y el bloqueo."""
+
+
+def _multi_rejections(user, ballots):
+    """
+    Elegibilidad de todas las papeletas con consultas de conjunto (padrón, hashes
+    ya publicados y, solo si falta algún padrón, existencia de las elecciones).
+    Retorna {election_id: VoteRejected} de las papeletas que no pueden registrarse.
+    """
+    election_ids = [ballot['election_id'] for ballot in ballots]
+    voter_rows = {
+        row['election_id']: row
+        for row in Voter.objects.filter(user=user, election_id__in=election_ids).values('election_id', 'allowed', 'voted')
+    }
+    published = set(
+        MockchainTx.objects.filter(payload_hash__in=[ballot['payload_hash'] for ballot in ballots])
+        .values_list('payload_hash', flat=True)
+    )
+    missing = [election_id for election_id in election_ids if election_id not in voter_rows]
+    existing = set(Election.objects.filter(pk__in=missing).values_list('pk', flat=True)) if missing else set()
+
+    rejections = {}
+    for ballot in ballots:
+        election_id = ballot['election_id']
+        row = voter_rows.get(election_id)
+        if row is None and election_id not in existing:
+            rejections[election_id] = VoteRejected(
+                {'election_id': [_('Invalid pk "%(pk)s" - object does not exist.') % {'pk': election_id}]},
+                status.HTTP_400_BAD_REQUEST
+            )
+        elif row is None:
+            rejections[election_id] = VoteRejected({'detail': _('Error de Elegibilidad: No tiene un registro de padrón válido para votar.')}, status.HTTP_403_FORBIDDEN)
+        elif not row['allowed']:
+            rejections[election_id] = VoteRejected({'detail': _('Error de Seguridad: No está habilitado para votar.')}, status.HTTP_403_FORBIDDEN)
+        elif row['voted']:
+            rejections[election_id] = VoteRejected({'detail': _('Error de Seguridad: Ya ha emitido su voto en esta elección.')}, status.HTTP_403_FORBIDDEN)
+        elif ballot['payload_hash'] in published:
+            rejections[election_id] = VoteRejected({'detail': _('Error de Integridad: Ya existe una transacción publicada con ese hash.')}, status.HTTP_400_BAD_REQUEST)
+    return rejections
+
+
+CAST_VOTES_ATTEMPTS = 3
+
+
+def cast_votes(user, ballots):
+    """
+    Emisión combinada para varias elecciones en una petición.
+    ballots: [{'election_id', 'payload', 'payload_hash'}] con elecciones y hashes distintos.
+
+    1. Elegibilidad de todas con consultas de conjunto (el padrón del usuario en
+       esas elecciones se lee en una sola consulta; ya votó si voted=True).
+    2. Una transacción para las admitidas: un UPDATE condicional que bloquea al
+       votante en todas a la vez, la publicación en bloque en la Mockchain y el
+       INSERT en bloque de los VoteRecord. O se registran todas o ninguna.
+    Si otra petición vota en medio (el UPDATE bloquea menos filas de las leídas)
+    o publica uno de los hashes (IntegrityError), se deshace todo y se vuelve a
+    evaluar: la nueva lectura rechaza solo las papeletas afectadas. Si el choque
+    de hashes persiste tras CAST_VOTES_ATTEMPTS intentos, se rechazan las
+    papeletas de ese intento, cada una con su error.
+
+    Retorna una lista, en el orden de entrada, de (election_id, tx, vote_record, None)
+    o (election_id, None, None, VoteRejected). Lanza VoteRejected si la carrera del
+    bloqueo persiste.
+    """
+    for attempt in range(1, CAST_VOTES_ATTEMPTS + 1):
+        rejections = _multi_rejections(user, ballots)
+        accepted = [ballot for ballot in ballots if ballot['election_id'] not in rejections]
+
+        registered = {}
+        if accepted:
+            accepted_ids = [ballot['election_id'] for ballot in accepted]
+            try:
+                with transaction.atomic():
+                    # 1. Bloqueo de todas las elecciones admitidas en una sentencia
+                    locked = Voter.objects.filter(
+                        user=user, election_id__in=accepted_ids, allowed=True, voted=False
+                    ).update(voted=True, updated_at=timezone.now())
+                    if locked != len(accepted_ids):
+                        raise _LockRace()
+
+                    # 2. Publicación en bloque
+                    txs = publish_payloads([(ballot['payload'], ballot['payload_hash']) for ballot in accepted])
+
+                    # 3. Registros de auditoría y participación
+                    vote_records = VoteRecord.objects.bulk_create([
+                        VoteRecord(election_id=tx_ballot['election_id'], user=user, hash=tx.payload_hash, tx_id=tx.tx_id, published_at=tx.created_at)
+                        for tx_ballot, tx in zip(accepted, txs)
+                    ])
+                    for election_id in accepted_ids:
+                        increment_turnout(election_id)
+            except _LockRace:
+                if attempt < CAST_VOTES_ATTEMPTS:
+                    continue
+                raise VoteRejected({'detail': _('Error de Seguridad: Ya ha emitido su voto en esta elección.')}, status.HTTP_403_FORBIDDEN)
+            except IntegrityError:
+                if attempt < CAST_VOTES_ATTEMPTS:
+                    continue
+                for election_id in accepted_ids:
+                    rejections[election_id] = VoteRejected(
+                        {'detail': _('Error de Integridad: Ya existe una transacción publicada con ese hash.')},
+                        status.HTTP_400_BAD_REQUEST
+                    )
+            else:
+                for election_id in accepted_ids:
+                    mark_voted(election_id, user.pk)
+                registered = {vote_record.election_id: (tx, vote_record) for tx, vote_record in zip(txs, vote_records)}
+
+        return [
+            (ballot['election_id'], *registered[ballot['election_id']], None)
+            if ballot['election_id'] in registered
+            else (ballot['election_id'], None, None, rejections[ballot['election_id']])
+            for ballot in ballots
+        ]
@@ -0,0 +1,15 @@
+# apps/votes/signals.py
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.elections.models import Election
+from .turnout import ensure_turnout_shards
+
+
+# Los shards de participación se crean con la elección para que la ruta de
+# votación solo tenga que hacer el UPDATE del contador.
+
+@receiver(post_save, sender=Election)
+def create_turnout_shards(sender, instance, created, **kwargs):
+    if created:
+        ensure_turnout_shards(instance.pk)
@@ -0,0 +1,142 @@
+import os
+import sys
+import django
+import hashlib
+import json
+import statistics
+import time
+from datetime import timedelta
+
+# ------------------- CONFIGURACIÓN DE ENTORNO -------------------
+PROJECT_BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.insert(0, PROJECT_BASE_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'validvote.settings')
+
+try:
+    django.setup()
+except Exception as e:
+    print(f"ERROR: Fallo al inicializar Django para el benchmark de votación: {e}")
+    sys.exit(1)
+# ---------------------------------------------------------------
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.elections.models import Election
+from apps.users.models import User
+from apps.voter.models import Voter
+
+NUM_VOTERS = int(os.environ.get('BENCH_VOTERS', 300))
+
+
+def _seed(label, num_voters):
+    """Crea una elección abierta con num_voters votantes habilitados."""
+    owner = User.objects.create(email=f'owner-{label}@bench.local', name='Owner')
+    election = Election.objects.create(
+        owner=owner,
+        title=f'Benchmark {label}',
+        status=Election.Status.OPEN,
+        start_at=timezone.now() - timedelta(hours=1),
+        end_at=timezone.now() + timedelta(hours=1),
+    )
+    users = User.objects.bulk_create([
+        User(email=f'{label}-{i}@bench.local', name=f'Votante {i}', password='!')
+        for i in range(num_voters)
+    ])
+    Voter.objects.bulk_create([Voter(election=election, user=user, allowed=True) for user in users])
+    return election, users
+
+
+def _ballot(election, label, i):
+    payload = {"election_id": election.pk, "selections": [i % 3], "nonce": f"{label}-{i}"}
+    payload_hash = hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+    return payload, payload_hash
+
+
+def bench_two_step(num_voters):
+    """Ruta actual: POST /mockchain/publish/ y luego POST /votes/register-tx/."""
+    election, users = _seed('two-step', num_voters)
+    client = APIClient()
+    latencies = []
+    for i, user in enumerate(users):
+        payload, payload_hash = _ballot(election, 'two-step', i)
+        client.force_authenticate(user=user)
+        started = time.perf_counter()
+        published = client.post(reverse('mockchain:publish-tx'), {'payload': payload, 'payload_hash': payload_hash}, format='json')
+        registered = client.post(reverse('votes:register-tx'), {
+            'election_id': election.pk,
+            'tx_id': published.data['tx_id'],
+            'vote_hash': payload_hash,
+        }, format='json')
+        latencies.append(time.perf_counter() - started)
+        assert registered.status_code == 201, registered.data
+    return latencies
+
+
+def bench_combined(num_voters):
+    """Ruta combinada: un único POST /votes/cast/."""
+    election, users = _seed('combined', num_voters)
+    client = APIClient()
+    latencies = []
+    for i, user in enumerate(users):
+        payload, payload_hash = _ballot(election, 'combined', i)
+        client.force_authenticate(user=user)
+        started = time.perf_counter()
+        response = client.post(reverse('votes:cast'), {
+            'election_id': election.pk,
+            'payload': payload,
+            'payload_hash': payload_hash,
+        }, format='json')
+        latencies.append(time.perf_counter() - started)
+        assert response.status_code == 201, response.data
+    return latencies
+
+
+def _report(label, latencies):
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(f"  {label:<12} votos={len(latencies):<5} media={statistics.mean(latencies) * 1000:7.2f} ms  "
+          f"p95={p95 * 1000:7.2f} ms  total={sum(latencies):6.2f} s")
+
+
+if __name__ == '__main__':
+    # Se trabaja sobre una base de datos de pruebas desechable, nunca sobre db.sqlite3
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    # El benchmark mide la latencia del servidor, no el control de admisión
+    admission_off = override_settings(ADMISSION_MAX_CONCURRENT_PER_ELECTION=0, ADMISSION_RATE_PER_ELECTION=0)
+    admission_off.enable()
+    try:
+        print(f"--- Benchmark de emisión de votos ({NUM_VOTERS} votantes por ruta) ---")
+        two_step = bench_two_step(NUM_VOTERS)
+        combined = bench_combined(NUM_VOTERS)
+        _report('dos pasos', two_step)
+        _report('combinada', combined)
+        print(f"  Mejora de latencia media: {statistics.mean(two_step) / statistics.mean(combined):.2f}x "
+              f"(sin contar el RTT de red, que la ruta combinada también reduce a la mitad)")
+    finally:
+        admission_off.disable()
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+"""
+================================================================================
+BENCHMARK: EMISIÓN EN DOS PASOS vs. EMISIÓN COMBINADA
+================================================================================
+
+Uso: py apps/votes/tests/bench_cast.py   (BENCH_VOTERS=1000 para más muestras)
+
+Compara, en proceso y sobre una base de datos de pruebas, la latencia por
+votante de:
+
+1.  **Dos pasos:** publish_transaction (Mockchain) + register_vote_transaction.
+2.  **Combinada:** publish_and_register_vote (/votes/cast/).
+
+El tiempo medido es solo de servidor. En producción la ruta combinada ahorra
+además un viaje de ida y vuelta completo del cliente por voto.
+"""
@@ -5,17 +5,46 @@ from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import OperationalError, connection
+from django.test.utils import CaptureQueriesContext
 import hashlib
+import time
 import json
+from unittest.mock import patch
 
 from apps.elections.models import Election
 from apps.voter.models import Voter
 from apps.mockchain.models import MockchainTx
-from apps.votes.models import VoteRecord
+from apps.votes.models import VoteRecord, TurnoutShard
+from apps.votes.turnout import turnout_for
+from apps.votes import services
+from apps.votes.services import VoteRejected, register_vote, _group_commit_writer
+from apps.votes.group_commit import _PendingVote
+from apps.core.metrics import metrics
+from concurrent.futures import ThreadPoolExecutor
+from apps.core.models import IdempotencyKey
+from apps.voter import prefilter
+from apps.elections.config_cache import reset_config_cache
+from apps.voter.prefilter import has_voted, reset_prefilter
+from apps.votes.loadtest import LoadTestReport, cleanup_election, pending_emails, seed_election
+from rest_framework_simplejwt.tokens import RefreshToken
 
 User = get_user_model()
 
+# Sentencias de control transaccional que no cuentan para el presupuesto de consultas
+TRANSACTION_CONTROL = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT', 'BEGIN', 'COMMIT')
+
+def data_statements(captured):
+    """Filtra las consultas capturadas dejando solo las sentencias de datos."""
+    return [q['sql'] for q in captured.captured_queries if not q['sql'].upper().startswith(TRANSACTION_CONTROL)]
+
+def _request_fingerprint_for(data):
+    """Huella que apps.core.idempotency calcula para un cuerpo JSON."""
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+
 class VoteRecordAPITests(APITestCase):
     
     def setUp(self):
@@ -69,6 +98,7 @@ class VoteRecordAPITests(APITestCase):
         
         # 5. URLs
         self.register_url = reverse('votes:register-tx')
+        self.cast_url = reverse('votes:cast')
         self.verify_url = reverse('votes:verify-vote', kwargs={'election_pk': self.open_election.pk})
         
         # 6. Datos de Petición Válida
@@ -178,6 +208,366 @@ class VoteRecordAPITests(APITestCase):
         self.assertFalse(self.eligible_voter_record.voted) # Debe seguir en False (ROLLBACK)
 
 
+    def test_register_vote_database_locked_returns_503_with_code(self):
+        """Un OperationalError (bloqueo) responde 503 con un código propio, no un 500 genérico."""
+        self.client.force_authenticate(user=self.eligible_voter)
+        before = metrics.get('vote_database_busy_total', {'view': 'register_vote_transaction'})
+
+        with patch('apps.votes.views.register_vote', side_effect=OperationalError('database is locked')):
+            response = self.client.post(self.register_url, self.valid_post_data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response.data['code'], 'database_busy')
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(metrics.get('vote_database_busy_total', {'view': 'register_vote_transaction'}), before + 1)
+
+    def test_register_vote_transaction_query_budget(self):
+        """La ruta feliz del registro usa como máximo 3 sentencias de datos."""
+        self.client.force_authenticate(user=self.eligible_voter)
+        has_voted(self.open_election.pk, self.eligible_voter.pk) # Prefiltro ya cargado (estado normal del proceso)
+
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.post(self.register_url, self.valid_post_data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertLessEqual(len(data_statements(captured)), 3, data_statements(captured))
+
+    def test_register_vote_transaction_second_attempt_blocked(self):
+        """Tras un voto exitoso, un segundo intento con otra TX no pasa el bloqueo condicional."""
+        self.client.force_authenticate(user=self.eligible_voter)
+        self.client.post(self.register_url, self.valid_post_data, format='json')
+
+        second_hash = 'b' * 64
+        MockchainTx.objects.create(tx_id='TX_SECOND', payload_hash=second_hash, payload={}, block_number=11)
+        response = self.client.post(self.register_url, {
+            'election_id': self.open_election.pk, 'tx_id': 'TX_SECOND', 'vote_hash': second_hash
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertIn('Ya ha emitido su voto', response.data['detail'])
+        self.assertEqual(VoteRecord.objects.filter(user=self.eligible_voter).count(), 1)
+
+    def test_register_vote_known_duplicate_rejected_without_transaction(self):
+        """Un voto ya confirmado se rechaza desde el prefiltro en memoria, sin abrir transacción."""
+        self.client.force_authenticate(user=self.eligible_voter)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.register_url, self.valid_post_data, format='json')
+
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.post(self.register_url, self.valid_post_data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertIn('Ya ha emitido su voto', response.data['detail'])
+        self.assertEqual(captured.captured_queries, [])
+
+    def test_prefilter_tracks_voter_changes(self):
+        """El prefiltro refleja los votos confirmados y olvida al votante si su registro se restablece."""
+        self.assertFalse(has_voted(self.open_election.pk, self.eligible_voter.pk))
+
+        self.eligible_voter_record.voted = True
+        with self.captureOnCommitCallbacks(execute=True):
+            self.eligible_voter_record.save()
+        self.assertTrue(has_voted(self.open_election.pk, self.eligible_voter.pk))
+
+        self.eligible_voter_record.voted = False
+        self.eligible_voter_record.save()
+        self.assertFalse(has_voted(self.open_election.pk, self.eligible_voter.pk))
+
+    def test_prefilter_does_not_load_unknown_elections(self):
+        """Un id de elección inexistente no ocupa sitio en el LRU del prefiltro."""
+        reset_prefilter()
+        has_voted(self.open_election.pk, self.eligible_voter.pk)
+
+        self.assertFalse(has_voted(999, self.eligible_voter.pk))
+
+        self.assertEqual(list(prefilter._elections), [self.open_election.pk])
+
+    def test_register_vote_transaction_unknown_election_400(self):
+        """Una elección inexistente se reporta como error de validación (400)."""
+        self.client.force_authenticate(user=self.eligible_voter)
+        invalid_data = self.valid_post_data.copy()
+        invalid_data['election_id'] = 999
+
+        response = self.client.post(self.register_url, invalid_data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('election_id', response.data)
+
+
+    # =============================================================
+    # TESTS: REINTENTOS CON Idempotency-Key
+    # =============================================================
+
+    def test_register_vote_retry_with_idempotency_key_replays_response(self):
+        """Un reintento con la misma clave recibe el 201 original sin tocar Voter ni Mockchain."""
+        self.client.force_authenticate(user=self.eligible_voter)
+        first = self.client.post(self.register_url, self.valid_post_data, format='json', HTTP_IDEMPOTENCY_KEY='retry-1')
+
+        with CaptureQueriesContext(connection) as captured:
+            retry = self.client.post(self.register_url, self.valid_post_data, format='json', HTTP_IDEMPOTENCY_KEY='retry-1')
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data, {'status': str(first.data['status']), 'tx_id': self.tx_id, 'receipt': first.data['receipt']})
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        touched = ' '.join(data_statements(captured))
+        self.assertNotIn('voter_voter', touched)
+        self.assertNotIn('mockchain_mockchaintx', touched)
+        self.assertEqual(VoteRecord.objects.count(), 1)
+
+    def test_register_vote_idempotency_key_reused_with_other_body_422(self):
+        """Reusar la clave con otro cuerpo es un error del cliente (422)."""
+        self.client.force_authenticate(user=self.eligible_voter)
+        self.client.post(self.register_url, self.valid_post_data, format='json', HTTP_IDEMPOTENCY_KEY='retry-2')
+
+        other_data = self.valid_post_data.copy()
+        other_data['tx_id'] = 'TX_OTRO'
+        response = self.client.post(self.register_url, other_data, format='json', HTTP_IDEMPOTENCY_KEY='retry-2')
+
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_register_vote_expired_idempotency_key_is_ignored(self):
+        """Pasado el TTL la clave se descarta y la petición se ejecuta de nuevo."""
+        self.client.force_authenticate(user=self.eligible_voter)
+        self.client.post(self.register_url, self.valid_post_data, format='json', HTTP_IDEMPOTENCY_KEY='retry-3')
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        response = self.client.post(self.register_url, self.valid_post_data, format='json', HTTP_IDEMPOTENCY_KEY='retry-3')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertIn('Ya ha emitido su voto', response.data['detail'])
+
+    def test_register_vote_retry_while_first_in_flight_gets_409(self):
+        """La clave se reserva antes de ejecutar la vista: un reintento concurrente no vota dos veces ni guarda su 403."""
+        self.client.force_authenticate(user=self.eligible_voter)
+        # Reserva de la primera petición, aún sin respuesta
+        IdempotencyKey.objects.create(
+            user=self.eligible_voter, scope='votes:register-tx', key='retry-4',
+            request_hash=_request_fingerprint_for(self.valid_post_data),
+            expires_at=timezone.now() + timedelta(seconds=60),
+        )
+
+        response = self.client.post(self.register_url, self.valid_post_data, format='json', HTTP_IDEMPOTENCY_KEY='retry-4')
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertFalse(VoteRecord.objects.exists())
+        self.assertIsNone(IdempotencyKey.objects.get(key='retry-4').response_status)
+
+    def test_register_vote_stale_reservation_is_taken_over(self):
+        """Una reserva pendiente vencida (proceso caído) no bloquea la clave para siempre."""
+        self.client.force_authenticate(user=self.eligible_voter)
+        IdempotencyKey.objects.create(
+            user=self.eligible_voter, scope='votes:register-tx', key='retry-5',
+            request_hash=_request_fingerprint_for(self.valid_post_data),
+            expires_at=timezone.now() - timedelta(seconds=1),
+        )
+
+        first = self.client.post(self.register_url, self.valid_post_data, format='json', HTTP_IDEMPOTENCY_KEY='retry-5')
+        retry = self.client.post(self.register_url, self.valid_post_data, format='json', HTTP_IDEMPOTENCY_KEY='retry-5')
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+
+
+    # =============================================================
+    # TESTS: EMISIÓN COMBINADA (POST /votes/cast/)
+    # =============================================================
+
+    def _cast_data(self, selections=(3,)):
+        payload = {"election_id": self.open_election.pk, "selections": list(selections), "nonce": 999}
+        payload_hash = hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+        return {'election_id': self.open_election.pk, 'payload': payload, 'payload_hash': payload_hash}
+
+    def test_cast_vote_publishes_and_registers(self):
+        """Un solo request publica la TX, crea el VoteRecord y bloquea al votante (201)."""
+        self.client.force_authenticate(user=self.eligible_voter)
+        data = self._cast_data()
+
+        response = self.client.post(self.cast_url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        tx = MockchainTx.objects.get(payload_hash=data['payload_hash'])
+        self.assertEqual(response.data['tx_id'], tx.tx_id)
+        self.assertEqual(response.data['block_number'], tx.block_number)
+        self.assertTrue(VoteRecord.objects.filter(tx_id=tx.tx_id, hash=tx.payload_hash, user=self.eligible_voter).exists())
+        self.eligible_voter_record.refresh_from_db()
+        self.assertTrue(self.eligible_voter_record.voted)
+
+    def test_cast_vote_ineligible_does_not_publish(self):
+        """Si el votante no está habilitado no se publica nada en la Mockchain (403)."""
+        self.client.force_authenticate(user=self.ineligible_user)
+        initial_txs = MockchainTx.objects.count()
+
+        response = self.client.post(self.cast_url, self._cast_data(), format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(MockchainTx.objects.count(), initial_txs)
+        self.assertEqual(VoteRecord.objects.count(), 0)
+
+    def test_cast_vote_duplicate_hash_rolls_back_voter(self):
+        """Un payload_hash ya publicado revierte el bloqueo del votante (400)."""
+        self.client.force_authenticate(user=self.eligible_voter)
+        data = self._cast_data()
+        data['payload_hash'] = self.vote_hash # Ya existe en la Mockchain (setUp)
+
+        response = self.client.post(self.cast_url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.eligible_voter_record.refresh_from_db()
+        self.assertFalse(self.eligible_voter_record.voted)
+        self.assertEqual(VoteRecord.objects.count(), 0)
+
+
+    # =============================================================
+    # TESTS: EMISIÓN EN VARIAS ELECCIONES (POST /votes/cast-multi/)
+    # =============================================================
+
+    def _second_election(self, enrolled=True):
+        election = Election.objects.create(
+            owner=self.owner_user,
+            title='Presupuesto Participativo',
+            status=Election.Status.OPEN,
+            start_at=timezone.now() - timedelta(days=1),
+            end_at=timezone.now() + timedelta(days=7),
+        )
+        if enrolled:
+            Voter.objects.create(election=election, user=self.eligible_voter, allowed=True, voted=False)
+        return election
+
+    def _ballot(self, election, nonce):
+        payload = {"election_id": election.pk, "selections": [1], "nonce": nonce}
+        payload_hash = hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+        return {'election_id': election.pk, 'payload': payload, 'payload_hash': payload_hash}
+
+    def test_cast_multi_registers_all_in_one_transaction(self):
+        """Dos elecciones: elegibilidad con consultas de conjunto y registro de ambas (201)."""
+        budget = self._second_election()
+        self.client.force_authenticate(user=self.eligible_voter)
+        has_voted(self.open_election.pk, self.eligible_voter.pk)
+        has_voted(budget.pk, self.eligible_voter.pk)
+        data = {'ballots': [self._ballot(self.open_election, 1), self._ballot(budget, 2)]}
+
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.post(reverse('votes:cast-multi'), data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        # Padrón + hashes + UPDATE + conteo + 2 INSERT en bloque + un shard por elección
+        self.assertLessEqual(len(data_statements(captured)), 8, data_statements(captured))
+        self.assertEqual([r['election_id'] for r in response.data['results']], [self.open_election.pk, budget.pk])
+        for result in response.data['results']:
+            self.assertEqual(result['status_code'], status.HTTP_201_CREATED)
+            self.assertTrue(VoteRecord.objects.filter(tx_id=result['tx_id'], user=self.eligible_voter).exists())
+        self.assertEqual(Voter.objects.filter(user=self.eligible_voter, voted=True).count(), 2)
+        self.assertEqual(turnout_for(budget.pk), 1)
+
+    def test_cast_multi_reports_per_election_rejections(self):
+        """Las elecciones no admitidas se informan una a una sin impedir el resto (207)."""
+        not_enrolled = self._second_election(enrolled=False)
+        self.client.force_authenticate(user=self.eligible_voter)
+        data = {'ballots': [
+            self._ballot(self.open_election, 1),
+            self._ballot(not_enrolled, 2),
+            {**self._ballot(self.open_election, 3), 'election_id': 9999},
+        ]}
+
+        response = self.client.post(reverse('votes:cast-multi'), data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        registered, forbidden, unknown = response.data['results']
+        self.assertEqual(registered['status_code'], status.HTTP_201_CREATED)
+        self.assertEqual(forbidden['status_code'], status.HTTP_403_FORBIDDEN)
+        self.assertIn('No tiene un registro de padrón', forbidden['detail'])
+        self.assertEqual(unknown['status_code'], status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(VoteRecord.objects.filter(user=self.eligible_voter).count(), 1)
+        self.assertFalse(MockchainTx.objects.filter(payload_hash=data['ballots'][1]['payload_hash']).exists())
+
+    def test_cast_multi_hash_published_concurrently_rejects_only_that_ballot(self):
+        """Un hash publicado por otra petición entre la lectura y el INSERT solo rechaza su papeleta (207)."""
+        budget = self._second_election()
+        self.client.force_authenticate(user=self.eligible_voter)
+        data = {'ballots': [self._ballot(self.open_election, 1), self._ballot(budget, 2)]}
+        MockchainTx.objects.create(tx_id='TX_RACE', payload_hash=data['ballots'][1]['payload_hash'], payload={}, block_number=50)
+
+        real_rejections = services._multi_rejections
+        reads = []
+
+        def stale_first_read(user, ballots):
+            # La primera lectura aún no ve la TX publicada por la otra petición
+            rejections = real_rejections(user, ballots)
+            if not reads:
+                rejections.pop(budget.pk, None)
+            reads.append(ballots)
+            return rejections
+
+        with patch('apps.votes.services._multi_rejections', side_effect=stale_first_read):
+            response = self.client.post(reverse('votes:cast-multi'), data, format='json')
+
+        self.assertEqual(len(reads), 2)
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        registered, rejected = response.data['results']
+        self.assertEqual(registered['status_code'], status.HTTP_201_CREATED)
+        self.assertEqual(rejected['status_code'], status.HTTP_400_BAD_REQUEST)
+        self.assertIn('Ya existe una transacción publicada', rejected['detail'])
+        self.assertFalse(Voter.objects.get(election=budget, user=self.eligible_voter).voted)
+        self.assertEqual(VoteRecord.objects.filter(user=self.eligible_voter).count(), 1)
+
+    def test_cast_multi_rejects_repeated_election(self):
+        """Dos papeletas para la misma elección son un error de formato (400)."""
+        self.client.force_authenticate(user=self.eligible_voter)
+        data = {'ballots': [self._ballot(self.open_election, 1), self._ballot(self.open_election, 2)]}
+
+        response = self.client.post(reverse('votes:cast-multi'), data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('ballots', response.data)
+        self.assertEqual(VoteRecord.objects.count(), 0)
+
+
+    # =============================================================
+    # TESTS: PARTICIPACIÓN (GET /votes/turnout/<election_pk>/)
+    # =============================================================
+
+    def test_turnout_counts_registered_and_cast_votes(self):
+        """Cada voto exitoso suma uno en algún shard; los rechazos no suman."""
+        self.assertEqual(TurnoutShard.objects.filter(election=self.open_election).count(), settings.TURNOUT_SHARDS)
+
+        self.client.force_authenticate(user=self.eligible_voter)
+        self.client.post(self.register_url, self.valid_post_data, format='json')
+        self.client.force_authenticate(user=self.ineligible_user)
+        self.client.post(self.cast_url, self._cast_data(), format='json')
+
+        other = User.objects.create_user(email='other@test.com', name='Other', password='pass')
+        Voter.objects.create(election=self.open_election, user=other, allowed=True, voted=False)
+        self.client.force_authenticate(user=other)
+        self.client.post(self.cast_url, self._cast_data(), format='json')
+
+        self.assertEqual(turnout_for(self.open_election.pk), 2)
+
+        reset_config_cache() # Configuración en frío: la elección + la suma de los shards
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('votes:turnout', kwargs={'election_pk': self.open_election.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'election_id': self.open_election.pk, 'votes_cast': 2})
+
+    def test_turnout_recreates_missing_shards(self):
+        """Una elección sin shards (anterior a la migración) los recibe en su primer voto."""
+        TurnoutShard.objects.filter(election=self.open_election).delete()
+        self.client.force_authenticate(user=self.eligible_voter)
+
+        response = self.client.post(self.register_url, self.valid_post_data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(TurnoutShard.objects.filter(election=self.open_election).count(), settings.TURNOUT_SHARDS)
+        self.assertEqual(turnout_for(self.open_election.pk), 1)
+
+    def test_turnout_unknown_election_404(self):
+        self.client.force_authenticate(user=self.eligible_voter)
+        response = self.client.get(reverse('votes:turnout', kwargs={'election_pk': 9999}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
     # =============================================================
     # TESTS: VERIFICACIÓN INDIVIDUAL (GET /votes/verify/<election_pk>/)
     # =============================================================
@@ -225,4 +615,228 @@ class VoteRecordAPITests(APITestCase):
         response = self.client.get(self.verify_url)
         
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
-        self.assertIn('El registro local no coincide con la transacción en la cadena', response.data['detail'])
\ No newline at end of file
+        self.assertIn('El registro local no coincide con la transacción en la cadena', response.data['detail'])
+
+    # =============================================================
+    # TESTS: COMPROBANTE FIRMADO (POST /votes/verify-receipt/)
+    # =============================================================
+
+    def _registered_receipt(self):
+        self.client.force_authenticate(user=self.eligible_voter)
+        response = self.client.post(self.register_url, self.valid_post_data, format='json')
+        self.client.force_authenticate(user=None)
+        return response.data['receipt']
+
+    def test_verify_receipt_without_database(self):
+        """El comprobante se valida sin ninguna consulta y sin autenticación."""
+        receipt = self._registered_receipt()
+        url = reverse('votes:verify-receipt')
+
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.post(url, {'receipt': receipt}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(captured.captured_queries), 0)
+        self.assertTrue(response.data['valid'])
+        self.assertEqual(response.data['election_id'], self.open_election.pk)
+        self.assertEqual(response.data['tx_id'], self.tx_id)
+        self.assertEqual(response.data['vote_hash'], self.vote_hash)
+
+    def test_verify_receipt_tampered_400(self):
+        """Un comprobante alterado (otro hash, misma firma) se rechaza."""
+        from apps.votes.receipts import issue_receipt
+        receipt = self._registered_receipt()
+        forged = issue_receipt(self.open_election.pk, self.tx_id, 'f' * 64, timezone.now(), secret='otro-secreto')
+        tampered = '.'.join([forged.split('.')[0], forged.split('.')[1], receipt.split('.')[2]])
+
+        response = self.client.post(reverse('votes:verify-receipt'), {'receipt': tampered}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(response.data['valid'])
+
+    def test_verify_receipt_deep_check(self):
+        """La verificación profunda contrasta el comprobante con el VoteRecord y la Mockchain."""
+        receipt = self._registered_receipt()
+        url = reverse('votes:verify-receipt')
+
+        response = self.client.post(url, {'receipt': receipt, 'deep': True}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['deep_verified'])
+
+        # Si la TX desaparece de la cadena, la firma sigue siendo válida pero la verificación profunda falla
+        MockchainTx.objects.filter(tx_id=self.tx_id).delete()
+        response = self.client.post(url, {'receipt': receipt, 'deep': True}, format='json')
+        self.assertTrue(response.data['valid'])
+        self.assertFalse(response.data['deep_verified'])
+
+    def test_verify_my_vote_returns_same_receipt(self):
+        """El comprobante es determinista: verify_my_vote devuelve el mismo que el registro."""
+        receipt = self._registered_receipt()
+        self.client.force_authenticate(user=self.eligible_voter)
+
+        response = self.client.get(self.verify_url)
+
+        self.assertEqual(response.data['receipt'], receipt)
+
+
+
+    # =============================================================
+    # TESTS: VARIANTES ASÍNCRONAS (register-tx-async / verify-async)
+    # =============================================================
+
+    def _bearer(self, user):
+        return {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(user).access_token}'}
+
+    def test_register_vote_async_success_and_verify(self):
+        """La vista asíncrona registra el voto y verify-async lo devuelve con el mismo comprobante."""
+        headers = self._bearer(self.eligible_voter)
+
+        response = self.client.post(
+            reverse('votes:register-tx-async'), self.valid_post_data, content_type='application/json', **headers
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.eligible_voter_record.refresh_from_db()
+        self.assertTrue(self.eligible_voter_record.voted)
+
+        verify = self.client.get(
+            reverse('votes:verify-vote-async', kwargs={'election_pk': self.open_election.pk}), **headers
+        )
+        self.assertEqual(verify.status_code, status.HTTP_200_OK)
+        self.assertEqual(verify.json()['transaction_id'], self.tx_id)
+        self.assertEqual(verify.json()['receipt'], response.json()['receipt'])
+        self.assertEqual(verify.json()['mockchain_payload_sample'], self.vote_payload_data)
+
+    def test_register_vote_async_rejections_match_sync(self):
+        """Los rechazos de negocio son los mismos que en la vista síncrona."""
+        headers = self._bearer(self.ineligible_user)
+
+        response = self.client.post(
+            reverse('votes:register-tx-async'), self.valid_post_data, content_type='application/json', **headers
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertIn('No está habilitado para votar', response.json()['detail'])
+
+    def test_async_views_require_jwt(self):
+        """Sin token válido las variantes asíncronas responden 401."""
+        response = self.client.post(
+            reverse('votes:register-tx-async'), self.valid_post_data, content_type='application/json',
+            HTTP_AUTHORIZATION='Bearer no-es-un-token'
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.client.get(reverse('votes:verify-vote-async', kwargs={'election_pk': self.open_election.pk}))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class LoadTestHarnessTests(TestCase):
+
+    # =============================================================
+    # TESTS: ARNÉS DE CARGA (py manage.py loadtest)
+    # =============================================================
+
+    def test_seed_creates_allowed_voters_that_can_log_in(self):
+        """La siembra deja una elección abierta con votantes habilitados y la contraseña indicada."""
+        election, emails = seed_election(5, 'secreta')
+
+        self.assertEqual(election.status, Election.Status.OPEN)
+        self.assertEqual(len(emails), 5)
+        self.assertEqual(Voter.objects.filter(election=election, allowed=True, voted=False).count(), 5)
+        self.assertTrue(User.objects.get(email=emails[0]).check_password('secreta'))
+        self.assertEqual(pending_emails(election), emails)
+
+        cleanup_election(election)
+        self.assertFalse(User.objects.filter(email__in=emails).exists())
+        self.assertFalse(Election.objects.filter(pk=election.pk).exists())
+
+    def test_report_percentiles_and_lock_errors(self):
+        """El informe calcula percentiles por paso y separa los errores de bloqueo."""
+        report = LoadTestReport()
+        report.started = 0.0
+        report.finished = 2.0
+        for i in range(1, 101):
+            report.record('login', i / 1000, 200, '')
+        report.record('register-tx', 0.5, 500, '{"detail": "database is locked"}')
+        report.record('register-tx', 0.5, 503, '{"detail": "Ocupada", "code": "database_busy"}')
+        report.record('register-tx', 0.5, 429, '')
+        report.record('publish', 0.1, None, 'Connection refused')
+
+        summary = report.summary()
+
+        self.assertEqual(summary['requests'], 104)
+        self.assertAlmostEqual(summary['steps']['login']['p50_ms'], 50.0)
+        self.assertAlmostEqual(summary['steps']['login']['p99_ms'], 99.0)
+        self.assertEqual(summary['lock_errors'], {'register-tx': 2})
+        self.assertIn({'step': 'publish', 'status': 'connection', 'count': 1}, summary['errors'])
+        self.assertIn({'step': 'register-tx', 'status': 429, 'count': 1}, summary['errors'])
+
+
+class GroupCommitTests(TransactionTestCase):
+
+    def setUp(self):
+        metrics.reset()
+        owner = User.objects.create_user(email='owner@test.com', name='Owner', password='pass')
+        self.election = Election.objects.create(
+            owner=owner,
+            title='Elección en Lote',
+            status=Election.Status.OPEN,
+            start_at=timezone.now() - timedelta(days=1),
+            end_at=timezone.now() + timedelta(days=1),
+        )
+        self.voters = []
+        for i in range(5):
+            user = User.objects.create_user(email=f'v{i}@test.com', name=f'V{i}', password='pass')
+            Voter.objects.create(election=self.election, user=user, allowed=True, voted=False)
+            MockchainTx.objects.create(tx_id=f'TX_{i}', payload_hash=f'{i:064d}', payload={}, block_number=i + 1)
+            self.voters.append(user)
+
+    # =============================================================
+    # TESTS: GROUP COMMIT (VOTE_GROUP_COMMIT)
+    # =============================================================
+
+    @override_settings(VOTE_GROUP_COMMIT=True, VOTE_GROUP_COMMIT_WINDOW_MS=200)
+    def test_concurrent_votes_share_a_commit(self):
+        """Votos simultáneos se confirman en lote y cada llamante recibe su VoteRecord."""
+        has_voted(self.election.pk, self.voters[0].pk) # Prefiltro cargado: los llamantes no consultan la base de datos
+
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            records = list(pool.map(
+                lambda i: register_vote(self.election.pk, self.voters[i], f'TX_{i}', f'{i:064d}'), range(5)
+            ))
+
+        self.assertEqual(sorted(record.tx_id for record in records), [f'TX_{i}' for i in range(5)])
+        self.assertEqual(VoteRecord.objects.filter(election=self.election).count(), 5)
+        self.assertEqual(turnout_for(self.election.pk), 5)
+        self.assertEqual(metrics.get('vote_group_commit_votes_total'), 5)
+        self.assertLess(metrics.get('vote_group_commit_batches_total'), 5)
+
+    @override_settings(VOTE_GROUP_COMMIT=True, VOTE_GROUP_COMMIT_WINDOW_MS=2000)
+    def test_lone_vote_does_not_wait_for_the_window(self):
+        """Sin otros llamantes esperando (p. ej. el hilo único de ASGI) el lote se confirma de inmediato."""
+        has_voted(self.election.pk, self.voters[0].pk)
+        started = time.monotonic()
+
+        record = register_vote(self.election.pk, self.voters[0], 'TX_0', '0' * 64)
+
+        self.assertEqual(record.tx_id, 'TX_0')
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(metrics.get('vote_group_commit_batches_total'), 1)
+
+    def test_rejected_vote_does_not_undo_its_batch(self):
+        """Un rechazo dentro del lote solo deshace su savepoint."""
+        batch = [
+            _PendingVote((self.election.pk, self.voters[0], 'TX_0', '0' * 64)),
+            _PendingVote((self.election.pk, self.voters[1], 'TX_1', 'f' * 64)), # Hash que no está en la Mockchain
+            _PendingVote((self.election.pk, self.voters[2], 'TX_2', f'{2:064d}')),
+        ]
+
+        _group_commit_writer.commit_batch(batch)
+
+        self.assertTrue(all(pending.done.is_set() for pending in batch))
+        self.assertEqual(batch[0].result.tx_id, 'TX_0')
+        self.assertIsInstance(batch[1].error, VoteRejected)
+        self.assertEqual(batch[1].error.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(batch[2].result.tx_id, 'TX_2')
+        self.assertFalse(Voter.objects.get(election=self.election, user=self.voters[1]).voted)
+        self.assertEqual(turnout_for(self.election.pk), 2)
@@ -0,0 +1,41 @@
+# apps/votes/turnout.py
+"""
+Contador de participación (votos emitidos) repartido en shards.
+
+Un contador único en Election sería una fila caliente que todos los votos
+actualizan dentro de su transacción. Aquí cada voto incrementa uno de
+TURNOUT_SHARDS shards elegido al azar (UPDATE ... SET count = count + 1) y la
+lectura suma los shards: O(shards), sin contar VoteRecord.
+
+Los shards se crean al crear la elección (signals.py) y, si faltan (elección
+anterior a la migración o TURNOUT_SHARDS aumentado), en el primer voto que los
+necesite.
+"""
+import random
+
+from django.conf import settings
+from django.db.models import F, Sum
+
+from .models import TurnoutShard
+
+
+def ensure_turnout_shards(election_id):
+    """Crea los shards que falten para la elección (seguro ante ejecuciones simultáneas)."""
+    TurnoutShard.objects.bulk_create(
+        [TurnoutShard(election_id=election_id, shard=shard) for shard in range(settings.TURNOUT_SHARDS)],
+        ignore_conflicts=True
+    )
+
+
+def increment_turnout(election_id):
+    """Suma un voto en un shard al azar. Debe llamarse dentro de la transacción del voto."""
+    shard = random.randrange(settings.TURNOUT_SHARDS)
+    updated = TurnoutShard.objects.filter(election_id=election_id, shard=shard).update(count=F('count') + 1)
+    if not updated:
+        ensure_turnout_shards(election_id)
+        TurnoutShard.objects.filter(election_id=election_id, shard=shard).update(count=F('count') + 1)
+
+
+def turnout_for(election_id):
+    """Votos emitidos en la elección: suma de sus shards (0 si no tiene)."""
+    return TurnoutShard.objects.filter(election_id=election_id).aggregate(total=Sum('count'))['total'] or 0
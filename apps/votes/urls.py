@@ -1,12 +1,29 @@
 from django.urls import path
-from .views import register_vote_transaction, verify_my_vote # <-- CAMBIO: VISTA ACTUALIZADA
+from .views import register_vote_transaction, publish_and_register_vote, publish_and_register_votes, verify_my_vote, verify_vote_receipt, election_turnout # <-- CAMBIO: VISTA ACTUALIZADA
+from .async_views import register_vote_transaction_async, verify_my_vote_async
 
 app_name = 'votes'
 
 urlpatterns = [
     # api/v1/votes/register-tx/ <-- CAMBIO: NUEVA RUTA PARA REGISTRO (Proceso P6)
     path('register-tx/', register_vote_transaction, name='register-tx'),
+
+    # api/v1/votes/cast/ (Publicación en Mockchain + Registro en un solo paso)
+    path('cast/', publish_and_register_vote, name='cast'),
     
+    # api/v1/votes/cast-multi/ (Emisión combinada en varias elecciones en una transacción)
+    path('cast-multi/', publish_and_register_votes, name='cast-multi'),
+
     # api/v1/votes/verify/<int:election_pk>/
     path('verify/<int:election_pk>/', verify_my_vote, name='verify-vote'),
+
+    # api/v1/votes/verify-receipt/ (Verificación del comprobante firmado, sin base de datos)
+    path('verify-receipt/', verify_vote_receipt, name='verify-receipt'),
+
+    # api/v1/votes/turnout/<int:election_pk>/ (Votos emitidos, suma de los shards de participación)
+    path('turnout/<int:election_pk>/', election_turnout, name='turnout'),
+
+    # Variantes asíncronas (ASGI) del registro y la verificación
+    path('register-tx-async/', register_vote_transaction_async, name='register-tx-async'),
+    path('verify-async/<int:election_pk>/', verify_my_vote_async, name='verify-vote-async'),
 ]
\ No newline at end of file
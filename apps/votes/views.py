@@ -1,85 +1,157 @@
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, AllowAny
+from django.db import OperationalError
+from django.db.models import Exists, OuterRef
 from django.shortcuts import get_object_or_404
 from django.utils.translation import gettext_lazy as _
-from django.db import transaction
-from django.utils import timezone # Añadida para published_at
 
 # Importaciones de modelos
-from apps.elections.models import Election
-from apps.voter.models import Voter
 from apps.mockchain.models import MockchainTx # Necesario para verify_my_vote
+from apps.elections.config_cache import get_election_config
 from .models import VoteRecord
-from .serializers import VoteRecordSerializer, VoteTxRegistrationSerializer # Importación actualizada
+from .serializers import VoteRecordSerializer, VoteTxRegistrationSerializer, VoteCastSerializer, VoteCastMultiSerializer, ReceiptVerificationSerializer
+from .services import VoteRejected, database_busy, register_vote, cast_vote, cast_votes
+from .receipts import InvalidReceipt, issue_receipt, verify_receipt
+from .turnout import turnout_for
+from apps.core.idempotency import idempotent
+from apps.core.admission import admission_controlled, election_from_body, elections_from_ballots
 # Eliminamos json, hashlib, requests y MOCKCHAIN_URL ya que la transacción es ahora responsabilidad del frontend
 
+def _database_busy(view_name):
+    """503 con Retry-After: la contención de bloqueos es transitoria y el cliente puede reintentar."""
+    return Response(database_busy(view_name), status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': '1'})
+
+
+def _receipt_for(vote_record):
+    """Comprobante firmado (determinista) de un VoteRecord."""
+    return issue_receipt(vote_record.election_id, vote_record.tx_id, vote_record.hash, vote_record.published_at)
+
+
 # --- NUEVA VISTA: REGISTRO DE TRANSACCIÓN (Proceso P6) ---
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
-@transaction.atomic
+@admission_controlled(election_from_body('election_id'))
+@idempotent('votes:register-tx')
 def register_vote_transaction(request):
     """
     Proceso central para recibir la confirmación (tx_id, hash) del frontend 
     y realizar el registro final de auditoría y bloqueo del Voter.
+    Acepta la cabecera Idempotency-Key para que los reintentos reciban la respuesta original.
+
+    La ruta feliz usa dos sentencias: un UPDATE condicional que bloquea al
+    votante solo si está habilitado, no ha votado y la TX existe en la Mockchain,
+    y el INSERT del VoteRecord. Los motivos de rechazo se diagnostican después.
     """
     serializer = VoteTxRegistrationSerializer(data=request.data)
     if not serializer.is_valid():
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     data = serializer.validated_data
-    election = data['election'] # 'election' resuelto por el serializer
-    user = request.user
 
-    # 1. Verificación Final de Voto Único y Elegibilidad (Voter.voted=False)
     try:
-        # Usamos select_for_update para asegurar exclusividad en la transacción atómica
-        voter_record = Voter.objects.select_for_update().get(election=election, user=user)
-    except Voter.DoesNotExist:
-        # Este error solo debería ocurrir si el usuario fue validado externamente y luego eliminado del padrón.
-        return Response({'detail': _('Error de Elegibilidad: No tiene un registro de padrón válido para votar.')}, status=status.HTTP_403_FORBIDDEN)
-        
-    if not voter_record.allowed:
-        return Response({'detail': _('Error de Seguridad: No está habilitado para votar.')}, status=status.HTTP_403_FORBIDDEN)
-        
-    if voter_record.voted:
-        return Response({'detail': _('Error de Seguridad: Ya ha emitido su voto en esta elección.')}, status=status.HTTP_403_FORBIDDEN)
-
-    # 2. Verificar que la TX exista en la Mockchain (Prevención de envío de hash falsos)
-    # Buscamos por el hash del payload. Si no existe, alguien intenta enviar un registro inválido.
-    try:
-        MockchainTx.objects.get(
-            payload_hash=data['vote_hash'], 
-            tx_id=data['tx_id']
-        )
-    except MockchainTx.DoesNotExist:
-         return Response({'detail': _('Error de Integridad: La transacción o el hash no se encontraron en el libro mayor inmutable (Mockchain).')}, status=status.HTTP_400_BAD_REQUEST)
+        vote_record = register_vote(data['election_id'], request.user, data['tx_id'], data['vote_hash'])
+    except VoteRejected as rejection:
+        return Response(rejection.data, status=rejection.status_code)
+    except OperationalError:
+        return _database_busy('register_vote_transaction')
+    except Exception as e:
+        # Si falla el guardado (ConstraintError, etc.), el bloque atómico hace ROLLBACK completo
+        return Response({'detail': _('Error interno al finalizar el registro del voto.')}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    return Response({
+        'status': _('Voto registrado exitosamente en el sistema.'),
+        'tx_id': data['tx_id'],
+        'receipt': _receipt_for(vote_record),
+    }, status=status.HTTP_201_CREATED)
 
 
-    # 3. Registro Atómico (VoteRecord y bloqueo de Votante)
+# --- NUEVA VISTA: EMISIÓN COMBINADA (Publicación P5 + Registro P6) ---
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@admission_controlled(election_from_body('election_id'))
+@idempotent('votes:cast')
+def publish_and_register_vote(request):
+    """
+    Verifica la elegibilidad, publica el voto en la Mockchain y lo registra
+    en un único viaje de ida y vuelta. Devuelve el comprobante de la transacción.
+    Acepta la cabecera Idempotency-Key.
+    """
+    serializer = VoteCastSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    data = serializer.validated_data
+
     try:
-        vote_record = VoteRecord.objects.create(
-            election=election,
-            user=user,
-            hash=data['vote_hash'],
-            tx_id=data['tx_id'],
-            published_at=timezone.now()
-        )
+        tx, vote_record = cast_vote(data['election_id'], request.user, data['payload'], data['payload_hash'])
+    except VoteRejected as rejection:
+        return Response(rejection.data, status=rejection.status_code)
+    except OperationalError:
+        return _database_busy('publish_and_register_vote')
+    except Exception as e:
+        return Response({'detail': _('Error interno al finalizar el registro del voto.')}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    return Response({
+        'status': _('Voto registrado exitosamente en el sistema.'),
+        'election_id': vote_record.election_id,
+        'tx_id': tx.tx_id,
+        'block_number': tx.block_number,
+        'vote_hash': vote_record.hash,
+        'published_at': vote_record.published_at,
+        'receipt': _receipt_for(vote_record),
+    }, status=status.HTTP_201_CREATED)
 
-        # 4. Bloqueo de Votante
-        voter_record.voted = True
-        voter_record.save()
-        
-        return Response(
-            {'status': _('Voto registrado exitosamente en el sistema.'), 'tx_id': data['tx_id']}, 
-            status=status.HTTP_201_CREATED
-        )
 
+# --- NUEVA VISTA: EMISIÓN COMBINADA EN VARIAS ELECCIONES ---
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@admission_controlled(elections_from_ballots('ballots'))
+@idempotent('votes:cast-multi')
+def publish_and_register_votes(request):
+    """
+    Como publish_and_register_vote, para varias elecciones en una petición
+    ({"ballots": [{election_id, payload, payload_hash}, ...]}).
+    La elegibilidad se comprueba con consultas de conjunto y las papeletas
+    admitidas se registran en una sola transacción.
+    Responde 201 si se registraron todas y 207 con el resultado de cada elección si no.
+    Acepta la cabecera Idempotency-Key.
+    """
+    serializer = VoteCastMultiSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        outcomes = cast_votes(request.user, serializer.validated_data['ballots'])
+    except VoteRejected as rejection:
+        return Response(rejection.data, status=rejection.status_code)
+    except OperationalError:
+        return _database_busy('publish_and_register_votes')
     except Exception as e:
-        # Si falla el guardado (ConstraintError, etc.), se hace ROLLBACK completo gracias a @transaction.atomic
         return Response({'detail': _('Error interno al finalizar el registro del voto.')}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    results = []
+    for election_id, tx, vote_record, rejection in outcomes:
+        if rejection is not None:
+            results.append({'election_id': election_id, 'status_code': rejection.status_code, **rejection.data})
+            continue
+        results.append({
+            'election_id': election_id,
+            'status_code': status.HTTP_201_CREATED,
+            'tx_id': tx.tx_id,
+            'block_number': tx.block_number,
+            'vote_hash': vote_record.hash,
+            'published_at': vote_record.published_at,
+            'receipt': _receipt_for(vote_record),
+        })
+
+    all_registered = all(result['status_code'] == status.HTTP_201_CREATED for result in results)
+    return Response(
+        {'results': results},
+        status=status.HTTP_201_CREATED if all_registered else status.HTTP_207_MULTI_STATUS
+    )
+
 
 # --- VISTA EXISTENTE: VERIFICACIÓN INDIVIDUAL (P8) ---
 @api_view(['GET'])
@@ -87,6 +159,7 @@ def register_vote_transaction(request):
 def verify_my_vote(request, election_pk):
     """
     Permite a un usuario verificar que su voto fue registrado.
+    Para comprobaciones repetidas es preferible verify_vote_receipt, que no consulta la base de datos.
     """
     user = request.user
     
@@ -113,5 +186,59 @@ def verify_my_vote(request, election_pk):
         'transaction_id': vote_record.tx_id,
         'vote_hash': vote_record.hash,
         'published_at': vote_record.published_at,
+        'receipt': _receipt_for(vote_record),
         'mockchain_payload_sample': mock_tx.payload # Muestra el contenido inmutable del voto (candidatos, prueba)
-    }, status=status.HTTP_200_OK)
\ No newline at end of file
+    }, status=status.HTTP_200_OK)
+
+# --- NUEVA VISTA: VERIFICACIÓN DE COMPROBANTE FIRMADO ---
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def verify_vote_receipt(request):
+    """
+    Valida criptográficamente un comprobante emitido al registrar el voto.
+    Sin 'deep' no toca la base de datos; con deep=true contrasta el comprobante
+    con el VoteRecord y la TX de la Mockchain en una sola consulta.
+    """
+    serializer = ReceiptVerificationSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    data = serializer.validated_data
+
+    # 1. Verificación de la firma (sin base de datos)
+    try:
+        receipt = verify_receipt(data['receipt'])
+    except InvalidReceipt as e:
+        return Response({'valid': False, 'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    response_data = {'valid': True, **receipt}
+    if not data['deep']:
+        return Response(response_data, status=status.HTTP_200_OK)
+
+    # 2. Verificación profunda: el registro local y la cadena deben coincidir con el comprobante
+    on_chain = MockchainTx.objects.filter(tx_id=OuterRef('tx_id'), payload_hash=OuterRef('hash'))
+    response_data['deep_verified'] = VoteRecord.objects.filter(
+        election_id=receipt['election_id'],
+        tx_id=receipt['tx_id'],
+        hash=receipt['vote_hash'],
+    ).filter(Exists(on_chain)).exists()
+    if not response_data['deep_verified']:
+        response_data['detail'] = _('El comprobante es auténtico pero no coincide con el registro local o la Mockchain.')
+    return Response(response_data, status=status.HTTP_200_OK)
+
+
+# --- NUEVA VISTA: PARTICIPACIÓN (Votos emitidos, contador por shards) ---
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def election_turnout(request, election_pk):
+    """
+    Votos emitidos en la elección, leídos de sus shards de participación
+    (una suma sobre TURNOUT_SHARDS filas, sin contar VoteRecord).
+    """
+    if get_election_config(election_pk) is None:
+        return Response({'detail': _('Elección no encontrada.')}, status=status.HTTP_404_NOT_FOUND)
+
+    return Response({
+        'election_id': election_pk,
+        'votes_cast': turnout_for(election_pk),
+    }, status=status.HTTP_200_OK)
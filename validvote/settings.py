@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 
 from pathlib import Path
 from datetime import timedelta # Importado para Simple JWT
+from corsheaders.defaults import default_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -188,4 +189,123 @@ CORS_ALLOWED_ORIGINS = [
 ]
 
 # También se puede usar CORS_ALLOW_ALL_ORIGINS = DEBUG (si DEBUG es True)
-# Pero es mejor ser explícito.
\ No newline at end of file
+# Pero es mejor ser explícito.
+
+# Cabecera usada por los clientes móviles para reintentar el registro de votos sin duplicarlo
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
+CORS_EXPOSE_HEADERS = ['Idempotent-Replayed']
+
+# ----------------------------------------------------
+## CONFIGURACIÓN DE IDEMPOTENCIA (Reintentos de votación)
+# ----------------------------------------------------
+# Tiempo durante el cual se guarda la primera respuesta de una Idempotency-Key
+IDEMPOTENCY_KEY_TTL = timedelta(hours=24)
+# Tiempo máximo que una clave queda reservada por una petición en curso (si el proceso muere, se libera)
+IDEMPOTENCY_PENDING_TIMEOUT = timedelta(seconds=60)
+# ----------------------------------------------------
+## CONFIGURACIÓN DE COMPROBANTES DE VOTO (Firma HMAC)
+# ----------------------------------------------------
+# Secreto con el que se firman los comprobantes de voto. Es independiente de
+# SECRET_KEY: rotarlo invalida los comprobantes ya emitidos, pero no las sesiones.
+VOTE_RECEIPT_SECRET = 'django-insecure-receipts-7q!m4z$w0e9^c2r+u8k#h6t@x1b&n5v3'
+
+# ----------------------------------------------------
+## CONFIGURACIÓN DE CONCILIACIÓN (VoteRecord <-> Mockchain)
+# ----------------------------------------------------
+# Las filas más recientes que esto se dejan para la siguiente ejecución, de modo
+# que una transacción aún sin confirmar no quede por detrás de la marca de agua.
+RECONCILIATION_SETTLE_SECONDS = 5
+
+# ----------------------------------------------------
+## CONFIGURACIÓN DE AUDITORÍA POR MUESTREO (Límite de riesgo)
+# ----------------------------------------------------
+# Probabilidad máxima aceptada de confirmar una elección cuya tasa de fallos
+# alcance la tasa tolerable (0.05 -> 95 % de confianza).
+AUDIT_RISK_LIMIT = 0.05
+# Tasa de pares VoteRecord/MockchainTx defectuosos que la auditoría debe descartar
+AUDIT_TOLERABLE_ERROR_RATE = 0.01
+
+# ----------------------------------------------------
+## CONFIGURACIÓN DE CONTROL DE ADMISIÓN (Ruta de votación)
+# ----------------------------------------------------
+# Límites por elección y por proceso. Lo que los supere recibe 429 + Retry-After
+# en lugar de esperar por los bloqueos de escritura de SQLite. 0 desactiva el límite.
+ADMISSION_MAX_CONCURRENT_PER_ELECTION = 8
+ADMISSION_RATE_PER_ELECTION = 200     # peticiones/segundo sostenidas
+ADMISSION_BURST_PER_ELECTION = 400    # ráfaga máxima al abrir la elección
+
+# ----------------------------------------------------
+## CONFIGURACIÓN DEL PREFILTRO "YA VOTÓ"
+# ----------------------------------------------------
+# Elecciones con mapa de bits en memoria por proceso (se descartan las menos usadas)
+VOTED_PREFILTER_MAX_ELECTIONS = 32
+
+# ----------------------------------------------------
+## CONFIGURACIÓN DE CONTADORES DE PARTICIPACIÓN (Shards)
+# ----------------------------------------------------
+# Filas por elección entre las que se reparten los incrementos de "votos emitidos".
+# Más shards = menos contención entre votos simultáneos; la lectura suma todas.
+TURNOUT_SHARDS = 16
+
+# ----------------------------------------------------
+## CONFIGURACIÓN DE GROUP COMMIT (Registro de votos)
+# ----------------------------------------------------
+# Con True, register-tx entrega cada voto a un hilo escritor por proceso que los
+# confirma en lotes (un COMMIT/fsync por lote). Cada petición espera a su lote.
+# Solo ayuda con workers WSGI de varios hilos: bajo ASGI las vistas síncronas
+# comparten un hilo y cada lote tendría un único voto.
+VOTE_GROUP_COMMIT = False
+# Tiempo máximo que el escritor espera para completar un lote, y su tamaño máximo
+VOTE_GROUP_COMMIT_WINDOW_MS = 5
+VOTE_GROUP_COMMIT_MAX_BATCH = 100
+
+# ----------------------------------------------------
+## CONFIGURACIÓN DE VALIDADORES EXTERNOS (ext_validation_url)
+# ----------------------------------------------------
+# Conexiones keep-alive por host y timeouts (segundos) de conexión y de lectura
+EXTERNAL_VALIDATION_POOL_SIZE = 20
+EXTERNAL_VALIDATION_CONNECT_TIMEOUT = 2.0
+EXTERNAL_VALIDATION_READ_TIMEOUT = 5.0
+# Cortocircuito por URL: caídas seguidas para abrirlo y segundos abierto antes de la consulta de prueba
+EXTERNAL_VALIDATION_BREAKER_FAILURES = 5
+EXTERNAL_VALIDATION_BREAKER_RESET_SECONDS = 30
+# Peticiones de cobertura: percentil de latencia tras el que se lanza una segunda consulta
+# (None = desactivado) y muestras mínimas para calcularlo
+EXTERNAL_VALIDATION_HEDGE_PERCENTILE = None
+EXTERNAL_VALIDATION_HEDGE_MIN_SAMPLES = 20
+
+# ----------------------------------------------------
+## CONFIGURACIÓN DE LA CACHÉ DE ELEGIBILIDAD EXTERNA
+# ----------------------------------------------------
+# Segundos que se recuerda la decisión del validador externo por (elección, email).
+# Las negativas duran menos: el registro externo puede habilitar al votante después.
+ELIGIBILITY_CACHE_POSITIVE_TTL = 300
+ELIGIBILITY_CACHE_NEGATIVE_TTL = 60
+# Decisiones guardadas por proceso (se descartan las menos usadas). Las invalidaciones llegan
+# a los demás procesos con una generación en CACHES['default'] (debe ser compartida).
+ELIGIBILITY_CACHE_MAX_ENTRIES = 50000
+
+# ----------------------------------------------------
+## CONFIGURACIÓN DEL PLANIFICADOR DE ESTADOS (DRAFT -> OPEN -> CLOSED)
+# ----------------------------------------------------
+# py manage.py run_election_scheduler: segundos máximos entre ciclos y duración de
+# la concesión que impide que dos procesos actúen a la vez (debe ser mayor).
+ELECTION_SCHEDULER_INTERVAL_SECONDS = 5
+ELECTION_SCHEDULER_LEASE_SECONDS = 30
+
+# ----------------------------------------------------
+## CONFIGURACIÓN DE LA CACHÉ DE CONFIGURACIÓN DE ELECCIONES
+# ----------------------------------------------------
+# Copia en memoria por proceso de estado, ventana, tipo, max_sel, dueño y fuentes
+# de validación de cada elección. Se invalida al guardarla o borrarla mediante una
+# versión en CACHES['default'] (debe ser compartida si hay varios procesos); el
+# TTL (segundos) acota lo que puede durar una copia atrasada.
+ELECTION_CONFIG_CACHE_TTL = 60
+ELECTION_CONFIG_CACHE_MAX_ENTRIES = 1000
+
+# ----------------------------------------------------
+## CONFIGURACIÓN DE LA CACHÉ DE BOLETAS (Candidatos por elección)
+# ----------------------------------------------------
+# Segundos que la boleta de una elección se guarda en CACHES['default'].
+# Los cambios de candidatos la invalidan; el TTL cubre los procesos sin caché compartida.
+BALLOT_CACHE_TTL = 300
@@ -34,6 +34,9 @@ urlpatterns = [
     
     # Rutas de Resultados
     path('api/v1/results/', include('apps.results.urls')),
+
+    # Rutas de Operación (métricas)
+    path('api/v1/core/', include('apps.core.urls')),
     
     # --- NUEVA RUTA DE SIMULACIÓN (Mock de Elegibilidad Externa - P4) ---
     # La API Externa se ubica en una ruta separada para simular un servicio independiente.